@@ -0,0 +1,2 @@
+"""Benchmarks for the chatbot engine. Run them from the repository root, e.g.
+`python -m benchmarks.bench_startup`."""
@@ -0,0 +1,74 @@
+"""
+Throughput of the batched get_responses API versus calling get_response in a
+loop, for batch sizes 1..1024. Queries are retrieval paraphrases built from
+RETRIEVAL_QUESTIONS plus a few rule-based questions.
+
+    python -m benchmarks.bench_batch --dataset Final_Dataset_Generated.json
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS
+
+RULE_QUESTIONS = ["కవిత్రయం ఎవరు?", "16వ శతాబ్దం కవులు జాబితా", "అష్టదిగ్గజాలు గురించి"]
+
+
+def build_workload(dataset_path, size, seed=0):
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        names = [p['name_telugu'] for p in json.load(f)]
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    rng = random.Random(seed)
+    workload = []
+    for i in range(size):
+        if i % 10 == 9:
+            workload.append(rng.choice(RULE_QUESTIONS))
+        else:
+            workload.append(rng.choice(templates).replace("POET_NAME", rng.choice(names)))
+    return workload
+
+
+def queries_per_second(func, workload, batch_size, min_seconds=0.5):
+    done = 0
+    start = time.perf_counter()
+    while True:
+        for offset in range(0, len(workload), batch_size):
+            func(workload[offset:offset + batch_size])
+        done += len(workload)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return done / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="Final_Dataset_Generated.json")
+    parser.add_argument("--queries", type=int, default=2048)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        bot = ChatbotEngine(args.dataset, snapshot_dir=snapshot_dir, verbose=False)
+    workload = build_workload(args.dataset, args.queries)
+
+    def single(batch):
+        return [bot.get_response(q) for q in batch]
+
+    # The batch API must answer exactly like the single-question path
+    assert bot.get_responses(workload) == single(workload)
+
+    print_rows = []
+    baseline = queries_per_second(single, workload, 1)
+    batch_size = 1
+    while batch_size <= 1024:
+        print_rows.append((batch_size, queries_per_second(bot.get_responses, workload, batch_size)))
+        batch_size *= 2
+
+    print(f"get_response loop : {baseline:10.0f} queries/sec")
+    for batch_size, qps in print_rows:
+        print(f"batch size {batch_size:5d}   : {qps:10.0f} queries/sec  ({qps / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Replays conversation logs (chat_history.jsonl records, or the old
+chat_history.log "ME: <question>" lines) through the engine
+with and without the response cache and reports throughput, hit rate and
+evictions. Without --log, a synthetic log with Zipf-distributed repeats and
+spelling variants (case, spacing, punctuation) is generated first; the cache
+keys on the exact (NFC) question, so each variant is cached separately.
+
+    python -m benchmarks.bench_cache --log chat_history.jsonl --cache-sizes 64 1024
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS
+
+RULE_QUESTIONS = ["కవిత్రయం ఎవరు?", "అష్టదిగ్గజాలు గురించి", "తిక్కన సమకాలికులు ఎవరు?", "'నీతి' శైలి కవులు ఎవరు?"]
+
+
+def read_log_questions(paths):
+    questions = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("{"):
+                    # A JSON Lines record (conversation_log.ConversationLogger)
+                    question = json.loads(line).get("question")
+                elif line.startswith("ME: "):
+                    question = line[len("ME: "):].rstrip("\n")
+                else:
+                    continue
+                if isinstance(question, str) and question.lower() != "quit":
+                    questions.append(question)
+    return questions
+
+
+def _variant(rng, question):
+    choice = rng.random()
+    if choice < 0.2:
+        return question.upper()
+    if choice < 0.35:
+        return "  " + question.replace(" ", "  ") + " "
+    if choice < 0.5:
+        return question.rstrip("?") + "??"
+    return question
+
+
+def write_synthetic_log(path, dataset_path, turns, distinct, seed=0):
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        names = [p['name_telugu'] for p in json.load(f)]
+    rng = random.Random(seed)
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    pool = RULE_QUESTIONS + [rng.choice(templates).replace("POET_NAME", rng.choice(names))
+                             for _ in range(distinct - len(RULE_QUESTIONS))]
+    # Zipf-like popularity: the i-th most popular question has weight 1 / (i + 1)
+    weights = [1.0 / (rank + 1) for rank in range(len(pool))]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Chat session started at: synthetic\n\n")
+        for question in rng.choices(pool, weights=weights, k=turns):
+            f.write(f"ME: {_variant(rng, question)}\nBOT: ...\n\n")
+
+
+def replay(bot, questions):
+    start = time.perf_counter()
+    for question in questions:
+        bot.get_response(question)
+    return len(questions) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", action="append", help="chat log to replay (repeatable)")
+    parser.add_argument("--dataset", default="Final_Dataset_Generated.json")
+    parser.add_argument("--turns", type=int, default=20000, help="synthetic log length")
+    parser.add_argument("--distinct", type=int, default=2000, help="distinct questions in the synthetic log")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the log this many times")
+    parser.add_argument("--cache-sizes", type=int, nargs="+", default=[64, 512, 4096])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        log_paths = args.log
+        if not log_paths:
+            log_paths = [os.path.join(work_dir, "synthetic_chat_history.log")]
+            write_synthetic_log(log_paths[0], args.dataset, args.turns, args.distinct)
+        questions = read_log_questions(log_paths) * args.repeat
+
+        ChatbotEngine(args.dataset, snapshot_dir=work_dir, verbose=False)  # warm the snapshot
+        bots = {size: ChatbotEngine(args.dataset, snapshot_dir=work_dir, cache_size=size, verbose=False)
+                for size in [0] + args.cache_sizes}
+
+    print(f"replaying {len(questions)} questions ({len(set(questions))} distinct raw forms)")
+    baseline = replay(bots[0], questions)
+    print(f"{'no cache':>12}: {baseline:9.0f} q/s")
+    for size in args.cache_sizes:
+        qps = replay(bots[size], questions)
+        stats = bots[size].cache_stats()
+        print(f"{f'size {size}':>12}: {qps:9.0f} q/s ({qps / baseline:5.1f}x)  hit rate {stats['hit_rate']:.1%}  "
+              f"evictions {stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Conversation logging cost on the caller's thread: the old per-turn
+write + flush to a text log versus ConversationLogger.log() (queued, written
+in batches by a background thread), from several threads at once. Also checks
+that every record reached the (rotated) JSON Lines files.
+
+    python -m benchmarks.bench_chat_log --threads 8 --records 20000
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from conversation_log import ConversationLogger
+
+QUESTION = "నన్నయ భట్టారకుడు ఎవరు?"
+ANSWER = "నన్నయ భట్టారకుడు గారి గురించి ఇక్కడ కొంత సమాచారం ఉంది: \nఆదికవి, వాగానుశాసనుడు. " * 3
+
+
+def run_threads(threads, records, log_one):
+    """Per-call latencies (seconds) of log_one(thread, index) across all threads."""
+    latencies = [[] for _ in range(threads)]
+
+    def work(thread):
+        for index in range(records):
+            start = time.perf_counter()
+            log_one(thread, index)
+            latencies[thread].append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=work, args=(thread,)) for thread in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sorted(latency for per_thread in latencies for latency in per_thread)
+
+
+def report(label, latencies, elapsed):
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:<22}: median {statistics.median(latencies) * 1e6:8.2f} us  p99 {p99 * 1e6:8.2f} us  "
+          f"max {latencies[-1] * 1e6:9.1f} us  ({len(latencies) / elapsed:9.0f} records/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--records", type=int, default=20000, help="records per thread")
+    parser.add_argument("--max-bytes", type=int, default=4 * 2 ** 20, help="rotation size of the JSON Lines log")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # The old run_chatbot.py behaviour: write and flush each exchange (serialised by a lock across threads)
+        lock = threading.Lock()
+        with open(os.path.join(work_dir, "chat_history.log"), "w", encoding="utf-8") as log_file:
+            def write_and_flush(thread, index):
+                with lock:
+                    log_file.write(f"ME: {QUESTION}\n")
+                    log_file.write(f"BOT: {ANSWER}\n\n")
+                    log_file.flush()
+            start = time.perf_counter()
+            latencies = run_threads(args.threads, args.records, write_and_flush)
+            report("write + flush per turn", latencies, time.perf_counter() - start)
+
+        path = os.path.join(work_dir, "chat_history.jsonl")
+        logger = ConversationLogger(path, max_bytes=args.max_bytes, backup_count=1000,
+                                    queue_size=args.threads * args.records)
+        start = time.perf_counter()
+        latencies = run_threads(args.threads, args.records, lambda thread, index: logger.log(
+            QUESTION, ANSWER, intent="ask_biography", score=0.91, latency=0.0012, session=f"s{thread}", turn=index))
+        elapsed = time.perf_counter() - start
+        logger.close()
+        report("ConversationLogger.log", latencies, elapsed)
+
+        files = glob.glob(path + "*")
+        lines = 0
+        for name in files:
+            with open(name, encoding="utf-8") as f:
+                for line in f:
+                    json.loads(line)
+                    lines += 1
+        print(f"JSON Lines log: {lines} records in {len(files)} files (largest "
+              f"{max(os.path.getsize(name) for name in files) / 2 ** 20:.2f} MiB), "
+              f"{logger.written} written, {logger.dropped} dropped")
+
+
+if __name__ == "__main__":
+    main()
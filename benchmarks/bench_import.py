@@ -0,0 +1,87 @@
+"""
+Start-up cost of short-lived processes, from `python -X importtime`:
+importing chatbot_engine (scikit-learn is now only imported to build a KB,
+not to load a snapshot or answer from one) versus importing it with
+scikit-learn loaded up front as before, with the heaviest packages of each;
+then the wall time of one-shot `run_chatbot.py --ask` runs (KB snapshot
+already saved) for a question a rule answers and for one that needs retrieval.
+
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# What chatbot_engine's dependencies used to import at module level
+EAGER_IMPORTS = ["sklearn.feature_extraction.text", "sklearn.preprocessing"]
+RULE_QUESTION = "కవిత్రయం ఎవరు?"
+RETRIEVAL_QUESTION = "వేమన యోగి ఎవరు?"
+
+
+def import_times(args, cwd=REPO_DIR):
+    """(wall seconds, {module: (self us, cumulative us, nesting depth)}) of running python -X importtime <args>."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, capture_output=True,
+                            text=True, check=True)
+    elapsed = time.perf_counter() - start
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return elapsed, modules
+
+
+def by_package(modules):
+    """Total self import time (us) per top-level package."""
+    totals = Counter()
+    for name, (self_us, _, _) in modules.items():
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dataset", default="Final_Dataset_Generated.json")
+    parser.add_argument("--top", type=int, default=5, help="heaviest packages to list")
+    args = parser.parse_args()
+
+    print("import chatbot_engine: median cumulative import time; heaviest packages (ms)")
+    for label, imports in (("lazy scikit-learn", ["chatbot_engine"]),
+                           ("eager scikit-learn", EAGER_IMPORTS + ["chatbot_engine"])):
+        runs = [import_times(["-c", "import " + ", ".join(imports)])[1] for _ in range(args.repeat)]
+        # Only top-level imports of these modules (not the interpreter's own start-up imports)
+        total = statistics.median(sum(cumulative for name, (_, cumulative, depth) in modules.items()
+                                      if depth == 0 and name in imports) for modules in runs)
+        heaviest = by_package(runs[-1]).most_common(args.top)
+        print(f"  {label:<19}: {total / 1000:8.1f} ms   "
+              + ", ".join(f"{package} {us / 1000:.0f}" for package, us in heaviest))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        shutil.copy(os.path.join(REPO_DIR, args.dataset), os.path.join(work_dir, "Final_Dataset_Generated.json"))
+        script = os.path.join(REPO_DIR, "run_chatbot.py")
+        log_file = os.path.join(work_dir, "chat_history.jsonl")
+        # The first run builds and saves the KB snapshot
+        import_times([script, "--ask", RULE_QUESTION, "--log-file", log_file], cwd=work_dir)
+        print(f"run_chatbot.py --ask (median wall time, n={args.repeat})")
+        for label, question in (("rule question", RULE_QUESTION), ("retrieval question", RETRIEVAL_QUESTION)):
+            runs = [import_times([script, "--ask", question, "--log-file", log_file], cwd=work_dir)
+                    for _ in range(args.repeat)]
+            sklearn = "sklearn" in by_package(runs[-1][1])
+            print(f"  {label:<19}: {statistics.median(elapsed for elapsed, _ in runs) * 1000:8.1f} ms   "
+                  f"scikit-learn imported: {'yes' if sklearn else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Instrumentation overhead: per-question get_responses latency with
+instrument=False versus instrument=True (response cache off, so every
+question takes the rule scan and, when no rule matches, retrieval).
+
+    python -m benchmarks.bench_instrumentation --poets 1000 --questions 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_poets, write_dataset
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS
+
+
+def seconds_per_question(bot, questions):
+    start = time.perf_counter()
+    for question in questions:
+        bot.get_responses([question])
+    return (time.perf_counter() - start) / len(questions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    poets = generate_poets(args.poets)
+    rng = random.Random(0)
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    rule_questions = ["కవిత్రయం ఎవరు?", "అష్టదిగ్గజాలు ఎవరు?", "12వ శతాబ్ద కవులు జాబితా"]
+    questions = [rng.choice(rule_questions) if rng.random() < 0.3 else
+                 rng.choice(templates).replace("POET_NAME", rng.choice(poets)['name_telugu'])
+                 for _ in range(args.questions)]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        dataset_path = os.path.join(work_dir, "dataset.json")
+        write_dataset(dataset_path, poets)
+        bots = {enabled: ChatbotEngine(dataset_path, snapshot_dir=None, cache_size=0, instrument=enabled,
+                                       verbose=False)
+                for enabled in (False, True)}
+
+    # Rounds alternate between the two engines so warm-up and drift hit both; best round wins
+    timings = {enabled: float("inf") for enabled in bots}
+    for _ in range(args.rounds):
+        for enabled, bot in bots.items():
+            timings[enabled] = min(timings[enabled], seconds_per_question(bot, questions))
+    print(f"{args.poets} poets, {len(questions)} questions (30% rule hits)")
+    print(f"instrument=False : {timings[False] * 1e6:8.1f} us/question")
+    print(f"instrument=True  : {timings[True] * 1e6:8.1f} us/question "
+          f"({(timings[True] / timings[False] - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
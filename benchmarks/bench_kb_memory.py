@@ -0,0 +1,103 @@
+"""
+Retrieval KB memory benchmark: the legacy layout (one document string,
+metadata dict and TF-IDF row per answer and per filled-in question template)
+versus CompactKB, on synthetic datasets. Reports KB rows, stored TF-IDF
+non-zeros, memory held by the built KB (tracemalloc, which also sees numpy
+buffers) and peak RSS during the build. Each run is a separate process so
+peak RSS is per run.
+
+    python -m benchmarks.bench_kb_memory --poets 1000 10000
+"""
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_poets
+
+
+def build_legacy_kb(poets, poet_answers, questions_by_intent, ngram_range):
+    """The KB as ChatbotEngine built it before CompactKB: (documents, metadata, vectorizer, kb_vectors)."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    documents = []
+    metadata = []
+    for poet in poets:
+        for intent_type, answer_text, extra_meta in poet_answers(poet):
+            answer_index = len(documents)
+            documents.append(answer_text)
+            answer_meta = {'poet_name': poet['name_telugu'], 'type': intent_type,
+                           'is_answer': True, 'doc_index': answer_index}
+            answer_meta.update(extra_meta)
+            metadata.append(answer_meta)
+            for q in questions_by_intent.get(intent_type, []):
+                documents.append(q.replace("POET_NAME", poet['name_telugu']))
+                metadata.append({'is_answer': False, 'points_to_index': answer_index})
+    vectorizer = TfidfVectorizer(ngram_range=ngram_range)
+    kb_vectors = vectorizer.fit_transform(documents)
+    return documents, metadata, vectorizer, kb_vectors
+
+
+def run_once(layout, num_poets):
+    """Builds one KB in this process and prints its measurements as JSON."""
+    from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS, TFIDF_NGRAM_RANGE
+    from compact_kb import build_compact_kb
+
+    def build():
+        if layout == "legacy":
+            kb = build_legacy_kb(poets, ChatbotEngine._poet_answers, RETRIEVAL_QUESTIONS, TFIDF_NGRAM_RANGE)
+            return kb, len(kb[0]), kb[3].nnz
+        kb, vectorizer = build_compact_kb(poets, ChatbotEngine._poet_answers, RETRIEVAL_QUESTIONS,
+                                          ngram_range=TFIDF_NGRAM_RANGE)
+        return (kb, vectorizer), kb.num_entries, kb.nnz
+
+    poets = generate_poets(num_poets)
+    start = time.perf_counter()
+    kb, rows, nnz = build()
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    # RSS keeps the build's freed temporaries, so measure what the KB itself
+    # holds on a second, traced build
+    del kb
+    gc.collect()
+    tracemalloc.start()
+    kb = build()
+    gc.collect()
+    retained_mb = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    print(json.dumps({"rows": rows, "nnz": nnz, "seconds": elapsed, "retained_mb": retained_mb,
+                      "peak_rss_mb": peak_rss_mb}))
+
+
+def measure(layout, num_poets):
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_kb_memory", "--run", layout,
+                             "--poets", str(num_poets)], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--run", choices=["legacy", "compact"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_once(args.run, args.poets[0])
+        return
+
+    print(f"{'poets':>7} {'layout':>8} {'kb rows':>9} {'nnz':>10} {'build s':>8} {'KB MiB':>8} {'peak RSS MiB':>13}")
+    for num_poets in args.poets:
+        for layout in ("legacy", "compact"):
+            result = measure(layout, num_poets)
+            print(f"{num_poets:7d} {layout:>8} {result['rows']:9d} {result['nnz']:10d} {result['seconds']:8.1f} "
+                  f"{result['retained_mb']:8.1f} {result['peak_rss_mb']:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
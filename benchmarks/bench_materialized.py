@@ -0,0 +1,83 @@
+"""
+Materialised answers for the aggregate rules (kavitrayam, ashtadiggajalu,
+list_by_era, list_by_genre): build time and memory of the table next to the
+poet index it is built from, and per-question latency of computing an answer
+from the index versus looking it up, on synthetic datasets.
+
+    python -m benchmarks.bench_materialized --poets 1000 10000 100000 --genres 12 48
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_poets
+from chatbot_engine import ChatbotEngine
+from instrumentation import Instrumentation
+
+
+def poet_tables(poets):
+    """An engine with only the poet-side tables (all the rule handlers need)."""
+    bot = ChatbotEngine.__new__(ChatbotEngine)
+    bot.data_all = poets
+    bot.instrumentation = Instrumentation(enabled=True)
+    bot._index_poets()
+    return bot
+
+
+def retained_mib(func):
+    """(result, MiB still allocated once func() returns) of func()."""
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[0] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def median_us(func, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--genres", type=int, nargs="+", default=[12], help="distinct poem genres")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'poets':>7} {'genres':>6} {'entries':>7} {'index ms':>9} {'table ms':>9} {'index MiB':>10} "
+          f"{'table MiB':>10} {'computed us':>12} {'lookup us':>10}")
+    for num_poets in args.poets:
+        for num_genres in args.genres:
+            poets = generate_poets(num_poets, num_genres=num_genres)
+            bot = poet_tables(poets)
+            start = time.perf_counter()
+            bot._index_poets()
+            table_ms = bot.instrumentation.stages["materialize"] * 1000
+            index_ms = (time.perf_counter() - start) * 1000 - table_ms
+            _, total_mib = retained_mib(bot._index_poets)
+            table, table_mib = retained_mib(lambda: bot._materialize_answers(bot.poet_index, bot.poets_by_id))
+            index_mib = total_mib - table_mib
+
+            # Questions the table answers with a parameter: every century and exact genre
+            rng = random.Random(0)
+            keys = [key for key in table if key[1] is not None]
+            keys = [rng.choice(keys) for _ in range(args.queries)]
+            compute = {"list_by_era": bot._list_by_era_answer, "list_by_genre": bot._list_by_genre_answer}
+            for rule, param in keys[:20]:
+                assert table[rule, param] == compute[rule](bot.poet_index, param)
+            computed = median_us(lambda rule, param: compute[rule](bot.poet_index, param), keys)
+            lookup = median_us(lambda rule, param: table.get((rule, param)), keys)
+            print(f"{num_poets:7d} {num_genres:6d} {len(table):7d} {index_ms:9.1f} {table_ms:9.1f} {index_mib:10.2f} "
+                  f"{table_mib:10.2f} {computed:12.1f} {lookup:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
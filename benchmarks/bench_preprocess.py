@@ -0,0 +1,85 @@
+"""
+Preprocessing benchmark: records/sec and peak RSS of preprocess_raw_data
+(whole file in memory) versus preprocess_streaming at several worker counts,
+on a synthetic raw corpus. Each run is a separate process so peak RSS is
+measured per run.
+
+    python -m benchmarks.bench_preprocess --paragraphs 1000000 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import iter_poets, write_raw_dataset
+
+
+def run_once(mode, raw_path, output_path, workers, chunk_size):
+    """Runs one preprocessing pass in this process and prints its measurements as JSON."""
+    import contextlib
+    import io
+    import preprocessing_code
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "memory":
+            preprocessing_code.preprocess_raw_data(raw_path, output_path)
+        else:
+            preprocessing_code.preprocess_streaming(raw_path, output_path, workers=workers, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux; RUSAGE_CHILDREN reports the largest pool worker
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }))
+
+
+def measure(mode, raw_path, output_path, workers, chunk_size):
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_preprocess", "--run", mode,
+                             "--raw", raw_path, "--output", output_path, "--workers", str(workers),
+                             "--chunk-size", str(chunk_size)], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--json-lines", action="store_true", help="generate the raw corpus as JSON Lines")
+    parser.add_argument("--skip-memory", action="store_true", help="skip the in-memory baseline")
+    parser.add_argument("--raw", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("--run", choices=["memory", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_once(args.run, args.raw, args.output, args.workers[0], args.chunk_size)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        raw_path = os.path.join(work_dir, "raw_dataset.jsonl" if args.json_lines else "raw_dataset.json")
+        output_path = os.path.join(work_dir, "final_dataset")
+        start = time.perf_counter()
+        write_raw_dataset(raw_path, iter_poets(args.paragraphs), json_lines=args.json_lines)
+        print(f"generated {args.paragraphs} raw records ({os.path.getsize(raw_path) / 2 ** 20:.0f} MiB) "
+              f"in {time.perf_counter() - start:.1f} s")
+
+        runs = [] if args.skip_memory or args.json_lines else [("memory", 1)]
+        runs += [("stream", workers) for workers in args.workers]
+        print(f"{'mode':>18} {'records/s':>10} {'seconds':>8} {'peak RSS MiB':>13} {'worker RSS MiB':>15}")
+        for mode, workers in runs:
+            result = measure(mode, raw_path, output_path, workers, args.chunk_size)
+            label = "in-memory" if mode == "memory" else f"stream x{workers}"
+            worker_rss = f"{result['worker_peak_rss_mb']:15.0f}" if mode == "stream" and workers > 1 else f"{'-':>15}"
+            print(f"{label:>18} {args.paragraphs / result['seconds']:10.0f} {result['seconds']:8.1f} "
+                  f"{result['peak_rss_mb']:13.0f} {worker_rss}")
+
+
+if __name__ == "__main__":
+    main()
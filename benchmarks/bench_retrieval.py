@@ -0,0 +1,68 @@
+"""
+Per-query retrieval latency: full cosine_similarity scan over the
+materialised KB matrix (the old get_response path) versus the engine's
+factored search, as the KB grows.
+
+    python -m benchmarks.bench_retrieval --poets 100 1000 5000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sklearn.metrics.pairwise import cosine_similarity
+
+from benchmarks.synthetic import generate_poets, write_dataset
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS
+
+
+def median_us(func, queries):
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        func(q)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    print(f"{'poets':>7} {'kb rows':>9} {'full scan (us)':>15} {'inverted (us)':>14}")
+    for num_poets in args.poets:
+        with tempfile.TemporaryDirectory() as work_dir:
+            dataset_path = os.path.join(work_dir, "dataset.json")
+            poets = generate_poets(num_poets)
+            write_dataset(dataset_path, poets)
+            bot = ChatbotEngine(dataset_path, snapshot_dir=None, verbose=False)
+
+        rng = random.Random(0)
+        queries = [rng.choice(templates).replace("POET_NAME", rng.choice(poets)['name_telugu'])
+                   for _ in range(args.queries)]
+
+        kb_vectors = bot.kb.materialize()
+
+        def full_scan(q):
+            scores = cosine_similarity(bot.vectorizer.transform([q]), kb_vectors)
+            best_index = scores.argmax()
+            return best_index, scores[0, best_index]
+
+        def inverted(q):
+            return bot._score_questions([q], k=1)[0]
+
+        for q in queries[:50]:
+            best_index, best_score = full_scan(q)
+            assert best_score < 0.25 or inverted(q)[0][0] == best_index
+
+        print(f"{num_poets:7d} {bot.kb.num_entries:9d} {median_us(full_scan, queries):15.1f} "
+              f"{median_us(inverted, queries):14.1f}")
+
+
+if __name__ == "__main__":
+    main()
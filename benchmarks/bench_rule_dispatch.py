@@ -0,0 +1,77 @@
+"""
+Rule pass latency: trying every regex in order (the old get_response loop)
+versus RuleDispatcher with its literal prefilter, on questions that fall
+through to retrieval, on rule questions and on long inputs. Prints the
+dispatcher's per-rule counters at the end.
+
+    python -m benchmarks.bench_rule_dispatch
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS
+
+RULE_QUESTIONS = [
+    "కవిత్రయం ఎవరు?", "అష్టదిగ్గజాలు గురించి చెప్పు", "16వ శతాబ్దం కవులు జాబితా", "15 va satabda list",
+    "తిక్కన సమకాలికులు ఎవరు?", "'మనుచరిత్రము' రచన ఎవరు రాశారు?", "'నీతి' శైలి కవులు ఎవరు?",
+    "'భక్తి నివేదన' genre poem from తిక్కన",
+]
+
+
+def median_us(func, questions):
+    timings = []
+    for question in questions:
+        start = time.perf_counter()
+        func(question)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="Final_Dataset_Generated.json")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        bot = ChatbotEngine(args.dataset, snapshot_dir=snapshot_dir, verbose=False)
+    with open(args.dataset, "r", encoding="utf-8") as f:
+        names = [p['name_telugu'] for p in json.load(f)]
+
+    rng = random.Random(0)
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    workloads = {
+        "retrieval questions": [rng.choice(templates).replace("POET_NAME", rng.choice(names))
+                                for _ in range(args.queries)],
+        "rule questions": [rng.choice(RULE_QUESTIONS) for _ in range(args.queries)],
+        "long inputs (480 chars)": ["'" + "ఆ " * 120 + "' శైలి " + "ఆ" * 110 + " poets"] * 20,
+        "oversized input (1500 chars)": ["ఆ " * 750] * 5,
+    }
+
+    def sequential(question):
+        for rule in bot.rule_based_intents:
+            if rule.pattern.search(question):
+                return rule
+
+    print(f"{'workload':<30} {'sequential (us)':>16} {'dispatcher (us)':>16}")
+    bot.rule_dispatcher.reset_stats()
+    for name, questions in workloads.items():
+        before = median_us(sequential, questions)
+        after = median_us(bot.rule_dispatcher.match, questions)
+        print(f"{name:<30} {before:16.2f} {after:16.2f}")
+
+    dispatcher = bot.rule_dispatcher
+    print(f"\nPer-rule counters (all workloads; {dispatcher.gated_inputs} inputs rejected by the literal gate, "
+          f"{dispatcher.oversized_inputs} too long for some rules):")
+    for row in bot.rule_stats():
+        print(f"  {row['rule']:<28} hits={row['hits']:<5} regex_calls={row['regex_calls']:<5} "
+              f"skipped={row['prefilter_skips']:<5} too_long={row['oversized_skips']:<5} "
+              f"regex_time={row['regex_time_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
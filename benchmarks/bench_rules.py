@@ -0,0 +1,129 @@
+"""
+Per-rule handler latency on a synthetic dataset: the old linear scans over
+data_all versus the PoetIndex lookups the handlers use now.
+
+    python -m benchmarks.bench_rules --poets 10000
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+
+from benchmarks.synthetic import generate_poets
+from chatbot_engine import ChatbotEngine
+from instrumentation import Instrumentation
+
+
+# --- Reference implementations: the linear scans the handlers used to do ---
+
+def linear_find_poet_by_name(poets_by_name, name_query):
+    clean_query = name_query.strip().lower()
+    if not clean_query:
+        return None
+    for full_name, poet_data in poets_by_name.items():
+        if clean_query in full_name.lower():
+            return poet_data
+    return None
+
+
+def linear_list_by_era(data_all, century):
+    search_term = f"{century}వ శతాబ్దం"
+    return [p['name_telugu'] for p in data_all if search_term in p['era']]
+
+
+def linear_contemporaries(data_all, poets_by_name, name):
+    target = linear_find_poet_by_name(poets_by_name, name)
+    return [p['name_telugu'] for p in data_all if p['era'] == target['era'] and p['id'] != target['id']]
+
+
+def linear_by_work(data_all, work_query):
+    found = []
+    for poet in data_all:
+        for work in poet['famous_works']:
+            if work_query in work.lower():
+                found.append(poet['name_telugu'])
+                break
+    return found
+
+
+def linear_by_genre(data_all, genre_query):
+    found = set()
+    for poet in data_all:
+        for poem in poet.get('poems', []):
+            if genre_query in poem['genre'].lower():
+                found.add(poet['name_telugu'])
+                break
+    return found
+
+
+def linear_ashtadiggajalu(data_all):
+    return [p['name_telugu'] for p in data_all if "అష్టదిగ్గజాలు" in p['biography_summary']]
+
+
+def arg_match(*groups):
+    """A regex match object whose group(1), group(2)... are `groups`."""
+    return re.match("\x00".join("(.*)" for _ in groups), "\x00".join(groups), re.DOTALL)
+
+
+def median_us(func, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    poets = generate_poets(args.poets)
+    # Only the poet-side tables are needed for the rule handlers
+    bot = ChatbotEngine.__new__(ChatbotEngine)
+    bot.data_all = poets
+    bot.instrumentation = Instrumentation()
+    start = time.perf_counter()
+    bot._index_poets()
+    print(f"{args.poets} poets, index build: {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    rng = random.Random(0)
+    sample = [rng.choice(poets) for _ in range(args.queries)]
+    name_queries = [p['name_telugu'].split()[0] for p in sample]
+    works = [p['famous_works'][0].lower().split()[0] for p in sample]
+    genres = [p['poems'][0]['genre'].lower().split()[0] for p in sample]
+    centuries = [str(rng.randint(11, 20)) for _ in sample]
+
+    cases = [
+        ("find_poet_by_name",
+         lambda q: linear_find_poet_by_name(bot.poets_by_name, q), bot._find_poet_by_name,
+         [(q,) for q in name_queries], [(q,) for q in name_queries]),
+        ("list_by_era",
+         lambda c: linear_list_by_era(poets, c), bot._handle_list_by_era,
+         [(c,) for c in centuries], [(arg_match(c),) for c in centuries]),
+        ("contemporaries",
+         lambda q: linear_contemporaries(poets, bot.poets_by_name, q), bot._handle_contemporaries,
+         [(q,) for q in name_queries], [(arg_match(q),) for q in name_queries]),
+        ("find_poet_by_work",
+         lambda w: linear_by_work(poets, w), bot._handle_find_poet_by_work,
+         [(w,) for w in works], [(arg_match(w),) for w in works]),
+        ("list_by_genre",
+         lambda g: linear_by_genre(poets, g), bot._handle_list_by_genre,
+         [(g,) for g in genres], [(arg_match(g),) for g in genres]),
+        ("ashtadiggajalu",
+         lambda: linear_ashtadiggajalu(poets), bot._handle_ashtadiggajalu,
+         [()] * len(sample), [(None,)] * len(sample)),
+    ]
+
+    print(f"{'rule':<20} {'linear (us)':>12} {'indexed (us)':>13} {'speedup':>8}")
+    for name, linear, indexed, linear_args, indexed_args in cases:
+        before = median_us(linear, linear_args)
+        after = median_us(indexed, indexed_args)
+        print(f"{name:<20} {before:12.1f} {after:13.1f} {before / after:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
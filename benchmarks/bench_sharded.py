@@ -0,0 +1,66 @@
+"""
+Sharded retrieval scaling: retrieval throughput (questions/s) of the word
+retriever with the main KB scored in-process (0 shards) versus split across
+1, 2, 4... worker processes (sharded_kb), for single questions and batches.
+Every configuration's results are checked against the in-process ones.
+
+    python -m benchmarks.bench_sharded --poets 20000 --shards 0 1 2 4 --batch 1 64
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_poets, write_dataset
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS
+from retrievers import make_retriever
+
+
+def questions_per_s(retriever, questions, batch, k):
+    start = time.perf_counter()
+    for first in range(0, len(questions), batch):
+        retriever.search(questions[first:first + batch], k=k)
+    return len(questions) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, default=20000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 64], help="questions per search call")
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    poets = generate_poets(args.poets)
+    with tempfile.TemporaryDirectory() as work_dir:
+        dataset_path = os.path.join(work_dir, "dataset.json")
+        write_dataset(dataset_path, poets)
+        bot = ChatbotEngine(dataset_path, snapshot_dir=None, cache_size=0, verbose=False)
+
+    rng = random.Random(0)
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    questions = [rng.choice(templates).replace("POET_NAME", rng.choice(poets)['name_telugu'])
+                 for _ in range(args.queries)]
+    print(f"{args.poets} poets, {bot.kb.num_rows} KB rows, k={args.k}, {os.cpu_count()} CPUs; questions/s")
+    print(f"{'shards':>6} {'start s':>8} " + " ".join(f"{f'batch {batch}':>10}" for batch in args.batch)
+          + f" {'speedup':>8}")
+    expected = make_retriever("word", [bot.kb], bot.vectorizer).search(questions, k=args.k)
+    baseline = None
+    for shards in args.shards:
+        start = time.perf_counter()
+        retriever = make_retriever("word", [bot.kb], bot.vectorizer, shards=shards)
+        startup = time.perf_counter() - start
+        try:
+            assert retriever.search(questions, k=args.k) == expected, "sharded results differ"
+            throughput = [questions_per_s(retriever, questions, batch, args.k) for batch in args.batch]
+        finally:
+            retriever.close()
+        baseline = baseline or throughput[-1]
+        print(f"{shards:6d} {startup:8.2f} " + " ".join(f"{rate:10.0f}" for rate in throughput)
+              + f" {throughput[-1] / baseline:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Startup-time benchmark: cold KB build (load + build + TF-IDF fit + snapshot
+save) versus loading the compiled KB snapshot versus an in-memory build that
+writes nothing. Also reports the bytes each start writes (Linux
+/proc/self/io wchar).
+
+    python -m benchmarks.bench_startup --dataset Final_Dataset_Generated.json --repeat 5
+    python -m benchmarks.bench_startup --poets 10000 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import iter_poets, write_dataset
+from chatbot_engine import ChatbotEngine
+
+
+def written_bytes():
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def time_engine(dataset_path, **options):
+    """(seconds, bytes written) of one engine construction."""
+    written = written_bytes()
+    start = time.perf_counter()
+    ChatbotEngine(dataset_path, verbose=False, **options)
+    return time.perf_counter() - start, written_bytes() - written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="Final_Dataset_Generated.json")
+    parser.add_argument("--poets", type=int, help="use a synthetic dataset of this many poets instead")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        dataset_path = os.path.abspath(args.dataset)
+        if args.poets:
+            dataset_path = os.path.join(work_dir, "dataset.json")
+            write_dataset(dataset_path, iter_poets(args.poets))
+        snapshot_dir = os.path.join(work_dir, "kb_snapshot")
+        modes = [("cold build", dict(snapshot_dir=snapshot_dir, rebuild_kb=True)),
+                 ("snapshot load", dict(snapshot_dir=snapshot_dir)),
+                 ("in-memory", dict(snapshot_dir=None))]
+        runs = {label: [time_engine(dataset_path, **options) for _ in range(args.repeat)] for label, options in modes}
+
+    print(f"dataset: {f'{args.poets} synthetic poets' if args.poets else args.dataset}")
+    for label, timings in runs.items():
+        seconds = [elapsed for elapsed, _ in timings]
+        written = statistics.median(written for _, written in timings)
+        print(f"{label:<14}: median {statistics.median(seconds) * 1000:9.2f} ms  (min {min(seconds) * 1000:.2f} ms, "
+              f"n={args.repeat})  wrote {written / 2 ** 20:8.2f} MiB")
+    cold, warm = (statistics.median(elapsed for elapsed, _ in runs[label]) for label in ("cold build", "snapshot load"))
+    print(f"speedup       : {cold / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
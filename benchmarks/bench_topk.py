@@ -0,0 +1,77 @@
+"""
+Multi-answer retrieval: latency of ChatbotEngine.retrieve(question, k)
+(partial top-k over k x max_rows_per_answer rows, collapsed by answer) versus
+scoring every row, sorting them all and de-duplicating by answer in Python.
+Also times retrieve() with an intent filter and with a poet filter.
+
+    python -m benchmarks.bench_topk --poets 1000 10000 --k 5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_poets, write_dataset
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS
+
+
+def full_sort_distinct(bot, question, k):
+    """The straightforward version: every matching row, fully sorted, first k distinct answers."""
+    matches = bot._score_questions([question], k=bot.kb.num_rows, threshold=bot.retrieval_threshold)[0]
+    seen, results = set(), []
+    for row, score in matches:
+        answer_row = int(bot.kb.answer_rows([row])[0])
+        if answer_row not in seen:
+            seen.add(answer_row)
+            results.append((answer_row, score))
+            if len(results) == k:
+                break
+    return results
+
+
+def median_us(func, questions):
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        func(question)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    print(f"k={args.k}; median latency per question (us)")
+    print(f"{'poets':>7} {'full sort':>10} {'retrieve':>9} {'+intent':>8} {'+poet':>8}")
+    for num_poets in args.poets:
+        poets = generate_poets(num_poets)
+        with tempfile.TemporaryDirectory() as work_dir:
+            dataset_path = os.path.join(work_dir, "dataset.json")
+            write_dataset(dataset_path, poets)
+            bot = ChatbotEngine(dataset_path, snapshot_dir=None, cache_size=0, verbose=False)
+
+        rng = random.Random(0)
+        questions = [rng.choice(templates).replace("POET_NAME", rng.choice(poets)['name_telugu'])
+                     for _ in range(args.queries)]
+        # Results must agree (scores; rows can differ only within exact ties)
+        for question in questions[:20]:
+            expected = [score for _, score in full_sort_distinct(bot, question, args.k)]
+            assert [answer.score for answer in bot.retrieve(question, k=args.k)] == expected
+
+        poet_name = poets[0]['name_telugu']
+        timings = [median_us(lambda q: full_sort_distinct(bot, q, args.k), questions),
+                   median_us(lambda q: bot.retrieve(q, k=args.k), questions),
+                   median_us(lambda q: bot.retrieve(q, k=args.k, intent="ask_poem"), questions),
+                   median_us(lambda q: bot.retrieve(q, k=args.k, poet=poet_name), questions)]
+        print(f"{num_poets:7d} " + " ".join(f"{t:{w}.0f}" for t, w in zip(timings, (10, 9, 8, 8))))
+
+
+if __name__ == "__main__":
+    main()
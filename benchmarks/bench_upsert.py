@@ -0,0 +1,68 @@
+"""
+Incremental KB update benchmark: upsert_poet / remove_poet latency versus a
+full KB rebuild, on a synthetic dataset. Also checks that an upserted poet is
+answered from the delta KB before and after compact().
+
+    python -m benchmarks.bench_upsert --poets 2000 --updates 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_poets, write_dataset
+from chatbot_engine import ChatbotEngine
+
+
+def _median_ms(samples):
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, default=2000)
+    parser.add_argument("--updates", type=int, default=50, help="poets upserted (and then removed)")
+    args = parser.parse_args()
+
+    poets = generate_poets(args.poets + args.updates)
+    base, extra = poets[:args.poets], poets[args.poets:]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        dataset_path = os.path.join(work_dir, "poets.json")
+        write_dataset(dataset_path, base)
+        start = time.perf_counter()
+        bot = ChatbotEngine(dataset_path, snapshot_dir=None, verbose=False)
+        rebuild = time.perf_counter() - start
+
+        upserts = []
+        for poet in extra:
+            start = time.perf_counter()
+            bot.upsert_poet(poet)
+            upserts.append(time.perf_counter() - start)
+        probe = extra[-1]
+        question = f"{probe['name_telugu']} ఎక్కడ పుట్టారు?"
+        before_compaction = bot.get_response(question)
+
+        start = time.perf_counter()
+        bot.compact()
+        compaction = time.perf_counter() - start
+        after_compaction = bot.get_response(question)
+
+        removals = []
+        for poet in extra:
+            start = time.perf_counter()
+            bot.remove_poet(poet['id'])
+            removals.append(time.perf_counter() - start)
+
+    print(f"KB: {args.poets} poets, {args.updates} updates")
+    print(f"full rebuild : {rebuild * 1000:9.2f} ms")
+    print(f"upsert_poet  : median {_median_ms(upserts):9.2f} ms  (max {max(upserts) * 1000:.2f} ms)")
+    print(f"remove_poet  : median {_median_ms(removals):9.2f} ms  (max {max(removals) * 1000:.2f} ms)")
+    print(f"compact      : {compaction * 1000:9.2f} ms")
+    print(f"upserted poet answered before compaction: {probe['birth_place_telugu'] in before_compaction}")
+    print(f"upserted poet answered after compaction : {probe['birth_place_telugu'] in after_compaction}")
+
+
+if __name__ == "__main__":
+    main()
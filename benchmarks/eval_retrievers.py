@@ -0,0 +1,128 @@
+"""
+Retriever evaluation: accuracy and per-query latency of each retrieval
+backend on a labelled query set built from RETRIEVAL_QUESTIONS. Every
+template is filled with each poet's name_telugu ("telugu"), the first word of
+a multi-word name ("partial") and, for the poets of the real dataset, common
+Latin spellings of the name ("latin"). A query is correct when the retriever
+answers it (score at or above its threshold) with that poet's answer for the
+template's intent. Out-of-domain questions ("negative") should not be
+answered at all; the false-answer rate is the share of queries answered with a
+wrong answer (for negative queries: answered at all).
+
+    python -m benchmarks.eval_retrievers
+    python -m benchmarks.eval_retrievers --poets 1000 --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_poets, write_dataset
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS
+from compact_kb import PLACEHOLDER
+from retrievers import RETRIEVERS
+
+# Common Latin spellings of the poets in Final_Dataset_Generated.json
+LATIN_SPELLINGS = {
+    "నన్నయ భట్టారకుడు": ["nannaya", "nannaya bhattaraka"],
+    "తిక్కన సోమయాజి": ["tikkana", "tikkana somayaji"],
+    "ఎఱ్ఱాప్రగడ": ["errapragada", "yerrapragada"],
+    "శ్రీనాథుడు": ["srinatha", "sreenatha"],
+    "బమ్మెర పోతన": ["pothana", "bammera pothana"],
+    "వేమన యోగి": ["vemana", "yogi vemana"],
+    "అన్నమాచార్యులు": ["annamacharya", "annamacharyulu"],
+    "అల్లసాని పెద్దన": ["peddana", "allasani peddana"],
+    "శ్రీ కృష్ణదేవరాయలు": ["krishnadevaraya", "sri krishna devarayalu"],
+    "తెనాలి రామకృష్ణుడు": ["tenali ramakrishna", "tenali ramakrishnudu"],
+    "కాంచర్ల గోపన్న": ["gopanna", "kancherla gopanna"],
+    "కందుకూరి వీరేశలింగం": ["veeresalingam", "kandukuri veeresalingam"],
+    "గురజాడ అప్పారావు": ["gurajada", "gurajada apparao"],
+    "శ్రీశ్రీ": ["sri sri", "srisri"],
+    "సి నారాయణ రెడ్డి": ["narayana reddy", "c narayana reddy"],
+}
+
+# Questions about none of the poets, in English and Telugu
+NEGATIVE_QUESTIONS = [
+    "what is the weather", "tell me a joke", "who is modi", "who is the prime minister",
+    "what is the capital of india", "who won the cricket match", "what time is it", "hello how are you",
+    "how do i cook rice", "recommend a movie", "python programming tutorial", "what is 2 plus 2",
+    "who invented the telephone", "where is hyderabad", "how old is the earth",
+    "ఈ రోజు వాతావరణం ఎలా ఉంది?", "నాకు ఒక జోక్ చెప్పు", "భారతదేశ రాజధాని ఏది?", "మోదీ ఎవరు?",
+    "క్రికెట్ మ్యాచ్ ఎవరు గెలిచారు?", "అన్నం ఎలా వండాలి?", "సమయం ఎంత?", "ఒక సినిమా చెప్పండి",
+    "హైదరాబాద్ ఎక్కడ ఉంది?", "టెలిఫోన్ ఎవరు కనుగొన్నారు?",
+]
+
+
+def build_queries(poets):
+    """(group, question, poet_name, intent) for every template, poet and name form."""
+    queries = []
+    for poet in poets:
+        name = poet['name_telugu']
+        forms = [("telugu", name)]
+        if " " in name.strip():
+            forms.append(("partial", name.split()[0]))
+        forms += [("latin", spelling) for spelling in LATIN_SPELLINGS.get(name, [])]
+        intents = [intent for intent in RETRIEVAL_QUESTIONS if intent != "ask_poem" or poet.get('poems')]
+        for intent in intents:
+            for template in RETRIEVAL_QUESTIONS[intent]:
+                for group, form in forms:
+                    queries.append((group, template.replace(PLACEHOLDER, form), name, intent))
+    queries += [("negative", question, None, None) for question in NEGATIVE_QUESTIONS]
+    return queries
+
+
+def evaluate(bot, queries):
+    """Per group: (query count, correct count, false answer count, per-query latencies in seconds)."""
+    results = {}
+    for group, question, poet_name, intent in queries:
+        start = time.perf_counter()
+        matches = bot._score_questions([question], k=1, threshold=bot.retrieval_threshold)
+        elapsed = time.perf_counter() - start
+        # A negative query (poet_name None) is correct when it is not answered
+        correct = not matches[0] and poet_name is None
+        if matches[0]:
+            row = matches[0][0][0]
+            kb = bot.kb if row < bot.kb.num_rows else bot._delta_kb
+            _, answer_intent, answer_poet, _ = kb.answer_of(row)
+            correct = (answer_poet, answer_intent) == (poet_name, intent)
+        count, hits, false_answers, latencies = results.get(group, (0, 0, 0, []))
+        latencies.append(elapsed)
+        results[group] = (count + 1, hits + correct, false_answers + (bool(matches[0]) and not correct), latencies)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="Final_Dataset_Generated.json")
+    parser.add_argument("--poets", type=int, help="use a synthetic dataset of this many poets instead")
+    parser.add_argument("--queries", type=int, help="evaluate a random sample of this many queries")
+    parser.add_argument("--retrievers", nargs="+", default=list(RETRIEVERS), choices=list(RETRIEVERS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        dataset_path = os.path.abspath(args.dataset)
+        if args.poets:
+            dataset_path = os.path.join(work_dir, "dataset.json")
+            write_dataset(dataset_path, generate_poets(args.poets))
+        bots = {}
+        for name in args.retrievers:
+            bots[name] = ChatbotEngine(dataset_path, snapshot_dir=None, cache_size=0, retriever=name, verbose=False)
+
+    queries = build_queries(next(iter(bots.values())).data_all)
+    if args.queries and args.queries < len(queries):
+        queries = random.Random(0).sample(queries, args.queries)
+    print(f"{len(queries)} labelled queries")
+    print(f"{'retriever':>9} {'group':>8} {'queries':>8} {'accuracy':>9} {'false ans':>9} {'median us':>10} "
+          f"{'p99 us':>9}")
+    for name, bot in bots.items():
+        for group, (count, hits, false_answers, latencies) in evaluate(bot, queries).items():
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"{name:>9} {group:>8} {count:8d} {hits / count:9.1%} {false_answers / count:9.1%} "
+                  f"{statistics.median(latencies) * 1e6:10.0f} {p99 * 1e6:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
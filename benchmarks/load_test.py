@@ -0,0 +1,122 @@
+"""
+Local load test for server.py: p50/p99 latency and throughput of POST /chat at
+several concurrency levels. Starts its own server unless --no-server is given.
+
+    python -m benchmarks.load_test --workers 2 --concurrency 1 8 32 128
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from chatbot_engine import RETRIEVAL_QUESTIONS
+
+RULE_QUESTIONS = ["కవిత్రయం ఎవరు?", "అష్టదిగ్గజాలు గురించి", "తిక్కన సమకాలికులు ఎవరు?"]
+
+
+def build_questions(dataset_path, count, seed=0):
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        names = [p['name_telugu'] for p in json.load(f)]
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    rng = random.Random(seed)
+    return [rng.choice(RULE_QUESTIONS) if i % 10 == 0 else
+            rng.choice(templates).replace("POET_NAME", rng.choice(names)) for i in range(count)]
+
+
+async def _client(host, port, questions, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for question in questions:
+            body = json.dumps({"question": question}, ensure_ascii=False).encode("utf-8")
+            request = (f"POST /chat HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                       f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n")[1:]:
+                name, _, value = line.partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0].decode("latin-1"))
+    finally:
+        writer.close()
+
+
+async def run_level(host, port, questions, concurrency):
+    latencies, errors = [], []
+    per_client = [questions[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, qs, latencies, errors) for qs in per_client))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_server(host, port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--no-server", action="store_true", help="load an already running server")
+    parser.add_argument("--dataset", default="Final_Dataset_Generated.json")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    args = parser.parse_args()
+
+    port = args.port or (8000 if args.no_server else _free_port())
+    server = None
+    if not args.no_server:
+        server = subprocess.Popen([sys.executable, "server.py", "--host", args.host, "--port", str(port),
+                                   "--dataset", args.dataset, "--workers", str(args.workers),
+                                   "--threads", str(args.threads)], stdout=subprocess.DEVNULL)
+    try:
+        _wait_for_server(args.host, port)
+        questions = build_questions(args.dataset, args.requests)
+        print(f"{'concurrency':>11} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for concurrency in args.concurrency:
+            result = asyncio.run(run_level(args.host, port, questions, concurrency))
+            print(f"{result['concurrency']:11d} {result['requests']:9d} {result['errors']:7d} "
+                  f"{result['throughput_rps']:9.0f} {result['p50_ms']:8.2f} {result['p99_ms']:8.2f}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Benchmark suite: for each dataset size, generates a synthetic dataset, its
+raw paragraphs and a mixed query workload (benchmarks.synthetic). It then
+measures:
+
+- preprocess_raw_data and preprocess_streaming: records/s and peak RSS;
+- ChatbotEngine construction: cold build and snapshot load time, Python heap
+  of the loaded engine, peak RSS;
+- get_response latency per path (rule, retrieval, miss, cached) and batch
+  throughput.
+
+Each phase runs in its own process so peak RSS is per phase. Results are saved
+as JSON; --compare prints the change against an earlier results file and
+exits non-zero on regressions beyond --tolerance.
+
+    python -m benchmarks.suite --sizes 100 1000 10000 --output bench_results.json
+    python -m benchmarks.suite --sizes 100 1000 --compare bench_results.json
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_queries, iter_poets, read_queries, write_dataset, write_queries, \
+    write_raw_dataset
+
+# --compare checks metrics whose name ends in one of these: throughputs must not drop,
+# times and sizes must not grow
+HIGHER_IS_BETTER = ("_per_s",)
+LOWER_IS_BETTER = ("_s", "_us", "_mb")
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _latency_stats(latencies, prefix):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {}
+    return {f"{prefix}_p50_us": statistics.median(latencies) * 1e6,
+            f"{prefix}_p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+            f"{prefix}_count": len(latencies)}
+
+
+# --- Phases (each runs in a child process) ---
+
+def run_preprocess(work_dir):
+    import preprocessing_code
+
+    raw_path = os.path.join(work_dir, "raw_dataset.json")
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        preprocessing_code.preprocess_raw_data(raw_path, os.path.join(work_dir, "preprocessed.json"))
+        results["preprocess_s"] = time.perf_counter() - start
+        start = time.perf_counter()
+        records = preprocessing_code.preprocess_streaming(raw_path, os.path.join(work_dir, "preprocessed.jsonl"))
+        results["streaming_s"] = time.perf_counter() - start
+    results["records_per_s"] = records / results["preprocess_s"]
+    results["streaming_records_per_s"] = records / results["streaming_s"]
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return results
+
+
+def run_engine(work_dir):
+    from chatbot_engine import ChatbotEngine
+
+    dataset_path = os.path.join(work_dir, "Final_Dataset_Generated.json")
+    snapshot_dir = os.path.join(work_dir, "kb_snapshot")
+    queries = read_queries(os.path.join(work_dir, "queries.jsonl"))
+    results = {}
+    start = time.perf_counter()
+    ChatbotEngine(dataset_path, snapshot_dir=snapshot_dir, rebuild_kb=True, cache_size=0, verbose=False)
+    results["cold_build_s"] = time.perf_counter() - start
+
+    gc.collect()
+    start = time.perf_counter()
+    bot = ChatbotEngine(dataset_path, snapshot_dir=snapshot_dir, cache_size=0, verbose=False)
+    results["snapshot_load_s"] = time.perf_counter() - start
+
+    # Python heap held by a snapshot-loaded engine (a separate, traced load)
+    tracemalloc.start()
+    traced_bot = ChatbotEngine(dataset_path, snapshot_dir=snapshot_dir, cache_size=0, verbose=False)
+    results["engine_heap_mb"] = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    del traced_bot
+
+    latencies = {}
+    for question, path in queries:
+        start = time.perf_counter()
+        bot.get_response(question)
+        latencies.setdefault(path, []).append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    bot.get_responses([question for question, _ in queries])
+    results["batch_questions_per_s"] = len(queries) / (time.perf_counter() - start)
+
+    cached_bot = ChatbotEngine(dataset_path, snapshot_dir=snapshot_dir, verbose=False)
+    cached_bot.get_responses([question for question, _ in queries])
+    cached = []
+    for question, _ in queries:
+        start = time.perf_counter()
+        cached_bot.get_response(question)
+        cached.append(time.perf_counter() - start)
+
+    for path, path_latencies in sorted(latencies.items()):
+        results.update(_latency_stats(path_latencies, path))
+    results.update(_latency_stats(cached, "cached"))
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return results
+
+
+PHASES = {"preprocess": run_preprocess, "engine": run_engine}
+
+
+def run_phase(phase, work_dir):
+    output = subprocess.run([sys.executable, "-m", "benchmarks.suite", "--run", phase, "--work-dir", work_dir],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# --- Results ---
+
+def _metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "config": {"sizes": args.sizes, "queries": args.queries, "poems_per_poet": args.poems_per_poet,
+                       "genres": args.genres, "rule_fraction": args.rule_fraction, "seed": args.seed}}
+
+
+def compare(current, baseline, tolerance):
+    """Prints metric changes against baseline; returns the number of regressions."""
+    regressions = 0
+    print(f"\ncompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}), "
+          f"tolerance {tolerance:.0%}")
+    for size, phases in current["results"].items():
+        for phase, metrics in phases.items():
+            old_metrics = baseline["results"].get(size, {}).get(phase, {})
+            for name, value in metrics.items():
+                old = old_metrics.get(name)
+                if old is None or old <= 0:
+                    continue
+                change = value / old - 1
+                if name.endswith(HIGHER_IS_BETTER):
+                    regressed = change < -tolerance
+                elif name.endswith(LOWER_IS_BETTER):
+                    regressed = change > tolerance
+                else:
+                    continue
+                flag = ""
+                if regressed:
+                    regressions += 1
+                    flag = "  REGRESSION"
+                print(f"{size:>7} {phase:>10} {name:>24} {old:12.4g} -> {value:12.4g} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="poets per dataset")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--poems-per-poet", type=int, default=4)
+    parser.add_argument("--genres", type=int)
+    parser.add_argument("--rule-fraction", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--phases", nargs="+", default=list(PHASES), choices=list(PHASES))
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before flagging")
+    parser.add_argument("--run", choices=list(PHASES), help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(PHASES[args.run](args.work_dir)))
+        return
+
+    results = {"meta": _metadata(args), "results": {}}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as work_dir:
+            def poets():
+                return iter_poets(size, args.poems_per_poet, args.genres, args.seed)
+            write_dataset(os.path.join(work_dir, "Final_Dataset_Generated.json"), poets())
+            write_raw_dataset(os.path.join(work_dir, "raw_dataset.json"), poets())
+            sample = [poet for _, poet in zip(range(20000), poets())]
+            write_queries(os.path.join(work_dir, "queries.jsonl"),
+                          generate_queries(sample, args.queries, args.rule_fraction, seed=args.seed))
+            phases = {phase: run_phase(phase, work_dir) for phase in args.phases}
+        results["results"][str(size)] = phases
+        for phase, metrics in phases.items():
+            print(f"{size:>7} poets  {phase}: " + ", ".join(
+                f"{name}={value:.4g}" for name, value in metrics.items()))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
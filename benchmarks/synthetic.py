@@ -0,0 +1,184 @@
+"""
+Synthetic poet datasets with the same schema as Final_Dataset_Generated.json,
+for benchmarking at sizes the real dataset cannot reach: the processed
+dataset, the raw_dataset.json paragraphs that preprocess into it, and query
+workloads mixing rule hits, retrieval questions and misses.
+
+    python -m benchmarks.synthetic --poets 10000 --poems-per-poet 4 --genres 12 --out-dir bench_data
+"""
+import argparse
+import json
+import os
+import random
+
+SYLLABLES = ["న", "న్న", "య", "తి", "క్క", "ఎ", "ఱ్ఱా", "ప్ర", "గ", "డ", "శ్రీ", "నా", "థు", "డు", "బ",
+             "మ్మె", "ర", "పో", "త", "వే", "మ", "అ", "ల్ల", "సా", "ని", "పె", "ద్ద", "కృ", "ష్ణ", "రా",
+             "యు", "లు", "గు", "ర", "జా", "సి", "రె", "డ్డి", "కం", "దు", "కూ", "రి", "వీ", "శ", "లిం", "గం"]
+SURNAMES = ["భట్టారకుడు", "సోమయాజి", "యోగి", "కవి", "పండితుడు", "ఆచార్యులు", "శర్మ", "రెడ్డి", "రావు"]
+PLACES = ["నండంపూడి", "నెల్లూరు", "కాళహస్తి", "ఒంటిమిట్ట", "తాళ్ళపాక", "విజయనగరం", "భద్రాచలం", "రాజమండ్రి"]
+TITLES = ["ఆదికవి", "కవిబ్రహ్మ", "ప్రబంధ పరమేశ్వరుడు", "కవిసార్వభౌముడు", "సహజ పండితుడు", "ఆంధ్ర కవితా పితామహుడు"]
+GENRES = ["భక్తి నివేదన", "నీతి బోధన", "ప్రకృతి వర్ణన", "శృంగార రసం", "సాంఘిక విమర్శ", "దేశభక్తి గేయం",
+          "తాత్విక కీర్తన", "సమస్యా పూరణం", "శతక మకుటం", "విప్లవ కవిత్వం", "హాస్యం", "శాంత రసం"]
+WORK_WORDS = ["భారతము", "భాగవతము", "చరిత్రము", "శతకము", "కీర్తనలు", "ఖండము", "విజయం", "మాహాత్మ్యము", "కావ్యం"]
+BIO_WORDS = ["ఆస్థాన", "కవి", "తెలుగు", "సాహిత్యంలో", "ప్రబంధ", "కావ్యాలను", "రచించారు", "రాజుల", "భక్తి",
+             "ఉద్యమానికి", "మార్గం", "సుగమం", "చేశారు", "పద్యాల", "ద్వారా", "ప్రసిద్ధి", "పొందారు", "అష్టదిగ్గజాలు"]
+POEM_WORDS = ["శ్రీ", "రామ", "హరి", "భువన", "జలధి", "కమల", "సుధా", "వాణీ", "గిరి", "మధుర", "ధర్మ", "వేద", "లోక"]
+
+
+def _name(rng, index):
+    # The index suffix keeps names unique even when syllables collide
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return f"{first}{index} {rng.choice(SURNAMES)}"
+
+
+def generate_poets(num_poets, poems_per_poet=4, num_genres=None, seed=0):
+    """Returns a list of poet dicts shaped like preprocess_raw_data's output."""
+    return list(iter_poets(num_poets, poems_per_poet, num_genres, seed))
+
+
+def iter_poets(num_poets, poems_per_poet=4, num_genres=None, seed=0):
+    """generate_poets, one poet at a time (for datasets too large to hold in memory)."""
+    rng = random.Random(seed)
+    genres = GENRES if num_genres is None else [GENRES[i % len(GENRES)] + (f" {i}" if i >= len(GENRES) else "")
+                                                for i in range(num_genres)]
+    for poet_id in range(1, num_poets + 1):
+        century = rng.randint(11, 20)
+        birth = century * 100 - 100 + rng.randint(0, 80)
+        yield {
+            "id": poet_id,
+            "name_telugu": _name(rng, poet_id),
+            "titles": ", ".join(rng.sample(TITLES, 2)),
+            "era": f"సా.శ. {century}వ శతాబ్దం",
+            "biography_summary": " ".join(rng.choice(BIO_WORDS) for _ in range(rng.randint(15, 40))),
+            "birth_place_telugu": rng.choice(PLACES),
+            "birth_year": f"సా.శ. {birth}",
+            "death_year": f"సా.శ. {birth + rng.randint(30, 80)}",
+            "famous_works": [f"{rng.choice(SYLLABLES)}{rng.choice(SYLLABLES)} {rng.choice(WORK_WORDS)}"
+                             for _ in range(rng.randint(1, 3))],
+            "poems": [{
+                "poem_num": poem_num,
+                "genre": rng.choice(genres),
+                "text": "\n".join(f"{line}. " + " ".join(rng.choice(POEM_WORDS) for _ in range(6))
+                                  for line in range(1, 5)),
+            } for poem_num in range(1, poems_per_poet + 1)],
+        }
+
+
+def write_dataset(path, poets, json_lines=False):
+    """
+    Streams `poets` (any iterable) as the processed dataset: a JSON array
+    (byte-identical to json.dump of the list) or, with json_lines, one poet per line.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        if json_lines:
+            for poet in poets:
+                f.write(json.dumps(poet, ensure_ascii=False) + "\n")
+            return
+        f.write("[")
+        for position, poet in enumerate(poets):
+            f.write((", " if position else "") + json.dumps(poet, ensure_ascii=False))
+        f.write("]")
+
+
+def raw_record(poet):
+    """The raw_dataset.json record ('Label: Value.' paragraph) that preprocesses into `poet`."""
+    paragraph = (f"ID: {poet['id']}. కవి: {poet['name_telugu']}. బిరుదులు: {poet['titles']}. "
+                 f"కాలం: {poet['era']}. జీవిత సారాంశం: {poet['biography_summary']}.. "
+                 f"జనన స్థలం: {poet['birth_place_telugu']}. జననం: {poet['birth_year']}. "
+                 f"మరణం: {poet['death_year']}. ప్రసిద్ధ రచనలు: {', '.join(poet['famous_works'])}.")
+    return {"poet_data_paragraph": paragraph, "poems_raw": poet['poems']}
+
+
+def write_raw_dataset(path, poets, json_lines=False):
+    """Streams raw records for `poets` (any iterable) as a JSON array or JSON Lines."""
+    with open(path, "w", encoding="utf-8") as f:
+        if json_lines:
+            for poet in poets:
+                f.write(json.dumps(raw_record(poet), ensure_ascii=False) + "\n")
+            return
+        f.write("[\n")
+        for position, poet in enumerate(poets):
+            f.write((",\n" if position else "") + json.dumps(raw_record(poet), ensure_ascii=False))
+        f.write("\n]\n")
+
+
+# --- Query workloads ---
+
+MISS_QUESTIONS = ["ఈ రోజు వాతావరణం ఎలా ఉంది?", "hello there", "what time is it", "నాకు ఆకలిగా ఉంది",
+                  "క్రికెట్ స్కోరు ఎంత?", "tell me a joke"]
+
+
+def _rule_question(rng, poet):
+    """A question about `poet` that one of the engine's rules answers."""
+    name = poet['name_telugu']
+    century = poet['era'].split()[1][:2]  # "సా.శ. 13వ శతాబ్దం" -> "13"
+    choices = ["కవిత్రయం ఎవరు?", "అష్టదిగ్గజాలు గురించి", f"{century}వ శతాబ్ద కవులు జాబితా",
+               f"{name} సమకాలికులు ఎవరు", f"'{rng.choice(poet['famous_works'])}' రచన ఎవరు రాశారు"]
+    if poet['poems']:
+        genre = rng.choice(poet['poems'])['genre']
+        choices += [f"'{genre}' శైలి కవులు ఎవరు?", f"'{genre}' genre poem from {name}"]
+    return rng.choice(choices)
+
+
+def generate_queries(poets, count, rule_fraction=0.3, miss_fraction=0.05, seed=0):
+    """
+    A query workload over `poets`: (question, path) pairs, where path is the
+    part of the engine meant to answer it ("rule", "retrieval" or "miss").
+    Retrieval questions fill RETRIEVAL_QUESTIONS templates with a full or
+    partial poet name.
+    """
+    from chatbot_engine import RETRIEVAL_QUESTIONS
+
+    rng = random.Random(seed)
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    queries = []
+    for _ in range(count):
+        draw = rng.random()
+        poet = rng.choice(poets)
+        if draw < rule_fraction:
+            queries.append((_rule_question(rng, poet), "rule"))
+        elif draw < rule_fraction + miss_fraction:
+            queries.append((rng.choice(MISS_QUESTIONS), "miss"))
+        else:
+            name = poet['name_telugu'] if rng.random() < 0.8 else poet['name_telugu'].split()[0]
+            queries.append((rng.choice(templates).replace("POET_NAME", name), "retrieval"))
+    return queries
+
+
+def write_queries(path, queries):
+    with open(path, "w", encoding="utf-8") as f:
+        for question, query_path in queries:
+            f.write(json.dumps({"question": question, "path": query_path}, ensure_ascii=False) + "\n")
+
+
+def read_queries(path):
+    with open(path, encoding="utf-8") as f:
+        return [(record["question"], record["path"]) for record in map(json.loads, f) if record]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poets", type=int, default=1000)
+    parser.add_argument("--poems-per-poet", type=int, default=4)
+    parser.add_argument("--genres", type=int, help="number of distinct genres (default: the built-in list)")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--rule-fraction", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json-lines", action="store_true", help="write the datasets as JSON Lines")
+    parser.add_argument("--out-dir", default="bench_data")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    extension = "jsonl" if args.json_lines else "json"
+    poets = lambda: iter_poets(args.poets, args.poems_per_poet, args.genres, args.seed)
+    write_dataset(os.path.join(args.out_dir, f"Final_Dataset_Generated.{extension}"), poets(), args.json_lines)
+    write_raw_dataset(os.path.join(args.out_dir, f"raw_dataset.{extension}"), poets(), args.json_lines)
+    # Queries only need names, eras, works and genres; a sample of poets keeps memory flat
+    sample = [poet for _, poet in zip(range(min(args.poets, 20000)), poets())]
+    write_queries(os.path.join(args.out_dir, "queries.jsonl"),
+                  generate_queries(sample, args.queries, args.rule_fraction, seed=args.seed))
+    print(f"wrote {args.poets} poets and {args.queries} queries to {args.out_dir}/")
+
+
+if __name__ == "__main__":
+    main()
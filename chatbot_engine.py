@@ -1,308 +1,947 @@
-import json
-import re  # We need regex for the rule-based part
-import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-# --- 1. Define Example Questions for Retrieval (The "Smart" Part) ---
-RETRIEVAL_QUESTIONS = {
-    "ask_biography": [
-        "POET_NAME గురించి చెప్పు",
-        "POET_NAME ఎవరు?",
-        "POET_NAME జీవితం గురించి సమాచారం ఇవ్వు",
-        "POET_NAME బయోగ్రఫీ",
-        "Who is POET_NAME?",
-        "tell me about POET_NAME"
-    ],
-    "ask_titles": [
-        "POET_NAME బిరుదులు ఏవి?",
-        "POET_NAME గారి బిరుదులు",
-        "What are POET_NAME's titles?"
-    ],
-    "ask_famous_works": [
-        "POET_NAME రచనలు ఏవి?",
-        "POET_NAME రాసిన పుస్తకాలు చెప్పు",
-        "POET_NAME ప్రసిద్ధ రచనలు",
-        "What did POET_NAME write?"
-    ],
-    "ask_era": [
-        "POET_NAME కాలం ఏది?",
-        "POET_NAME ఎప్పుడు జీవించారు?",
-        "What is POET_NAME's era?"
-    ],
-    "ask_birth_place": [
-        "POET_NAME ఎక్కడ పుట్టారు?",
-        "POET_NAME జనన స్థలం",
-        "POET_NAME birthplace"
-    ],
-    "ask_lifespan": [
-        "POET_NAME జననం మరియు మరణం",
-        "POET_NAME జీవన కాలం",
-        "POET_NAME lifespan"
-    ],
-    # --- NEW: Added more examples to make this intent smarter ---
-    "ask_poem": [
-        "POET_NAME పద్యం ఒకటి చెప్పు",
-        "POET_NAME నుండి ఒక పద్యం",
-        "POET_NAME poem",
-        "display poem of POET_NAME",
-        "POET_NAME పద్యం చూపించు"
-    ]
-}
-
-
-class ChatbotEngine:
-    def __init__(self, json_file_path):
-        print("Bot Engine: Loading data...")
-        self.data_all, self.poets_by_name, self.poets_by_id = self._load_data(json_file_path)
-        
-        # --- 1. Setup for Retrieval Model ---
-        self.documents = []
-        self.metadata = []
-        
-        print("Bot Engine: Building retrieval knowledge base...")
-        self._build_retrieval_kb()
-        self._save_processed_data_to_files() # Generate files for you
-        self._vectorize_kb()
-        
-        # --- 2. Setup for Rule-Based Model ---
-        print("Bot Engine: Compiling rule-based intents...")
-        self.rule_based_intents = [
-            # --- NEW INTENT 1: Get poem by POET and GENRE ---
-            # Example: "'భక్తి నివేదన' genre poem from తిక్కన"
-            (re.compile(r"'(.*)' (?:genre|style|శైలి) (?:poem|పద్యం) (?:from|by) (.*)", re.IGNORECASE), self._handle_get_poem_by_genre_and_poet),
-            
-            # --- NEW INTENT 2: List poets by GENRE ---
-            # Example: "'నీతి బోధన' శైలి కవులు ఎవరు?"
-            (re.compile(r"'(.*)' (?:genre|style|శైలి)[\w\s]* (?:poets|కవులు|ఎవరు)", re.IGNORECASE), self._handle_list_by_genre),
-            
-            # --- Existing Rules ---
-            (re.compile(r"(కవిత్రయం) (ఎవరు|గురించి)"), self._handle_kavitrayam),
-            (re.compile(r"(అష్టదిగ్గజాలు) (ఎవరు|గురించి)"), self._handle_ashtadiggajalu),
-            (re.compile(r"(\d{2})\s*(?:va|వ)?\s*(?:శతాబ్ద|satabda)[\w\s]* (?:jabitha|list|కవులు|జాబితా)"), self._handle_list_by_era),
-            (re.compile(r"(.*) (సమకాలికులు|సమకాలీన కవులు) ఎవరు"), self._handle_contemporaries),
-            (re.compile(r"'(.*)' (రచన|పుస్తకం) ఎవరు రాశారు"), self._handle_find_poet_by_work),
-        ]
-        
-        print(f"Bot Engine: Ready. (Retrieval KB: {len(self.documents)} entries, Rule KB: {len(self.rule_based_intents)} rules)")
-
-    # --- Data Loading and Setup Functions ---
-
-    def _load_data(self, filename):
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                all_poets = json.load(f)
-            poets_by_name = {p['name_telugu'].strip(): p for p in all_poets}
-            poets_by_id = {p['id']: p for p in all_poets}
-            print(f"డేటా విజయవంతంగా లోడ్ చేయబడింది ({len(all_poets)} కవులు).")
-            return all_poets, poets_by_name, poets_by_id
-        except Exception as e:
-            print(f"లోపం: డేటా లోడ్ చేయడంలో విఫలమైంది: {e}")
-            exit()
-
-    def _build_retrieval_kb(self):
-        """Builds the KB for the simple, factual intents."""
-        current_doc_index = 0
-        
-        for poet in self.data_all:
-            poet_name = poet['name_telugu']
-            
-            def add_intent(intent_type, answer_text, extra_meta={}):
-                nonlocal current_doc_index
-                self.documents.append(answer_text)
-                answer_meta = {
-                    'poet_name': poet_name, 'type': intent_type,
-                    'is_answer': True, 'doc_index': current_doc_index
-                }
-                answer_meta.update(extra_meta)
-                self.metadata.append(answer_meta)
-                answer_index = current_doc_index
-                current_doc_index += 1
-                
-                # Add all corresponding QUESTIONS from the list
-                if intent_type in RETRIEVAL_QUESTIONS:
-                    for q in RETRIEVAL_QUESTIONS[intent_type]:
-                        self.documents.append(q.replace("POET_NAME", poet_name))
-                        self.metadata.append({
-                            'is_answer': False, 'points_to_index': answer_index
-                        })
-                        current_doc_index += 1
-
-            # Add all simple retrieval intents
-            add_intent("ask_biography", poet['biography_summary'])
-            add_intent("ask_titles", poet['titles'])
-            add_intent("ask_famous_works", ", ".join(poet['famous_works']))
-            add_intent("ask_era", poet['era'])
-            add_intent("ask_birth_place", poet['birth_place_telugu'])
-            add_intent("ask_lifespan", f"జననం: {poet['birth_year']}, మరణం: {poet['death_year']}")
-
-            # NEW: We must also add the poems themselves to the retrieval KB
-            # so they can be found by the "ask_poem" intent
-            for poem in poet.get('poems', []):
-                add_intent("ask_poem", poem['text'], extra_meta={'genre': poem['genre']})
-
-
-    def _save_processed_data_to_files(self):
-        """TASK: GENERATE FILES FOR THE ULTIMATE DATASET"""
-        print("Bot Engine: Saving retrieval KB to files...")
-        with open("knowledge_base_documents.txt", "w", encoding="utf-8") as f:
-            for i, doc in enumerate(self.documents):
-                f.write(f"----- DOCUMENT {i} -----\n{doc}\n\n")
-        
-        with open("knowledge_base_metadata.json", "w", encoding="utf-8") as f:
-            json.dump(self.metadata, f, indent=4, ensure_ascii=False)
-        print("Bot Engine: Files 'knowledge_base_documents.txt' and 'knowledge_base_metadata.json' created.")
-
-    def _vectorize_kb(self):
-        """TASK: PROCESS THE DOCUMENTS"""
-        self.vectorizer = TfidfVectorizer(ngram_range=(1, 2))
-        self.kb_vectors = self.vectorizer.fit_transform(self.documents)
-
-    # --- Rule-Based Handler Functions (from poet_bot.py) ---
-
-    def _find_poet_by_name(self, name_query):
-        """Helper to find a poet from a partial name."""
-        clean_query = name_query.strip().lower()
-        if not clean_query:
-            return None
-        for full_name, poet_data in self.poets_by_name.items():
-            if clean_query in full_name.lower():
-                return poet_data
-        return None
-
-    def _handle_kavitrayam(self, match):
-        names = [self.poets_by_id.get(i, {}).get('name_telugu', f'ID {i} Not Found') for i in [1, 2, 3]]
-        return f"కవిత్రయం: {', '.join(names)}."
-
-    def _handle_ashtadiggajalu(self, match):
-        search_term = "అష్టదిగ్గజాలు"
-        poets = [p['name_telugu'] for p in self.data_all if search_term in p['biography_summary']]
-        if poets:
-            return f"ఈ డేటాసెట్‌లో అష్టదిగ్గజాలుగా పేర్కొనబడిన కవులు: {', '.join(poets)}"
-        return "ఈ డేటాసెట్‌లో 'అష్టదిగ్గజాలు' అని స్పష్టంగా ఎవరూ లేరు."
-
-    def _handle_list_by_era(self, match):
-        century_num = match.group(1) # This will be "12"
-        search_term = f"{century_num}వ శతాబ్దం" 
-        poets = [p['name_telugu'] for p in self.data_all if search_term in p['era']]
-        if poets:
-            return f"{century_num}వ శతాబ్దపు కవులు: {', '.join(poets)}"
-        return f"క్షమించండి, {century_num}వ శతాబ్దానికి చెందిన కవులు ఎవరూ కనబడలేదు."
-
-    def _handle_contemporaries(self, match):
-        name = match.group(1).strip()
-        target_poet = self._find_poet_by_name(name)
-        if not target_poet:
-            return f"క్షమించండి, '{name}' అనే కవి కనబడలేదు."
-        
-        target_era = target_poet['era']
-        poets = [p['name_telugu'] for p in self.data_all 
-                 if p['era'] == target_era and p['id'] != target_poet['id']]
-        
-        if poets:
-            return f"{target_poet['name_telugu']} గారి సమకాలికులు ({target_era}): {', '.join(poets)}"
-        return f"{target_era} కాలానికి చెందిన ఇతర కవులు ఈ డేటాసెట్‌లో లేరు."
-        
-    def _handle_find_poet_by_work(self, match):
-        work_query = match.group(1).strip().lower()
-        found_poets = []
-        for poet in self.data_all:
-            for work in poet['famous_works']:
-                if work_query in work.lower():
-                    found_poets.append(poet['name_telugu'])
-                    break 
-        if found_poets:
-            return f"'{work_query}' అనే రచనను వీరు రాసారు: {', '.join(found_poets)}"
-        return f"క్షమించండి, '{work_query}' రాసిన కవిని కనుగొనలేకపోయాను."
-
-    # --- NEW: Handlers for our new complex intents ---
-    
-    def _handle_list_by_genre(self, match):
-        genre_query = match.group(1).strip().lower()
-        found_poets = set() # Use a set to avoid duplicates
-        for poet in self.data_all:
-            for poem in poet.get('poems', []):
-                if genre_query in poem['genre'].lower():
-                    found_poets.add(poet['name_telugu'])
-                    break # Move to the next poet
-        
-        if found_poets:
-            return f"'{genre_query}' శైలిలో పద్యాలు రాసిన కవులు: {', '.join(found_poets)}"
-        return f"క్షమించండి, '{genre_query}' శైలిలో పద్యాలు రాసిన కవులు ఈ డేటాసెట్‌లో కనబడలేదు."
-
-    def _handle_get_poem_by_genre_and_poet(self, match):
-        genre_query = match.group(1).strip().lower()
-        poet_name = match.group(2).strip()
-        
-        poet = self._find_poet_by_name(poet_name)
-        if not poet:
-            return f"క్షమించండి, '{poet_name}' అనే కవి కనబడలేదు."
-            
-        found_poems = []
-        for poem in poet.get('poems', []):
-            if genre_query in poem['genre'].lower():
-                found_poems.append(f"({poem['genre']}):\n{poem['text']}\n")
-        
-        if found_poems:
-            # Return the first match
-            return (f"{poet['name_telugu']} గారి నుండి '{genre_query}' శైలికి చెందిన పద్యం:\n\n" +
-                    found_poems[0])
-        return f"క్షమించండి, {poet['name_telugu']} గారి నుండి '{genre_query}' శైలికి చెందిన పద్యాలు కనుగొనబడలేదు."
-
-
-    # --- THE ULTIMATE LOGIC: get_response ---
-
-    def get_response(self, user_question):
-        """
-        The main Hybrid Logic.
-        1. Try to match a specific RULE.
-        2. If no rule matches, use the flexible RETRIEVAL model.
-        """
-        
-        # --- 1. Try Rule-Based Matching First ---
-        for pattern, handler in self.rule_based_intents:
-            match = pattern.search(user_question)
-            if match:
-                print(f"--- (Debug: Matched Rule: {pattern.pattern}) ---")
-                return handler(match)
-        
-        # --- 2. If No Rule Matched, Use Retrieval Model ---
-        question_vector = self.vectorizer.transform([user_question])
-        scores = cosine_similarity(question_vector, self.kb_vectors)
-        best_index = scores.argmax()
-        best_score = scores[0, best_index]
-        
-        if best_score < 0.25:
-            return "క్షమించండి, మీ ప్రశ్న నాకు అర్థం కాలేదు. దయచేసి మరో విధంగా అడగగలరు."
-        
-        match_meta = self.metadata[best_index]
-        
-        if match_meta['is_answer']:
-            answer_index = match_meta['doc_index']
-        else:
-            answer_index = match_meta['points_to_index']
-            
-        answer_text = self.documents[answer_index]
-        answer_meta = self.metadata[answer_index]
-        
-        # --- 3. Format the Retrieved Answer ---
-        poet = answer_meta['poet_name']
-        type = answer_meta['type']
-        
-        if type == 'ask_biography':
-            return f"{poet} గారి గురించి ఇక్కడ కొంత సమాచారం ఉంది: \n{answer_text}"
-        elif type == 'ask_titles':
-            return f"{poet} గారి బిరుదులు: \n{answer_text}"
-        elif type == 'ask_famous_works':
-            return f"{poet} గారి ప్రసిద్ధ రచనలు: \n{answer_text}"
-        elif type == 'ask_era':
-            return f"{poet} గారి కాలం: \n{answer_text}"
-        elif type == 'ask_birth_place':
-            return f"{poet} గారి జనన స్థలం: \n{answer_text}"
-        elif type == 'ask_lifespan':
-            return f"{poet} గారి జీవన కాలం: \n{answer_text}"
-        # This now handles the simple "display poem of Nannaya" request
-        elif type == 'ask_poem':
-            return f"{poet} గారి పద్యం (శైలి: {answer_meta['genre']}): \n{answer_text}"
-        
-        return answer_text
\ No newline at end of file
+import contextlib
+import json
+import re  # We need regex for the rule-based part
+import os
+import sys
+import threading
+from collections import Counter, namedtuple
+
+import numpy as np
+
+import kb_export
+import kb_snapshot
+from compact_kb import CompactKB, build_compact_kb
+from instrumentation import Instrumentation, SamplingProfiler
+from poet_index import BIOGRAPHY_KEYWORDS, CENTURY_PATTERN, PoetIndex
+from response_cache import ResponseCache, normalize_question
+from retrievers import make_retriever
+from rule_engine import MAX_RULE_INPUT_LENGTH, Rule, RuleDispatcher
+
+# --- 1. Define Example Questions for Retrieval (The "Smart" Part) ---
+RETRIEVAL_QUESTIONS = {
+    "ask_biography": [
+        "POET_NAME గురించి చెప్పు",
+        "POET_NAME ఎవరు?",
+        "POET_NAME జీవితం గురించి సమాచారం ఇవ్వు",
+        "POET_NAME బయోగ్రఫీ",
+        "Who is POET_NAME?",
+        "tell me about POET_NAME"
+    ],
+    "ask_titles": [
+        "POET_NAME బిరుదులు ఏవి?",
+        "POET_NAME గారి బిరుదులు",
+        "What are POET_NAME's titles?"
+    ],
+    "ask_famous_works": [
+        "POET_NAME రచనలు ఏవి?",
+        "POET_NAME రాసిన పుస్తకాలు చెప్పు",
+        "POET_NAME ప్రసిద్ధ రచనలు",
+        "What did POET_NAME write?"
+    ],
+    "ask_era": [
+        "POET_NAME కాలం ఏది?",
+        "POET_NAME ఎప్పుడు జీవించారు?",
+        "What is POET_NAME's era?"
+    ],
+    "ask_birth_place": [
+        "POET_NAME ఎక్కడ పుట్టారు?",
+        "POET_NAME జనన స్థలం",
+        "POET_NAME birthplace"
+    ],
+    "ask_lifespan": [
+        "POET_NAME జననం మరియు మరణం",
+        "POET_NAME జీవన కాలం",
+        "POET_NAME lifespan"
+    ],
+    # --- NEW: Added more examples to make this intent smarter ---
+    "ask_poem": [
+        "POET_NAME పద్యం ఒకటి చెప్పు",
+        "POET_NAME నుండి ఒక పద్యం",
+        "POET_NAME poem",
+        "display poem of POET_NAME",
+        "POET_NAME పద్యం చూపించు"
+    ]
+}
+
+
+# Where compiled KB snapshots are kept (one sub-directory per dataset fingerprint)
+DEFAULT_SNAPSHOT_DIR = "kb_snapshot"
+TFIDF_NGRAM_RANGE = (1, 2)
+# Retrieval backend behind get_response (see retrievers.RETRIEVERS)
+DEFAULT_RETRIEVER = "word"
+# Responses cached per question (0 disables the cache)
+DEFAULT_CACHE_SIZE = 4096
+# How often (seconds) background compaction folds upserted poets into the main index
+DEFAULT_COMPACTION_INTERVAL = 300.0
+NOT_UNDERSTOOD_RESPONSE = "క్షమించండి, మీ ప్రశ్న నాకు అర్థం కాలేదు. దయచేసి మరో విధంగా అడగగలరు."
+
+# A response plus what produced it: the matched rule's name, or the retrieved
+# intent and its score (for "not understood" answers: the best score found, if any)
+ResponseInfo = namedtuple("ResponseInfo", ["response", "rule", "intent", "score", "cached"],
+                          defaults=(None, None, None, False))
+# One distinct answer returned by retrieve(); row is the answer's KB row
+RetrievedAnswer = namedtuple("RetrievedAnswer", ["response", "score", "intent", "poet_name", "genre", "answer_text",
+                                                 "row"])
+# What a query is scored against, taken under _kb_lock (see ChatbotEngine._kb_view)
+_KBView = namedtuple("_KBView", ["retriever", "row_mask", "segments"])
+
+
+def _filter_values(name, values, types):
+    """A retrieve() filter as a list: one value or a non-empty list of values of `types` (bools rejected)."""
+    if isinstance(values, (list, tuple)):
+        if not values:
+            raise ValueError(f"{name} filter must not be an empty list")
+    else:
+        values = [values]
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, types):
+            expected = " or ".join(t.__name__ for t in types)
+            raise ValueError(f"{name} filter must be a {expected} or a list of them, not {value!r}")
+    return list(values)
+
+
+def _segment_of(segments, row):
+    """The segment (main or delta KB) holding a KB row."""
+    return segments[0] if row < segments[0].num_rows else segments[1]
+
+
+class ChatbotEngine:
+    def __init__(self, json_file_path, snapshot_dir=DEFAULT_SNAPSHOT_DIR, rebuild_kb=False,
+                 cache_size=DEFAULT_CACHE_SIZE, cache_ttl=None, retriever=DEFAULT_RETRIEVER,
+                 retrieval_threshold=None, debug=False, instrument=False, in_memory=False, shards=0,
+                 verbose=True):
+        """
+        snapshot_dir: directory for compiled KB snapshots (None disables them).
+        rebuild_kb: ignore any existing snapshot and rebuild the KB from the dataset.
+        in_memory: never write to disk. An existing snapshot is still loaded,
+        but a freshly built KB is not saved as one.
+        cache_size / cache_ttl: LRU response cache size and entry lifetime in
+        seconds (cache_size=0 disables caching, cache_ttl=None never expires).
+        retriever: retrieval backend name ("word" or "char", see retrievers).
+        retrieval_threshold: minimum retrieval score for an answer (None: the
+        retriever's default); lower-scoring questions are "not understood".
+        debug: print which rule answered each question, and stage timings at startup.
+        instrument: collect stage timers, per-query spans and answer counters
+        (see export_metrics); when False the hooks are no-ops.
+        shards: split the main KB into this many shards scored in parallel by
+        worker processes (word retriever only; see sharded_kb). Answers are
+        the same as with shards=0. Call close() to stop the workers.
+        verbose: print progress messages while loading (errors still go to stderr).
+        """
+        self.debug = debug
+        self.verbose = verbose
+        self.instrumentation = Instrumentation(enabled=instrument or debug)
+        self._profiler = None
+        self.retriever_name = retriever
+        self.shards = shards
+        self.retrieval_threshold = retrieval_threshold
+        self.response_cache = ResponseCache(cache_size, cache_ttl) if cache_size else None
+        # Guards the retrieval KB state against concurrent upserts/compaction.
+        # Queries only hold it to take a _KBView; they score without it.
+        self._kb_lock = threading.RLock()
+        # main KB -> queries scoring against it, and the replaced retrievers
+        # waiting for those queries to finish before they are closed
+        self._kb_users = Counter()
+        self._retired_retrievers = {}
+        self.kb_generation = 0
+        self._compaction_thread = None
+        self._compaction_stop = None
+        
+        self._progress("Bot Engine: Loading data...")
+        with self.instrumentation.stage("load"):
+            self.data_all = self._load_data(json_file_path)
+        with self.instrumentation.stage("poet_index"):
+            self._index_poets()
+        
+        # --- 1. Setup for Retrieval Model ---
+        self.kb_fingerprint = kb_snapshot.compute_fingerprint(json_file_path, self._kb_build_config())
+        snapshot = None
+        if snapshot_dir and not rebuild_kb:
+            with self.instrumentation.stage("snapshot_load"):
+                snapshot = kb_snapshot.load_snapshot(snapshot_dir, self.kb_fingerprint)
+                if snapshot is not None:
+                    arrays, info, vectorizer = snapshot
+                    try:
+                        kb = CompactKB.from_arrays(arrays, info)
+                    except (KeyError, TypeError, ValueError, IndexError) as e:
+                        # The files read, but do not make a KB: rebuild and replace them
+                        print(f"Bot Engine: Ignoring unusable KB snapshot: {e!r}", file=sys.stderr)
+                        snapshot = None
+                        rebuild_kb = True
+        
+        if snapshot is not None:
+            self._progress("Bot Engine: Loaded retrieval knowledge base from snapshot.")
+        else:
+            self._progress("Bot Engine: Building retrieval knowledge base...")
+            # Tokenising, counting and TF-IDF weighting all happen in this one pass
+            with self.instrumentation.stage("kb_build"):
+                kb, vectorizer = self._build_retrieval_kb(self.data_all)
+            if snapshot_dir and not in_memory:
+                with self.instrumentation.stage("snapshot_save"):
+                    arrays, info = kb.to_arrays()
+                    saved = kb_snapshot.save_snapshot(snapshot_dir, self.kb_fingerprint, arrays, info, vectorizer,
+                                                      replace=rebuild_kb, dataset_path=json_file_path)
+                if saved:
+                    self._progress(f"Bot Engine: KB snapshot saved to '{snapshot_dir}'.")
+                else:
+                    self._progress(f"Bot Engine: Kept the KB snapshot another process saved to '{snapshot_dir}'.")
+        self._install_kb(kb, vectorizer, self._build_retriever(kb, vectorizer))
+        
+        # --- 2. Setup for Rule-Based Model ---
+        self._progress("Bot Engine: Compiling rule-based intents...")
+        self.rule_based_intents = [
+            # --- NEW INTENT 1: Get poem by POET and GENRE ---
+            # Example: "'భక్తి నివేదన' genre poem from తిక్కన"
+            Rule("get_poem_by_genre_and_poet",
+                 re.compile(r"'(.*)' (?:genre|style|శైలి) (?:poem|పద్యం) (?:from|by) (.*)", re.IGNORECASE),
+                 self._handle_get_poem_by_genre_and_poet,
+                 [("' genre ", "' style ", "' శైలి "), ("poem from ", "poem by ", "పద్యం from ", "పద్యం by ")],
+                 max_input_length=MAX_RULE_INPUT_LENGTH),
+            
+            # --- NEW INTENT 2: List poets by GENRE ---
+            # Example: "'నీతి బోధన' శైలి కవులు ఎవరు?"
+            Rule("list_by_genre",
+                 re.compile(r"'(.*)' (?:genre|style|శైలి)[\w\s]* (?:poets|కవులు|ఎవరు)", re.IGNORECASE),
+                 self._handle_list_by_genre,
+                 [("' genre", "' style", "' శైలి"), (" poets", " కవులు", " ఎవరు")],
+                 max_input_length=MAX_RULE_INPUT_LENGTH),
+            
+            # --- Existing Rules ---
+            Rule("kavitrayam", re.compile(r"(కవిత్రయం) (ఎవరు|గురించి)"), self._handle_kavitrayam,
+                 [("కవిత్రయం ఎవరు", "కవిత్రయం గురించి")]),
+            Rule("ashtadiggajalu", re.compile(r"(అష్టదిగ్గజాలు) (ఎవరు|గురించి)"), self._handle_ashtadiggajalu,
+                 [("అష్టదిగ్గజాలు ఎవరు", "అష్టదిగ్గజాలు గురించి")]),
+            Rule("list_by_era",
+                 re.compile(r"(\d{2})\s*(?:va|వ)?\s*(?:శతాబ్ద|satabda)[\w\s]* (?:jabitha|list|కవులు|జాబితా)"),
+                 self._handle_list_by_era,
+                 [("శతాబ్ద", "satabda"), (" jabitha", " list", " కవులు", " జాబితా")],
+                 max_input_length=MAX_RULE_INPUT_LENGTH),
+            Rule("contemporaries", re.compile(r"(.*) (సమకాలికులు|సమకాలీన కవులు) ఎవరు"), self._handle_contemporaries,
+                 [(" సమకాలికులు ఎవరు", " సమకాలీన కవులు ఎవరు")], max_input_length=MAX_RULE_INPUT_LENGTH),
+            Rule("find_poet_by_work", re.compile(r"'(.*)' (రచన|పుస్తకం) ఎవరు రాశారు"), self._handle_find_poet_by_work,
+                 [("' రచన ఎవరు రాశారు", "' పుస్తకం ఎవరు రాశారు")], max_input_length=MAX_RULE_INPUT_LENGTH),
+        ]
+        self.rule_dispatcher = RuleDispatcher(self.rule_based_intents)
+        
+        self._progress(f"Bot Engine: Ready. (Retrieval KB: {self.kb.num_entries} entries, Rule KB: {len(self.rule_based_intents)} rules)")
+        if self.debug:
+            print("Bot Engine: Startup stages: " +
+                  ", ".join(f"{stage} {seconds * 1000:.1f} ms" for stage, seconds in self.instrumentation.stages.items()))
+
+    # --- Data Loading and Setup Functions ---
+
+    def _load_data(self, filename):
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                if filename.endswith(".jsonl"):
+                    # One poet per line, as written by preprocess_streaming
+                    all_poets = [json.loads(line) for line in f if line.strip()]
+                else:
+                    all_poets = json.load(f)
+            self._progress(f"డేటా విజయవంతంగా లోడ్ చేయబడింది ({len(all_poets)} కవులు).")
+            return all_poets
+        except Exception as e:
+            # stderr: callers may silence the engine's stdout (run_chatbot --ask, server)
+            print(f"లోపం: డేటా లోడ్ చేయడంలో విఫలమైంది: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    def _progress(self, message):
+        if self.verbose:
+            print(message)
+
+    def _index_poets(self):
+        """Builds the poet lookup tables and materialised answers used by the rule handlers."""
+        (self.poets_by_name, self.poets_by_id, self.poet_index,
+         self.materialized_answers) = self._poet_tables(self.data_all)
+
+    def _poet_tables(self, data_all):
+        """(poets_by_name, poets_by_id, poet_index, materialized_answers) for data_all."""
+        poets_by_name = {p['name_telugu'].strip(): p for p in data_all}
+        poets_by_id = {p['id']: p for p in data_all}
+        poet_index = PoetIndex(data_all)
+        with self.instrumentation.stage("materialize"):
+            materialized_answers = self._materialize_answers(poet_index, poets_by_id)
+        return poets_by_name, poets_by_id, poet_index, materialized_answers
+
+    def _updated_poet_tables(self, poet_tables, poet_id, poet=None):
+        """
+        (data_all, poets_by_name, poets_by_id, poet_index, materialized_answers)
+        after adding/replacing `poet`, or removing poet_id when poet is None,
+        derived from the current tables for that one poet (which are left
+        untouched).
+        """
+        poets_by_name, poets_by_id, poet_index, materialized_answers = poet_tables
+        old_poet = poets_by_id.get(poet_id)
+        poet_index = poet_index.without_poet(poet_id) if poet is None else poet_index.with_poet(poet)
+        poets_by_id = dict(poets_by_id)
+        if poet is None:
+            poets_by_id.pop(poet_id, None)
+        else:
+            poets_by_id[poet_id] = poet
+        poets_by_name = dict(poets_by_name)
+        names = {p['name_telugu'].strip() for p in (old_poet, poet) if p is not None}
+        for name in names:
+            named = poet_index.poet_named(name)
+            if named is None:
+                poets_by_name.pop(name, None)
+            else:
+                poets_by_name[name] = named
+        with self.instrumentation.stage("materialize"):
+            materialized_answers = self._rematerialize_answers(
+                materialized_answers, poet_index, poets_by_id, [p for p in (old_poet, poet) if p is not None])
+        return poet_index.poets(), poets_by_name, poets_by_id, poet_index, materialized_answers
+
+    def _kb_changed(self):
+        """Called whenever the KB or poet data changes; cached responses are stale."""
+        self.kb_generation += 1
+        if self.response_cache is not None:
+            self.response_cache.invalidate()
+
+    def _build_retriever(self, kb, vectorizer):
+        # Called without _kb_lock held: starting shard workers can take a while
+        with self.instrumentation.stage("retriever"):
+            return make_retriever(self.retriever_name, [kb], vectorizer, shards=self.shards)
+
+    def _install_kb(self, kb, vectorizer, retriever):
+        """
+        Makes a freshly built (or loaded) KB, and the retriever built for it,
+        the one queries are answered from. Returns the previous retriever
+        (None on the first call) for the caller to close once it has released
+        _kb_lock.
+        """
+        with self._kb_lock:
+            previous = getattr(self, "retriever", None)
+            self.kb = kb
+            self.vectorizer = vectorizer
+            # poet id -> list of (start, end) KB row ranges holding that poet's rows
+            self.poet_rows = kb.poet_row_ranges()
+            # Poets added by upsert_poet live in a small delta KB until compact()
+            self._delta_poets = {}
+            self._delta_kb = None
+            self._delta_poet_rows = {}
+            # intent -> row mask over all segments, built on first use (see retrieve)
+            self._intent_masks = {}
+            self.retriever = retriever
+            self.row_alive = np.ones(kb.num_rows, dtype=bool)
+            self._tombstoned_rows = 0
+            self._kb_changed()
+        return previous
+
+    def _kb_build_config(self):
+        """Everything besides the dataset that the retrieval KB depends on."""
+        return {'retrieval_questions': RETRIEVAL_QUESTIONS, 'ngram_range': list(TFIDF_NGRAM_RANGE)}
+
+    @staticmethod
+    def _poet_answers(poet):
+        """(intent_type, answer_text, extra_meta) for every retrieval answer of one poet."""
+        # Add all simple retrieval intents
+        answers = [
+            ("ask_biography", poet['biography_summary'], {}),
+            ("ask_titles", poet['titles'], {}),
+            ("ask_famous_works", ", ".join(poet['famous_works']), {}),
+            ("ask_era", poet['era'], {}),
+            ("ask_birth_place", poet['birth_place_telugu'], {}),
+            ("ask_lifespan", f"జననం: {poet['birth_year']}, మరణం: {poet['death_year']}", {}),
+        ]
+        # NEW: We must also add the poems themselves to the retrieval KB
+        # so they can be found by the "ask_poem" intent
+        for poem in poet.get('poems', []):
+            answers.append(("ask_poem", poem['text'], {'genre': poem['genre']}))
+        return answers
+
+    def _build_retrieval_kb(self, poets, vectorizer=None, row_offset=0, existing_documents=0):
+        """
+        Builds the KB for the simple, factual intents of `poets` (see
+        compact_kb). Without a vectorizer TF-IDF is fitted; with one the rows
+        are vectorised against it. Returns (kb, vectorizer).
+        """
+        return build_compact_kb(poets, self._poet_answers, RETRIEVAL_QUESTIONS, vectorizer=vectorizer,
+                                ngram_range=TFIDF_NGRAM_RANGE, row_offset=row_offset,
+                                existing_documents=existing_documents)
+
+    def export_kb(self, output=None, format="jsonl"):
+        """
+        Streams the current retrieval KB (upserted poets included, removed
+        ones left out) to a file; see kb_export. Returns the number of rows.
+        """
+        with self._kb_view() as view, self.instrumentation.stage("export"):
+            return kb_export.export_kb(view.segments, output, format=format, row_mask=view.row_mask)
+
+    # --- Incremental KB Updates ---
+
+    def upsert_poet(self, poet):
+        """
+        Adds a poet, or replaces the poet with the same id, without rebuilding
+        the KB. The poet's rows go into a small delta KB (rebuilt from the
+        upserted poets on every call); the main-KB rows of a replaced poet are
+        tombstoned. New rows are vectorised against the existing IDF weights;
+        terms the vocabulary has never seen (e.g. a new poet's name) are added
+        with an IDF estimated from the current KB size. compact() later refits
+        everything from scratch.
+        """
+        self._update_poet(poet['id'], poet)
+
+    def remove_poet(self, poet_id):
+        """Removes a poet (tombstoning its KB rows). Returns False if the id is unknown."""
+        return self._update_poet(poet_id)
+
+    def _update_poet(self, poet_id, poet=None):
+        """
+        Upserts `poet`, or removes poet_id when poet is None. Like compact(),
+        everything is built from the current state without holding _kb_lock
+        and installed under it only if no other update came in meanwhile
+        (otherwise it is built again). A malformed poet (e.g. a missing field)
+        raises before anything is installed, leaving the engine as it was.
+        Returns False when removing an unknown id.
+        """
+        while True:
+            with self._kb_lock:
+                if poet is None and poet_id not in self.poets_by_id:
+                    return False
+                generation = self.kb_generation
+                kb, vectorizer, retriever = self.kb, self.vectorizer, self.retriever
+                delta_poets, delta_kb = self._delta_poets, self._delta_kb
+                row_alive, tombstoned_rows = self.row_alive, self._tombstoned_rows
+                main_rows = self.poet_rows.get(poet_id, [])
+                poet_tables = (self.poets_by_name, self.poets_by_id, self.poet_index, self.materialized_answers)
+
+            # --- Delta KB: rebuilt when the upserted poets change ---
+            if poet is not None or poet_id in delta_poets:
+                delta_poets = dict(delta_poets)
+                delta_poets.pop(poet_id, None)
+                if poet is not None:
+                    delta_poets[poet_id] = poet
+                delta_kb, vectorizer = self._build_delta_kb(kb, vectorizer, delta_poets)
+                segments = [kb] if delta_kb is None else [kb, delta_kb]
+                # Reuses the main segment's index (and shard workers)
+                retriever = make_retriever(self.retriever_name, segments, vectorizer, previous=retriever,
+                                           shards=self.shards)
+            delta_poet_rows = {} if delta_kb is None else delta_kb.poet_row_ranges()
+
+            # --- Tombstones: a new array, queries in flight may be scoring with the current one ---
+            # Delta rows are always alive: removed delta poets are simply not rebuilt
+            delta_rows = 0 if delta_kb is None else delta_kb.num_rows
+            row_alive = np.concatenate([row_alive[:kb.num_rows], np.ones(delta_rows, dtype=bool)])
+            for start, end in main_rows:
+                tombstoned_rows += int(row_alive[start:end].sum())
+                row_alive[start:end] = False
+
+            data_all, *poet_tables = self._updated_poet_tables(poet_tables, poet_id, poet)
+
+            with self._kb_lock:
+                if self.kb_generation != generation:
+                    continue
+                self.poet_rows.pop(poet_id, None)
+                self.row_alive = row_alive
+                self._tombstoned_rows = tombstoned_rows
+                self._delta_poets = delta_poets
+                self._delta_kb = delta_kb
+                self._delta_poet_rows = delta_poet_rows
+                self.vectorizer = vectorizer
+                self.retriever = retriever
+                # intent -> row mask over all segments, built on first use (see retrieve)
+                self._intent_masks = {}
+                self.data_all = data_all
+                self.poets_by_name, self.poets_by_id, self.poet_index, self.materialized_answers = poet_tables
+                self._kb_changed()
+                return True
+
+    def _build_delta_kb(self, kb, vectorizer, delta_poets):
+        """(delta KB or None, vectorizer) for the upserted poets, vectorised against the main KB."""
+        if not delta_poets:
+            return None, vectorizer
+        return self._build_retrieval_kb(list(delta_poets.values()), vectorizer, row_offset=kb.num_rows,
+                                        existing_documents=kb.num_documents)
+
+    def _segments(self):
+        """The KBs queries are answered from: the main KB, then the delta KB if any."""
+        return [self.kb] if self._delta_kb is None else [self.kb, self._delta_kb]
+
+    def needs_compaction(self):
+        return self._delta_kb is not None or self._tombstoned_rows > 0
+
+    def compact(self):
+        """
+        Rebuilds the KB (rows, vocabulary, IDF, index) and the poet index from
+        the current poets, dropping tombstoned rows and folding in the delta
+        KB. The rebuild runs without blocking queries; returns False if a
+        concurrent update made the rebuilt KB stale (try again later).
+        """
+        with self._kb_lock:
+            poets = self.data_all
+            poets_by_id = self.poets_by_id
+            generation = self.kb_generation
+        with self.instrumentation.stage("compact"):
+            kb, vectorizer = self._build_retrieval_kb(poets)
+            poet_index = PoetIndex(poets)
+            materialized_answers = self._materialize_answers(poet_index, poets_by_id)
+        retriever = self._build_retriever(kb, vectorizer)
+        with self._kb_lock:
+            stale = self.kb_generation != generation
+            if not stale:
+                self.poet_index = poet_index
+                self.materialized_answers = materialized_answers
+                previous = self._install_kb(kb, vectorizer, retriever)
+        if stale:
+            # Never installed, so no query can be using it
+            retriever.close()
+        else:
+            self._retire_retriever(previous)
+        return not stale
+
+    def start_background_compaction(self, interval=DEFAULT_COMPACTION_INTERVAL):
+        """Runs compact() every `interval` seconds whenever there are upserts/removals to fold in."""
+        if self._compaction_thread is not None:
+            return
+        self._compaction_stop = threading.Event()
+        
+        def run():
+            while not self._compaction_stop.wait(interval):
+                if self.needs_compaction():
+                    try:
+                        self.compact()
+                    except Exception as e:
+                        print(f"Bot Engine: Background compaction failed: {e}", file=sys.stderr)
+        
+        self._compaction_thread = threading.Thread(target=run, name="kb-compaction", daemon=True)
+        self._compaction_thread.start()
+
+    def stop_background_compaction(self):
+        if self._compaction_thread is None:
+            return
+        self._compaction_stop.set()
+        self._compaction_thread.join()
+        self._compaction_thread = None
+
+    def close(self):
+        """Stops background compaction and the retrieval shard workers (if any)."""
+        self.stop_background_compaction()
+        with self._kb_lock:
+            retriever = self.retriever
+        self._retire_retriever(retriever)
+
+    @contextlib.contextmanager
+    def _kb_view(self, intents=None, poets=None):
+        """
+        Takes a _KBView of the current KB under _kb_lock: the retriever, the
+        row mask (live rows of the given intent/poet filters; None: every
+        row) and the segments. The block scores and formats with it without
+        holding the lock; upserts and compaction only ever install new
+        objects, and a replaced retriever is not closed before the block exits.
+        """
+        with self._kb_lock:
+            row_mask = self._filter_mask(intents, poets)
+            if self._tombstoned_rows:
+                row_mask = self.row_alive if row_mask is None else row_mask & self.row_alive
+            main_kb = self.kb
+            self._kb_users[main_kb] += 1
+            view = _KBView(self.retriever, row_mask, self._segments())
+        try:
+            yield view
+        finally:
+            with self._kb_lock:
+                self._kb_users[main_kb] -= 1
+                idle = not self._kb_users[main_kb]
+                if idle:
+                    del self._kb_users[main_kb]
+                retired = self._retired_retrievers.pop(main_kb, None) if idle else None
+            if retired is not None:
+                retired.close()
+
+    def _retire_retriever(self, retriever):
+        """
+        Closes a retriever that is no longer installed, or, while queries are
+        still scoring against its main KB, leaves it to the last of them.
+        Retrievers of one main KB share its shard workers, so the last one
+        installed is the one closed.
+        """
+        main_kb = retriever.segments[0]
+        with self._kb_lock:
+            if self._kb_users[main_kb]:
+                self._retired_retrievers[main_kb] = retriever
+                return
+        retriever.close()
+
+    # --- Rule-Based Handler Functions (from poet_bot.py) ---
+
+    def _find_poet_by_name(self, name_query):
+        """Helper to find a poet from a partial name."""
+        return self.poet_index.find_by_name(name_query)
+
+    def _handle_kavitrayam(self, match):
+        return self.materialized_answers["kavitrayam", None]
+
+    def _handle_ashtadiggajalu(self, match):
+        return self.materialized_answers["ashtadiggajalu", None]
+
+    def _handle_list_by_era(self, match):
+        century_num = match.group(1) # This will be "12"
+        answer = self.materialized_answers.get(("list_by_era", century_num))
+        return answer if answer is not None else self._list_by_era_answer(self.poet_index, century_num)
+
+    def _handle_contemporaries(self, match):
+        name = match.group(1).strip()
+        target_poet = self._find_poet_by_name(name)
+        if not target_poet:
+            return f"క్షమించండి, '{name}' అనే కవి కనబడలేదు."
+        
+        target_era = target_poet['era']
+        poets = [p['name_telugu'] for p in self.poet_index.poets_in_era(target_era)
+                 if p['id'] != target_poet['id']]
+        
+        if poets:
+            return f"{target_poet['name_telugu']} గారి సమకాలికులు ({target_era}): {', '.join(poets)}"
+        return f"{target_era} కాలానికి చెందిన ఇతర కవులు ఈ డేటాసెట్‌లో లేరు."
+        
+    def _handle_find_poet_by_work(self, match):
+        work_query = match.group(1).strip().lower()
+        found_poets = [p['name_telugu'] for p in self.poet_index.poets_by_work(work_query)]
+        if found_poets:
+            return f"'{work_query}' అనే రచనను వీరు రాసారు: {', '.join(found_poets)}"
+        return f"క్షమించండి, '{work_query}' రాసిన కవిని కనుగొనలేకపోయాను."
+
+    # --- NEW: Handlers for our new complex intents ---
+    
+    def _handle_list_by_genre(self, match):
+        genre_query = match.group(1).strip().lower()
+        answer = self.materialized_answers.get(("list_by_genre", genre_query))
+        return answer if answer is not None else self._list_by_genre_answer(self.poet_index, genre_query)
+
+    def _handle_get_poem_by_genre_and_poet(self, match):
+        genre_query = match.group(1).strip().lower()
+        poet_name = match.group(2).strip()
+        
+        poet = self._find_poet_by_name(poet_name)
+        if not poet:
+            return f"క్షమించండి, '{poet_name}' అనే కవి కనబడలేదు."
+            
+        found_poems = []
+        for poem in poet.get('poems', []):
+            if genre_query in poem['genre'].lower():
+                found_poems.append(f"({poem['genre']}):\n{poem['text']}\n")
+        
+        if found_poems:
+            # Return the first match
+            return (f"{poet['name_telugu']} గారి నుండి '{genre_query}' శైలికి చెందిన పద్యం:\n\n" +
+                    found_poems[0])
+        return f"క్షమించండి, {poet['name_telugu']} గారి నుండి '{genre_query}' శైలికి చెందిన పద్యాలు కనుగొనబడలేదు."
+
+
+    # --- Materialised answers for the aggregate rules ---
+    # kavitrayam, ashtadiggajalu, list_by_era and list_by_genre answer with poet
+    # lists that only change with the dataset, so _index_poets precomputes them
+    # for both fixed groups, every century and every genre, keyed by
+    # (rule name, normalised parameter). Anything outside the table (a genre
+    # substring, a century no poet belongs to) is computed per question.
+
+    @classmethod
+    def _materialize_answers(cls, poet_index, poets_by_id):
+        answers = {("kavitrayam", None): cls._kavitrayam_answer(poets_by_id),
+                   ("ashtadiggajalu", None): cls._ashtadiggajalu_answer(poet_index)}
+        for century in poet_index.centuries():
+            # The list_by_era rule captures exactly two digits
+            if len(century) == 2:
+                answers["list_by_era", century] = cls._list_by_era_answer(poet_index, century)
+        for genre in poet_index.genres():
+            genre = genre.strip()
+            answers["list_by_genre", genre] = cls._list_by_genre_answer(poet_index, genre)
+        return answers
+
+    @classmethod
+    def _rematerialize_answers(cls, materialized_answers, poet_index, poets_by_id, changed_poets):
+        """
+        A copy of materialized_answers with only the answers that can mention
+        changed_poets (their old and new versions) recomputed, and the keys of
+        centuries and genres no poet has any more dropped. Equal to a full
+        _materialize_answers() of poet_index.
+        """
+        answers = dict(materialized_answers)
+        if any(p['id'] in (1, 2, 3) for p in changed_poets):
+            answers["kavitrayam", None] = cls._kavitrayam_answer(poets_by_id)
+        if any(keyword in p['biography_summary'] for p in changed_poets for keyword in BIOGRAPHY_KEYWORDS):
+            answers["ashtadiggajalu", None] = cls._ashtadiggajalu_answer(poet_index)
+
+        centuries = {century for century in poet_index.centuries() if len(century) == 2}
+        changed_centuries = {digits[-2:] for p in changed_poets
+                             for digits in CENTURY_PATTERN.findall(p['era']) if len(digits) >= 2}
+        # A genre answer lists every poet with a genre containing it
+        genres = {genre.strip() for genre in poet_index.genres()}
+        changed_genres = {poem['genre'].lower() for p in changed_poets for poem in p.get('poems', [])}
+        for rule, parameter in list(answers):
+            if rule == "list_by_era" and parameter not in centuries:
+                del answers[rule, parameter]
+            elif rule == "list_by_genre" and parameter not in genres:
+                del answers[rule, parameter]
+        for century in centuries & changed_centuries:
+            answers["list_by_era", century] = cls._list_by_era_answer(poet_index, century)
+        for genre in genres:
+            if any(genre in changed for changed in changed_genres):
+                answers["list_by_genre", genre] = cls._list_by_genre_answer(poet_index, genre)
+        return answers
+
+    @staticmethod
+    def _kavitrayam_answer(poets_by_id):
+        names = [poets_by_id.get(i, {}).get('name_telugu', f'ID {i} Not Found') for i in [1, 2, 3]]
+        return f"కవిత్రయం: {', '.join(names)}."
+
+    @staticmethod
+    def _ashtadiggajalu_answer(poet_index):
+        search_term = "అష్టదిగ్గజాలు"
+        poets = [p['name_telugu'] for p in poet_index.poets_with_biography_keyword(search_term)]
+        if poets:
+            return f"ఈ డేటాసెట్‌లో అష్టదిగ్గజాలుగా పేర్కొనబడిన కవులు: {', '.join(poets)}"
+        return "ఈ డేటాసెట్‌లో 'అష్టదిగ్గజాలు' అని స్పష్టంగా ఎవరూ లేరు."
+
+    @staticmethod
+    def _list_by_era_answer(poet_index, century_num):
+        poets = [p['name_telugu'] for p in poet_index.poets_in_century(century_num)]
+        if poets:
+            return f"{century_num}వ శతాబ్దపు కవులు: {', '.join(poets)}"
+        return f"క్షమించండి, {century_num}వ శతాబ్దానికి చెందిన కవులు ఎవరూ కనబడలేదు."
+
+    @staticmethod
+    def _list_by_genre_answer(poet_index, genre_query):
+        found_poets = [p['name_telugu'] for p in poet_index.poets_by_genre(genre_query)]
+        if found_poets:
+            return f"'{genre_query}' శైలిలో పద్యాలు రాసిన కవులు: {', '.join(found_poets)}"
+        return f"క్షమించండి, '{genre_query}' శైలిలో పద్యాలు రాసిన కవులు ఈ డేటాసెట్‌లో కనబడలేదు."
+
+    # --- THE ULTIMATE LOGIC: get_response ---
+
+    def get_response(self, user_question):
+        """
+        The main Hybrid Logic.
+        1. Try to match a specific RULE.
+        2. If no rule matches, use the flexible RETRIEVAL model.
+        """
+        return self.get_response_details([user_question])[0].response
+
+    def get_responses(self, user_questions):
+        """
+        Batch version of get_response: answers exactly as get_response would.
+        Questions are answered in Unicode NFC (see response_cache); with the
+        response cache enabled, only cache misses are computed (once each).
+        """
+        return [info.response for info in self.get_response_details(user_questions)]
+
+    def get_response_details(self, user_questions):
+        """get_responses, returning a ResponseInfo (response, rule, intent, score, cached) per question."""
+        self.instrumentation.count("questions", len(user_questions))
+        questions = [normalize_question(q) for q in user_questions]
+        if self.response_cache is None:
+            return self._compute_responses(questions)
+        
+        infos = [self.response_cache.get(question) for question in questions]
+        missing = list(dict.fromkeys(question for question, info in zip(questions, infos) if info is None))
+        self.instrumentation.count("cached_answers", len(questions) - sum(info is None for info in infos))
+        computed = {}
+        if missing:
+            generation = self.response_cache.generation
+            computed = dict(zip(missing, self._compute_responses(missing)))
+            for question, info in computed.items():
+                self.response_cache.put(question, info, generation)
+        return [computed[question] if info is None else info._replace(cached=True)
+                for question, info in zip(questions, infos)]
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters of the response cache (None when disabled)."""
+        return None if self.response_cache is None else self.response_cache.stats()
+
+    def _compute_responses(self, user_questions):
+        """
+        The rule pass runs per question; all unmatched questions are then
+        scored by the retriever in one call. Returns a ResponseInfo per question.
+        """
+        responses = [None] * len(user_questions)
+        
+        # --- 1. Try Rule-Based Matching First ---
+        retrieval_positions = []
+        for position, user_question in enumerate(user_questions):
+            rule_response = self._match_rule(user_question)
+            if rule_response is None:
+                retrieval_positions.append(position)
+            else:
+                responses[position] = rule_response
+        
+        # --- 2. Use the Retrieval Model for everything else ---
+        if retrieval_positions:
+            with self._kb_view() as view:
+                threshold = (view.retriever.default_threshold if self.retrieval_threshold is None
+                             else self.retrieval_threshold)
+                # Unfiltered, so a miss still reports the best score it got
+                top_matches = self._score_questions([user_questions[p] for p in retrieval_positions], k=1, view=view)
+                for position, matches in zip(retrieval_positions, top_matches):
+                    if not matches or matches[0][1] < threshold:
+                        self.instrumentation.count("retrieval_misses")
+                        responses[position] = ResponseInfo(NOT_UNDERSTOOD_RESPONSE,
+                                                           score=matches[0][1] if matches else None)
+                    else:
+                        row, score = matches[0]
+                        with self.instrumentation.span("format"):
+                            response, intent = self._format_retrieved_answer(row, view.segments)
+                        responses[position] = ResponseInfo(response, intent=intent, score=score)
+        return responses
+
+    def _match_rule(self, user_question):
+        """Returns the ResponseInfo of the first matching rule, or None."""
+        with self.instrumentation.span("rule_scan"):
+            rule, match = self.rule_dispatcher.match(user_question)
+        if rule is None:
+            return None
+        if self.debug:
+            print(f"--- (Debug: Matched Rule: {rule.pattern.pattern}) ---")
+        self.instrumentation.count("rule_answers", rule=rule.name)
+        with self.instrumentation.span("rule_handler"):
+            return ResponseInfo(rule.handler(match), rule=rule.name)
+
+    def rule_stats(self):
+        """Per-rule hit counters and regex timings since startup."""
+        return self.rule_dispatcher.stats()
+
+    # --- Instrumentation ---
+
+    def export_metrics(self, format="prometheus"):
+        """
+        Stage timers, per-query spans and answer counters (collected when the
+        engine was built with instrument=True), plus KB size, cache and rule
+        dispatch statistics, as Prometheus text ("prometheus") or "json".
+        """
+        gauges = [("kb_rows", {}, self.kb.num_entries), ("kb_generation", {}, self.kb_generation),
+                  ("materialized_answers", {}, len(self.materialized_answers))]
+        cache_stats = self.cache_stats()
+        if cache_stats is not None:
+            gauges += [(f"cache_{name}", {}, value) for name, value in cache_stats.items()]
+        for stats in self.rule_stats():
+            gauges += [(f"rule_{name}", {"rule": stats['rule']}, value)
+                       for name, value in stats.items() if name != 'rule']
+        if format == "prometheus":
+            return self.instrumentation.to_prometheus(extra_gauges=gauges)
+        if format == "json":
+            data = self.instrumentation.to_dict()
+            data["gauges"] = [{"name": name, "labels": labels, "value": value} for name, labels, value in gauges]
+            return json.dumps(data, ensure_ascii=False, indent=2)
+        raise ValueError(f"Unknown metrics format {format!r}; use 'prometheus' or 'json'")
+
+    def start_profiler(self, interval=0.005):
+        """Starts sampling the Python stacks of all threads every `interval` seconds."""
+        if self._profiler is None:
+            self._profiler = SamplingProfiler(interval)
+            self._profiler.start()
+
+    def stop_profiler(self):
+        """Stops the sampling profiler; returns the samples as collapsed stacks (flamegraph input)."""
+        if self._profiler is None:
+            return ""
+        self._profiler.stop()
+        profile, self._profiler = self._profiler.collapsed(), None
+        return profile
+
+    def _score_questions(self, questions, k=1, threshold=0.0, view=None):
+        """
+        Scores the questions against the live KB rows with the configured
+        retriever. Returns, per question, up to k (row, score) pairs scoring at
+        least threshold (None: the retriever's default), best first; ties go
+        to the lower row, like argmax. view: the _KBView to score against
+        (default: a fresh, unfiltered one).
+        """
+        if view is None:
+            with self._kb_view() as view:
+                return self._score_questions(questions, k=k, threshold=threshold, view=view)
+        with self.instrumentation.span("transform"):
+            query_vectors = view.retriever.encode(questions)
+        with self.instrumentation.span("scoring"):
+            return view.retriever.retrieve(questions, k=k, threshold=threshold, row_mask=view.row_mask,
+                                           query_vectors=query_vectors)
+
+    # --- Multi-answer retrieval ---
+
+    def retrieve(self, question, k=5, intent=None, poet=None, threshold=None):
+        """
+        The top-k distinct answers to `question`, best first, as RetrievedAnswer
+        tuples (response formatted as get_response would, score, intent,
+        poet_name, genre, answer_text, row). An answer and the question
+        paraphrases pointing at it count once, at their best score.
+        intent / poet: an intent name or a poet (id or name_telugu), or a list
+        of them; only their rows are scored. threshold: minimum score (None:
+        the engine's retrieval threshold).
+        """
+        with self._kb_view(intent, poet) as view:
+            # No answer has more than max_rows_per_answer rows, so the top k * that many
+            # rows always contain the k best distinct answers
+            fetch = k * max(kb.max_rows_per_answer for kb in view.segments)
+            threshold = self.retrieval_threshold if threshold is None else threshold
+            matches = self._score_questions([normalize_question(question)], k=fetch, threshold=threshold,
+                                            view=view)[0]
+        if not matches:
+            return []
+        rows = np.array([row for row, _ in matches])
+        answer_rows = rows.copy()
+        for kb in view.segments:
+            in_kb = (rows >= kb.row_offset) & (rows < kb.row_offset + kb.num_rows)
+            answer_rows[in_kb] = kb.answer_rows(rows[in_kb])
+        # Matches are best first, so the first row of each answer carries its best score
+        _, first = np.unique(answer_rows, return_index=True)
+        results = []
+        for position in np.sort(first)[:k].tolist():
+            answer_row = int(answer_rows[position])
+            answer_text, intent_name, poet_name, genre = _segment_of(view.segments, answer_row).answer_of(answer_row)
+            results.append(RetrievedAnswer(self._format_answer(intent_name, poet_name, genre, answer_text),
+                                           matches[position][1], intent_name, poet_name, genre, answer_text,
+                                           answer_row))
+        return results
+
+    def _filter_mask(self, intents=None, poets=None):
+        """
+        Row mask selecting the rows of the given intents and poets (None: no
+        filter). Raises ValueError for a filter that is not a value or a
+        non-empty list of values of the right type.
+        """
+        mask = None
+        if intents is not None:
+            intents = _filter_values("intent", intents, (str,))
+            for intent in intents:
+                if intent not in RETRIEVAL_QUESTIONS:
+                    raise ValueError(f"Unknown intent {intent!r}; choose from {', '.join(RETRIEVAL_QUESTIONS)}")
+                if intent not in self._intent_masks:
+                    self._intent_masks[intent] = np.concatenate([kb.intent_row_mask(intent)
+                                                                 for kb in self._segments()])
+            mask = np.logical_or.reduce([self._intent_masks[intent] for intent in intents])
+        if poets is not None:
+            poets = _filter_values("poet", poets, (str, int))
+            poet_mask = np.zeros(len(self.row_alive), dtype=bool)
+            for poet in poets:
+                poet_id = poet if isinstance(poet, int) else self.poets_by_name.get(poet.strip(), {}).get('id')
+                for start, end in self.poet_rows.get(poet_id, []) + self._delta_poet_rows.get(poet_id, []):
+                    poet_mask[start:end] = True
+            mask = poet_mask if mask is None else mask & poet_mask
+        return mask
+
+    def _format_retrieved_answer(self, best_index, segments):
+        """(response text, intent) for a retrieved KB row of `segments`."""
+        # Question rows resolve to the answer they point to
+        answer_text, type, poet, genre = _segment_of(segments, best_index).answer_of(best_index)
+        self.instrumentation.count("retrieval_answers", intent=type)
+        
+        # --- 3. Format the Retrieved Answer ---
+        return self._format_answer(type, poet, genre, answer_text), type
+
+    @staticmethod
+    def _format_answer(type, poet, genre, answer_text):
+        if type == 'ask_biography':
+            return f"{poet} గారి గురించి ఇక్కడ కొంత సమాచారం ఉంది: \n{answer_text}"
+        elif type == 'ask_titles':
+            return f"{poet} గారి బిరుదులు: \n{answer_text}"
+        elif type == 'ask_famous_works':
+            return f"{poet} గారి ప్రసిద్ధ రచనలు: \n{answer_text}"
+        elif type == 'ask_era':
+            return f"{poet} గారి కాలం: \n{answer_text}"
+        elif type == 'ask_birth_place':
+            return f"{poet} గారి జనన స్థలం: \n{answer_text}"
+        elif type == 'ask_lifespan':
+            return f"{poet} గారి జీవన కాలం: \n{answer_text}"
+        # This now handles the simple "display poem of Nannaya" request
+        elif type == 'ask_poem':
+            return f"{poet} గారి పద్యం (శైలి: {genre}): \n{answer_text}"
+        
+        return answer_text
+
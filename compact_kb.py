@@ -0,0 +1,555 @@
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+from retrieval_index import InvertedIndex, merge_top_k, top_k
+
+# --- Compact retrieval KB ---
+# The retrieval KB used to hold, next to every answer, one document per
+# question template with the poet's name filled in ("POET_NAME ఎవరు?"), each
+# with its own metadata dict and TF-IDF row -- tens of near-identical rows per
+# poet. Here only the answers are stored as text, with their metadata in int
+# arrays, and there is one question row per (poet, template) whose TF-IDF
+# counts are kept factored:
+#
+#     counts(question) = counts(template) + counts(name) + counts(n-grams spanning both)
+#
+# so a query's score against every question row follows from its dot products
+# with a handful of template vectors, one name vector per poet and a couple of
+# boundary n-grams per row, divided by the row's precomputed norm.
+#
+# Row layout (plus row_offset):
+#     [0, num_answers)                                answer rows
+#     num_answers + poet * num_templates + template   question rows
+#
+# A poet with several answers of one intent (poems) gets one question row per
+# template, pointing at the first of them: the repeated rows the old layout
+# stored could never outrank it. IDF is still computed over the documents the
+# old layout stored (every template once per answer), so scores are unchanged.
+
+PLACEHOLDER = "POET_NAME"
+# TfidfVectorizer's default token pattern
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Sparse matrices of a CompactKB, saved as <name>_data/_indices/_indptr arrays
+MATRICES = ("answer_vectors", "template_vectors", "name_vectors", "boundary_vectors")
+ARRAYS = ("answer_intent", "answer_poet", "answer_genre", "question_answer", "question_norm",
+          "question_multiplicity")
+
+
+class CompactKB:
+    def __init__(self, arrays, info, row_offset=0):
+        """
+        arrays: the int/float arrays and sparse matrices listed in ARRAYS and
+        MATRICES (see build_compact_kb). info: the lists of strings (poet
+        names/ids, answer texts, genres, intents, templates).
+        """
+        self.row_offset = row_offset
+        for name in ARRAYS + MATRICES:
+            setattr(self, name, arrays[name])
+        self.poet_ids = info["poet_ids"]
+        self.poet_names = info["poet_names"]
+        self.answer_texts = info["answer_texts"]
+        self.genres = info["genres"]
+        self.intents = info["intents"]
+        self.templates = info["templates"]
+        self.template_intent = info["template_intent"]
+
+        self.num_answers = len(self.answer_texts)
+        self.num_poets = len(self.poet_names)
+        self.num_templates = len(self.templates)
+        self.num_rows = self.num_answers + self.num_poets * self.num_templates
+        valid = self.question_answer >= 0
+        self.num_entries = self.num_answers + int(valid.sum())
+        # Logical documents (answers + every template once per answer) the IDF is defined over
+        self.num_documents = self.num_answers + int(self.question_multiplicity.sum())
+
+        self.answer_index = InvertedIndex(self.answer_vectors, row_offset=row_offset)
+        self._template_index = InvertedIndex(self.template_vectors)
+        self._name_index = InvertedIndex(self.name_vectors)
+        self._boundary_index = InvertedIndex(self.boundary_vectors)
+        # Per template, its valid question cells by ascending norm (ties: lower cell):
+        # a query matching only the template scores highest on the first of them
+        cells = np.arange(len(self.question_answer))
+        self._cells_by_norm = []
+        for template in range(self.num_templates):
+            template_cells = cells[template::self.num_templates][valid[template::self.num_templates]]
+            order = np.lexsort((template_cells, self.question_norm[template_cells]))
+            self._cells_by_norm.append(template_cells[order])
+
+    @property
+    def nnz(self):
+        return sum(getattr(self, name).nnz for name in MATRICES)
+
+    # --- Scoring ---
+
+    def search(self, query_vectors, k=1, row_mask=None):
+        """
+        Same contract as InvertedIndex.search, over answer and question rows:
+        per query, up to k (row, score) pairs, best first, ties to the lower row.
+        """
+        query_vectors = csr_matrix(query_vectors)
+        results = []
+        for start, end in zip(query_vectors.indptr[:-1], query_vectors.indptr[1:]):
+            terms, weights = query_vectors.indices[start:end], query_vectors.data[start:end]
+            answers = self.answer_index._search_one(terms, weights, k, row_mask)
+            results.append(merge_top_k([answers] + self._search_questions(terms, weights, k, row_mask), k))
+        return results
+
+    def _search_questions(self, terms, weights, k, row_mask):
+        base = self.row_offset + self.num_answers
+        num_templates = self.num_templates
+        template_ids, template_scores = self._template_index.score(terms, weights)
+        poets, name_scores = self._name_index.score(terms, weights)
+        boundary_cells, boundary_scores = self._boundary_index.score(terms, weights)
+
+        # Rows whose name or boundary n-grams match: score them exactly
+        extra_cells = boundary_cells[~np.isin(boundary_cells // num_templates, poets)]
+        cells = np.concatenate([(poets[:, None] * num_templates + np.arange(num_templates)).ravel(), extra_cells])
+        if len(extra_cells):
+            cells.sort()
+        cells = cells[self.question_answer[cells] >= 0]
+        results = []
+        if len(cells):
+            numerators = np.zeros(len(cells))
+            if len(template_ids):
+                score_of_template = np.zeros(num_templates)
+                score_of_template[template_ids] = template_scores
+                numerators += score_of_template[cells % num_templates]
+            numerators += _lookup(poets, name_scores, cells // num_templates)
+            numerators += _lookup(boundary_cells, boundary_scores, cells)
+            rows = cells + base
+            scores = numerators / self.question_norm[cells]
+            if row_mask is not None:
+                keep = row_mask[rows]
+                rows, scores = rows[keep], scores[keep]
+            results.append(top_k(rows, scores, k))
+
+        # Every other row of a matching template scores template_score / norm
+        candidates = []
+        if row_mask is None:
+            matched_poets = set(poets.tolist())
+            matched_cells = set(extra_cells.tolist())
+            for template, template_score in zip(template_ids.tolist(), template_scores.tolist()):
+                ordered = self._cells_by_norm[template]
+                found = 0
+                for start in range(0, len(ordered), 64):
+                    for cell in ordered[start:start + 64].tolist():
+                        if cell // num_templates in matched_poets or cell in matched_cells:
+                            continue
+                        candidates.append((base + cell, float(template_score / self.question_norm[cell])))
+                        found += 1
+                        if found == k:
+                            break
+                    if found == k:
+                        break
+        else:
+            # A filter mask may skip most cells: test them in doubling, vectorised chunks
+            for template, template_score in zip(template_ids.tolist(), template_scores.tolist()):
+                ordered = self._cells_by_norm[template]
+                found = []
+                start, chunk = 0, max(64, 2 * k)
+                while start < len(ordered) and len(found) < k:
+                    chunk_cells = ordered[start:start + chunk]
+                    keep = row_mask[base + chunk_cells] & ~np.isin(chunk_cells // num_templates, poets)
+                    if len(extra_cells):
+                        keep &= ~np.isin(chunk_cells, extra_cells)
+                    found.extend(chunk_cells[keep][:k - len(found)].tolist())
+                    start, chunk = start + chunk, chunk * 2
+                candidates.extend((base + cell, float(template_score / self.question_norm[cell])) for cell in found)
+        results.append(candidates)
+        return results
+
+    # --- Row lookups ---
+
+    def answer_of(self, row):
+        """(answer_text, intent, poet_name, genre) of the answer a KB row points to."""
+        answer = row - self.row_offset
+        if answer >= self.num_answers:
+            answer = int(self.question_answer[answer - self.num_answers])
+        genre = self.answer_genre[answer]
+        return (self.answer_texts[answer], self.intents[self.answer_intent[answer]],
+                self.poet_names[self.answer_poet[answer]], None if genre < 0 else self.genres[genre])
+
+    def answer_rows(self, rows):
+        """The answer row each of `rows` resolves to (answer rows resolve to themselves)."""
+        local = np.asarray(rows) - self.row_offset
+        questions = local >= self.num_answers
+        local[questions] = self.question_answer[local[questions] - self.num_answers]
+        return local + self.row_offset
+
+    @property
+    def max_rows_per_answer(self):
+        """Most rows resolving to one answer: the answer row plus one question row per template of its intent."""
+        return 1 + max(Counter(self.template_intent).values(), default=0)
+
+    def intent_row_mask(self, intent):
+        """Boolean mask over this KB's num_rows rows: the answer and question rows of `intent`."""
+        mask = np.zeros(self.num_rows, dtype=bool)
+        if intent not in self.intents:
+            return mask
+        intent_id = self.intents.index(intent)
+        mask[:self.num_answers] = self.answer_intent == intent_id
+        mask[self.num_answers:] = (np.tile(np.asarray(self.template_intent) == intent_id, self.num_poets)
+                                   & (self.question_answer >= 0))
+        return mask
+
+    def poet_row_ranges(self):
+        """poet id -> list of (start, end) row ranges holding that poet's rows."""
+        answer_bounds = np.searchsorted(self.answer_poet, np.arange(self.num_poets + 1))
+        base = self.row_offset + self.num_answers
+        ranges = {}
+        for poet, poet_id in enumerate(self.poet_ids):
+            ranges.setdefault(poet_id, []).extend([
+                (self.row_offset + int(answer_bounds[poet]), self.row_offset + int(answer_bounds[poet + 1])),
+                (base + poet * self.num_templates, base + (poet + 1) * self.num_templates),
+            ])
+        return ranges
+
+    def poet_slice(self, first, last):
+        """
+        (kb, answer_start, question_start): a CompactKB (row_offset 0) of poets
+        [first, last) and their answers, with the same vocabulary and
+        templates. Its answer rows start at row answer_start of this KB and
+        its question rows at question_start, in the same order, so its scores
+        and tie-breaks are this KB's.
+        """
+        answer_bounds = np.searchsorted(self.answer_poet, [first, last])
+        answers = slice(int(answer_bounds[0]), int(answer_bounds[1]))
+        cells = slice(first * self.num_templates, last * self.num_templates)
+        question_answer = np.array(self.question_answer[cells])
+        question_answer[question_answer >= 0] -= answers.start
+        arrays = {
+            "answer_intent": self.answer_intent[answers],
+            "answer_poet": self.answer_poet[answers] - first,
+            "answer_genre": self.answer_genre[answers],
+            "question_answer": question_answer,
+            "question_norm": self.question_norm[cells],
+            "question_multiplicity": self.question_multiplicity[cells],
+            "answer_vectors": self.answer_vectors[answers],
+            "template_vectors": self.template_vectors,
+            "name_vectors": self.name_vectors[first:last],
+            "boundary_vectors": self.boundary_vectors[cells],
+        }
+        info = {
+            "poet_ids": self.poet_ids[first:last],
+            "poet_names": self.poet_names[first:last],
+            "answer_texts": self.answer_texts[answers],
+            "genres": self.genres,
+            "intents": self.intents,
+            "templates": self.templates,
+            "template_intent": self.template_intent,
+        }
+        return (CompactKB(arrays, info), self.row_offset + answers.start,
+                self.row_offset + self.num_answers + cells.start)
+
+    def iter_documents(self):
+        """
+        (row, text, metadata) for every answer and question row, with question
+        texts rendered from their template on the fly.
+        """
+        for answer in range(self.num_answers):
+            text, intent, poet_name, genre = self.answer_of(self.row_offset + answer)
+            meta = {'poet_name': poet_name, 'type': intent, 'is_answer': True,
+                    'doc_index': self.row_offset + answer}
+            if genre is not None:
+                meta['genre'] = genre
+            yield self.row_offset + answer, text, meta
+        for cell in np.flatnonzero(self.question_answer >= 0).tolist():
+            poet, template = divmod(cell, self.num_templates)
+            text = self.templates[template].replace(PLACEHOLDER, self.poet_names[poet])
+            meta = {'is_answer': False, 'points_to_index': self.row_offset + int(self.question_answer[cell])}
+            yield self.row_offset + self.num_answers + cell, text, meta
+
+    def materialize(self):
+        """The equivalent (num_rows x num_terms) matrix of L2-normalised rows (for checks and benchmarks)."""
+        cells = np.arange(len(self.question_answer))
+        num_cells = len(cells)
+        select_template = csr_matrix((np.ones(num_cells), (cells, cells % self.num_templates)),
+                                     shape=(num_cells, self.num_templates))
+        select_poet = csr_matrix((np.ones(num_cells), (cells, cells // self.num_templates)),
+                                 shape=(num_cells, self.num_poets))
+        width = self.answer_vectors.shape[1]
+        questions = (_widen(select_template @ self.template_vectors, width)
+                     + _widen(select_poet @ self.name_vectors, width) + _widen(self.boundary_vectors, width))
+        scale = np.zeros(num_cells)
+        # Question rows without any term (norm 0) stay zero rows, as TfidfVectorizer leaves them
+        scored = (self.question_answer >= 0) & (self.question_norm > 0)
+        scale[scored] = 1.0 / self.question_norm[scored]
+        questions = csr_matrix(questions.multiply(scale[:, None]))
+        return vstack([self.answer_vectors, questions], format="csr")
+
+    # --- Persistence ---
+
+    def to_arrays(self):
+        """(arrays, info) for kb_snapshot: plain numpy arrays plus a JSON-serialisable dict."""
+        arrays = {name: getattr(self, name) for name in ARRAYS}
+        info = {"poet_ids": self.poet_ids, "poet_names": self.poet_names, "answer_texts": self.answer_texts,
+                "genres": self.genres, "intents": self.intents, "templates": self.templates,
+                "template_intent": self.template_intent, "shapes": {}}
+        for name in MATRICES:
+            matrix = getattr(self, name)
+            arrays[f"{name}_data"] = matrix.data
+            arrays[f"{name}_indices"] = matrix.indices
+            arrays[f"{name}_indptr"] = matrix.indptr
+            info["shapes"][name] = list(matrix.shape)
+        return arrays, info
+
+    @classmethod
+    def from_arrays(cls, arrays, info, row_offset=0):
+        arrays = dict(arrays)
+        for name in MATRICES:
+            arrays[name] = csr_matrix((arrays.pop(f"{name}_data"), arrays.pop(f"{name}_indices"),
+                                       arrays.pop(f"{name}_indptr")), shape=tuple(info["shapes"][name]), copy=False)
+        return cls(arrays, info, row_offset=row_offset)
+
+
+def build_compact_kb(poets, poet_answers, questions_by_intent, vectorizer=None, ngram_range=(1, 2),
+                     row_offset=0, existing_documents=0):
+    """
+    Builds the compact KB for `poets`. poet_answers(poet) returns the poet's
+    (intent, answer_text, extra_meta) triples; questions_by_intent maps an
+    intent to its question templates (each containing POET_NAME once).
+
+    Without a vectorizer, the TF-IDF vocabulary and IDF are fitted here. With
+    one (rows appended to an existing KB), rows are weighted with its IDF;
+    terms it has never seen are appended with an IDF estimated from the
+    existing_documents already in the KB plus these rows.
+    Returns (kb, vectorizer); the vectorizer is a new object if it changed.
+    """
+    # Imported here so that loading a snapshot does not pull in scikit-learn
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+
+    analysis = TfidfVectorizer(ngram_range=ngram_range) if vectorizer is None else vectorizer
+    preprocess, tokenize = analysis.build_preprocessor(), analysis.build_tokenizer()
+    ngram_range = analysis.ngram_range
+
+    def tokens_of(text):
+        return tokenize(preprocess(text))
+
+    # --- Templates ---
+    intents = list(questions_by_intent)
+    templates, template_intent, template_parts = [], [], []
+    for intent_id, intent in enumerate(intents):
+        for template in questions_by_intent[intent]:
+            prefix, placeholder, suffix = template.partition(PLACEHOLDER)
+            if not placeholder or PLACEHOLDER in suffix:
+                raise ValueError(f"Question template must contain {PLACEHOLDER} exactly once: {template!r}")
+            if re.match(r"\w", suffix[:1]) or re.match(r"\w", prefix[-1:]):
+                # The name's tokens would merge with the template's
+                raise ValueError(f"{PLACEHOLDER} must not touch a word character: {template!r}")
+            templates.append(template)
+            template_intent.append(intent_id)
+            template_parts.append((tokens_of(prefix), tokens_of(suffix)))
+    num_templates = len(templates)
+
+    # --- Answers and question cells ---
+    genres, genre_ids = [], {}
+    answer_texts, answer_intent, answer_poet, answer_genre = [], [], [], []
+    question_answer = np.full(len(poets) * num_templates, -1, dtype=np.int32)
+    question_multiplicity = np.zeros(len(poets) * num_templates, dtype=np.int32)
+    templates_of_intent = {}
+    for template, intent_id in enumerate(template_intent):
+        templates_of_intent.setdefault(intent_id, []).append(template)
+    for poet_position, poet in enumerate(poets):
+        for intent, text, extra_meta in poet_answers(poet):
+            if intent not in intents:
+                intents.append(intent)
+            intent_id = intents.index(intent)
+            genre = extra_meta.get('genre')
+            if genre is not None and genre not in genre_ids:
+                genre_ids[genre] = len(genres)
+                genres.append(genre)
+            for template in templates_of_intent.get(intent_id, []):
+                cell = poet_position * num_templates + template
+                if question_answer[cell] < 0:
+                    question_answer[cell] = len(answer_texts)
+                question_multiplicity[cell] += 1
+            answer_texts.append(text)
+            answer_intent.append(intent_id)
+            answer_poet.append(poet_position)
+            answer_genre.append(-1 if genre is None else genre_ids[genre])
+
+    # --- Term counts ---
+    answer_grams = [_ngrams(tokens_of(text), ngram_range) for text in answer_texts]
+    name_tokens = [tokens_of(poet['name_telugu']) for poet in poets]
+    name_grams = [_ngrams(tokens, ngram_range) for tokens in name_tokens]
+    template_grams = [_ngrams(prefix, ngram_range) + _ngrams(suffix, ngram_range)
+                      for prefix, suffix in template_parts]
+    boundary_grams = []
+    for cell in range(len(question_answer)):
+        poet_position, template = divmod(cell, num_templates)
+        if question_answer[cell] < 0:
+            boundary_grams.append([])
+            continue
+        prefix, suffix = template_parts[template]
+        boundary_grams.append(_spanning_ngrams(prefix, name_tokens[poet_position], suffix, ngram_range))
+
+    # Terms of the logical documents: names and templates only count where they have a question row
+    has_questions = (question_answer >= 0).reshape(len(poets), num_templates)
+    terms = {term for grams in answer_grams + boundary_grams for term in grams}
+    terms.update(term for grams, used in zip(name_grams, has_questions.any(axis=1)) if used for term in grams)
+    terms.update(term for grams, used in zip(template_grams, has_questions.any(axis=0)) if used for term in grams)
+    if vectorizer is None:
+        vocabulary = {term: column for column, term in enumerate(sorted(terms))}
+        new_terms = []
+    else:
+        vocabulary = dict(vectorizer.vocabulary_)
+        new_terms = sorted(terms - vocabulary.keys())
+        for term in new_terms:
+            vocabulary[term] = len(vocabulary)
+
+    answer_counts, name_counts, template_counts, boundary_counts = (
+        _count_matrix(grams, vocabulary) for grams in (answer_grams, name_grams, template_grams, boundary_grams))
+
+    # Question rows as they would be materialised, a block of poets at a time
+    # (only needed for document frequencies and norms)
+    def question_blocks():
+        return _question_count_blocks(template_counts, name_counts, boundary_counts, num_templates)
+
+    num_documents = len(answer_texts) + int(question_multiplicity.sum())
+    if vectorizer is None or new_terms:
+        # Document frequencies over the logical documents: answers, plus every
+        # template once per answer of its intent
+        df = np.bincount(answer_counts.indices, minlength=len(vocabulary))
+        for cells, question_counts in question_blocks():
+            df += (question_counts > 0).T @ question_multiplicity[cells]
+        if vectorizer is None:
+            # Same arithmetic as TfidfTransformer.fit with smooth_idf=True
+            df = df.astype(np.float64)
+            df += 1.0
+            idf = np.log((num_documents + 1) / df) + 1.0
+        else:
+            total_documents = existing_documents + num_documents
+            new_idf = [math.log((1 + total_documents) / (1 + df[vocabulary[term]])) + 1 for term in new_terms]
+            idf = np.concatenate([vectorizer.idf_, new_idf])
+        # A fresh vectorizer set up with this vocabulary and IDF (no refit)
+        vectorizer = TfidfVectorizer(ngram_range=ngram_range)
+        vectorizer.vocabulary_ = vocabulary
+        vectorizer.idf_ = idf
+    idf = vectorizer.idf_
+
+    # Same arithmetic as TfidfTransformer.transform
+    answer_vectors = answer_counts.copy()
+    answer_vectors.data *= idf[answer_vectors.indices]
+    answer_vectors = normalize(answer_vectors, norm="l2", copy=False)
+    question_norm = np.zeros(len(question_answer))
+    for cells, question_counts in question_blocks():
+        weighted_questions = _weighted(question_counts, idf)
+        question_norm[cells] = np.sqrt(np.asarray(weighted_questions.multiply(weighted_questions).sum(axis=1)).ravel())
+
+    arrays = {
+        "answer_intent": np.asarray(answer_intent, dtype=np.int16),
+        "answer_poet": np.asarray(answer_poet, dtype=np.int32),
+        "answer_genre": np.asarray(answer_genre, dtype=np.int32),
+        "question_answer": question_answer,
+        "question_norm": question_norm,
+        "question_multiplicity": question_multiplicity,
+        "answer_vectors": answer_vectors,
+        "template_vectors": _weighted(template_counts, idf),
+        "name_vectors": _weighted(name_counts, idf),
+        "boundary_vectors": _weighted(boundary_counts, idf),
+    }
+    info = {
+        "poet_ids": [poet['id'] for poet in poets],
+        "poet_names": [poet['name_telugu'] for poet in poets],
+        "answer_texts": answer_texts,
+        "genres": genres,
+        "intents": intents,
+        "templates": templates,
+        "template_intent": template_intent,
+    }
+    return CompactKB(arrays, info, row_offset=row_offset), vectorizer
+
+
+def tfidf_transform(texts, vocabulary, idf, ngram_range):
+    """
+    TfidfVectorizer(ngram_range=ngram_range).transform(texts) for a fitted
+    vocabulary and IDF, without scikit-learn: the same analyzer, counts, IDF
+    weighting and l2 row normalisation (each row's sum of squares is added up
+    in order, as sklearn does), so the vectors are identical.
+    """
+    counts = _count_matrix([_ngrams(TOKEN_PATTERN.findall(text.lower()), ngram_range) for text in texts], vocabulary)
+    vectors = _weighted(counts, idf)
+    data, indptr = vectors.data, vectors.indptr
+    for row in range(len(texts)):
+        start, end = indptr[row], indptr[row + 1]
+        sum_squares = 0.0
+        for value in data[start:end]:
+            sum_squares += value * value
+        if sum_squares:
+            data[start:end] /= math.sqrt(sum_squares)
+    return vectors
+
+
+def _ngrams(tokens, ngram_range):
+    """Word n-grams of a token list, as TfidfVectorizer's analyzer produces them."""
+    min_n, max_n = ngram_range
+    grams = list(tokens) if min_n == 1 else []
+    for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+        grams.extend(" ".join(tokens[start:start + n]) for start in range(len(tokens) - n + 1))
+    return grams
+
+
+def _spanning_ngrams(prefix, name, suffix, ngram_range):
+    """N-grams of prefix + name + suffix that span a part boundary."""
+    tokens = prefix + name + suffix
+    cuts = (len(prefix), len(prefix) + len(name))
+    min_n, max_n = ngram_range
+    grams = []
+    for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+        starts = set()
+        for cut in cuts:
+            starts.update(range(max(0, cut - n + 1), min(cut, len(tokens) - n + 1)))
+        grams.extend(" ".join(tokens[start:start + n]) for start in sorted(starts))
+    return grams
+
+
+def _count_matrix(rows, vocabulary):
+    """Term counts per row; n-grams outside the vocabulary are dropped."""
+    indptr, indices, counts = [0], [], []
+    for grams in rows:
+        row_counts = Counter(vocabulary[gram] for gram in grams if gram in vocabulary)
+        columns = sorted(row_counts)
+        indices.extend(columns)
+        counts.extend(row_counts[column] for column in columns)
+        indptr.append(len(indices))
+    return csr_matrix((np.asarray(counts, dtype=np.float64), np.asarray(indices, dtype=np.int32),
+                       np.asarray(indptr, dtype=np.int64)), shape=(len(rows), len(vocabulary)))
+
+
+def _question_count_blocks(template_counts, name_counts, boundary_counts, num_templates, block_poets=1024):
+    """Yields (cell slice, term counts of those question cells), block_poets poets at a time."""
+    num_poets = name_counts.shape[0]
+    for first in range(0, num_poets, block_poets):
+        last = min(first + block_poets, num_poets)
+        cells = slice(first * num_templates, last * num_templates)
+        rows = np.arange(cells.stop - cells.start)
+        ones = np.ones(len(rows))
+        select_template = csr_matrix((ones, (rows, rows % num_templates)), shape=(len(rows), num_templates))
+        select_poet = csr_matrix((ones, (rows, rows // num_templates)), shape=(len(rows), last - first))
+        counts = select_template @ template_counts + select_poet @ name_counts[first:last] + boundary_counts[cells]
+        yield cells, csr_matrix(counts)
+
+
+def _weighted(counts, idf):
+    weighted = counts.copy()
+    weighted.data *= idf[weighted.indices]
+    return weighted
+
+
+def _widen(matrix, width):
+    matrix = csr_matrix(matrix)
+    return csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], width))
+
+
+def _lookup(sorted_keys, values, queries):
+    """values[i] where sorted_keys[i] == query, else 0, for every query."""
+    if len(sorted_keys) == 0:
+        return 0.0
+    positions = np.minimum(np.searchsorted(sorted_keys, queries), len(sorted_keys) - 1)
+    return np.where(sorted_keys[positions] == queries, values[positions], 0.0)
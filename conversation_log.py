@@ -0,0 +1,142 @@
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+
+# --- Conversation log ---
+# Callers hand records to log(), which only puts them on a bounded queue; a
+# background thread drains the queue, writes batches as JSON Lines to an
+# append-mode file and flushes every flush_interval seconds and on close().
+# When the file would grow past max_bytes it is rotated (log.jsonl ->
+# log.jsonl.1 -> ... -> log.jsonl.<backup_count>). If the writer falls behind
+# and the queue is full, records are dropped (and counted) rather than making
+# the caller wait.
+
+DEFAULT_MAX_BYTES = 10 * 2 ** 20
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_QUEUE_SIZE = 10000
+# Records written per batch, at most
+MAX_BATCH_RECORDS = 1000
+
+_STOP = object()
+
+
+class ConversationLogger:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        path: JSON Lines file, appended to (earlier sessions are kept).
+        max_bytes / backup_count: rotate once the file would exceed max_bytes,
+        keeping that many old files (max_bytes=0 never rotates).
+        flush_interval: longest time (seconds) a record waits before being written.
+        queue_size: records buffered before new ones are dropped.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="conversation-log", daemon=True)
+        self._thread.start()
+
+    def log(self, question, answer, rule=None, intent=None, score=None, latency=None, session=None, **extra):
+        """Queues one exchange; never blocks. latency is in seconds."""
+        record = (time.time(), session, question, answer, rule, intent, score, latency, extra)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def log_response(self, question, info, latency=None, session=None, **extra):
+        """log() for a ChatbotEngine ResponseInfo."""
+        self.log(question, info.response, rule=info.rule, intent=info.intent, score=info.score, latency=latency,
+                 session=session, cached=info.cached, **extra)
+
+    def close(self):
+        """Writes everything queued so far and stops the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    # --- Writer thread ---
+
+    def _run(self):
+        stop = False
+        while not stop:
+            deadline = time.monotonic() + self.flush_interval
+            lines = []
+            # Collect records until the flush deadline, a full batch or shutdown, then write them in one go
+            while len(lines) < MAX_BATCH_RECORDS:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                    break
+                lines.append(_format_record(record).encode("utf-8"))
+            if lines:
+                try:
+                    self._write(lines)
+                except OSError as e:
+                    print(f"Conversation log: could not write to '{self.path}': {e}")
+                    with self._dropped_lock:
+                        self.dropped += len(lines)
+        if self._file is not None:
+            self._file.close()
+
+    def _write(self, lines):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        size = self._file.tell()
+        chunk = []
+        for line in lines:
+            if self.max_bytes and size and size + len(line) > self.max_bytes:
+                self._file.write(b"".join(chunk))
+                chunk = []
+                self._rotate()
+                size = 0
+            chunk.append(line)
+            size += len(line)
+        self._file.write(b"".join(chunk))
+        self._file.flush()
+        self.written += len(lines)
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+
+
+def _format_record(record):
+    timestamp, session, question, answer, rule, intent, score, latency, extra = record
+    entry = {"ts": datetime.datetime.fromtimestamp(timestamp).astimezone().isoformat(timespec="milliseconds")}
+    if session is not None:
+        entry["session"] = session
+    entry.update(question=question, answer=answer, rule=rule, intent=intent,
+                 score=None if score is None else round(float(score), 4),
+                 latency_ms=None if latency is None else round(latency * 1000, 3))
+    entry.update(extra)
+    return json.dumps(entry, ensure_ascii=False) + "\n"
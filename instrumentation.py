@@ -0,0 +1,188 @@
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# --- Engine instrumentation ---
+# Stage timers (startup and maintenance work such as loading or building the
+# KB), per-query spans (rule scan, transform, scoring, formatting) and labelled
+# counters (which rule or intent answered, retrieval misses), exportable as
+# Prometheus text or JSON. A disabled Instrumentation hands out one shared
+# no-op context manager and returns from count() immediately, so the engine can
+# call it unconditionally on the hot path.
+
+_NOOP = contextlib.nullcontext()
+
+
+class _Timer:
+    __slots__ = ("instrumentation", "table", "name", "start")
+
+    def __init__(self, instrumentation, table, name):
+        self.instrumentation = instrumentation
+        self.table = table
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation._record(self.table, self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # stage -> seconds of its latest run; span -> [count, total seconds, max seconds]
+        self.stages = {}
+        self.spans = {}
+        # (counter name, labels tuple) -> count
+        self.counters = Counter()
+
+    def stage(self, name):
+        """Context manager timing a startup/maintenance stage (the latest run is kept)."""
+        return _Timer(self, "stages", name) if self.enabled else _NOOP
+
+    def span(self, name):
+        """Context manager timing one occurrence of a per-query span."""
+        return _Timer(self, "spans", name) if self.enabled else _NOOP
+
+    def count(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += amount
+
+    def _record(self, table, name, seconds):
+        with self._lock:
+            if table == "stages":
+                self.stages[name] = seconds
+                return
+            span = self.spans.get(name)
+            if span is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                span[0] += 1
+                span[1] += seconds
+                span[2] = max(span[2], seconds)
+
+    def reset(self):
+        """Clears spans and counters (stage timings are kept)."""
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+    # --- Export ---
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "stages": dict(self.stages),
+                "spans": {name: {"count": count, "total_seconds": total, "max_seconds": peak}
+                          for name, (count, total, peak) in self.spans.items()},
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix="chatbot", extra_gauges=()):
+        """
+        Prometheus text exposition format. extra_gauges: (name, labels dict,
+        value) triples exported as gauges next to the engine's own metrics
+        (e.g. cache or rule-dispatch statistics).
+        """
+        data = self.to_dict()
+        lines = [f"# HELP {prefix}_stage_seconds Duration of the latest run of each startup/maintenance stage.",
+                 f"# TYPE {prefix}_stage_seconds gauge"]
+        lines += [f'{prefix}_stage_seconds{{stage="{_escape(stage)}"}} {seconds!r}'
+                  for stage, seconds in data["stages"].items()]
+        lines += [f"# HELP {prefix}_span_seconds Time spent in each per-query span.",
+                  f"# TYPE {prefix}_span_seconds summary"]
+        for span, values in data["spans"].items():
+            lines.append(f'{prefix}_span_seconds_sum{{span="{_escape(span)}"}} {values["total_seconds"]!r}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{_escape(span)}"}} {values["count"]}')
+        lines += [f"# HELP {prefix}_span_max_seconds Slowest occurrence of each per-query span.",
+                  f"# TYPE {prefix}_span_max_seconds gauge"]
+        lines += [f'{prefix}_span_max_seconds{{span="{_escape(span)}"}} {values["max_seconds"]!r}'
+                  for span, values in data["spans"].items()]
+
+        counters = {}
+        for counter in data["counters"]:
+            counters.setdefault(counter["name"], []).append(counter)
+        for name, series in counters.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines += [f"{prefix}_{name}_total{_labels(counter['labels'])} {counter['value']}" for counter in series]
+
+        gauges = {}
+        for name, labels, value in extra_gauges:
+            gauges.setdefault(name, []).append((labels, value))
+        for name, series in gauges.items():
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines += [f"{prefix}_{name}{_labels(labels)} {value!r}" for labels, value in series]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+# --- Sampling profiler ---
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of all other threads every `interval` seconds
+    from a background thread and counts them. collapsed() returns the counts in
+    the "collapsed stack" format (frame;frame;frame count) read by
+    flamegraph.pl and speedscope. Overhead is one stack walk per thread per
+    sample, independent of how busy the engine is.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
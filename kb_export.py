@@ -0,0 +1,125 @@
+"""
+Exports the retrieval KB (every answer and question row with its metadata).
+The engine no longer writes these files when it starts; run this instead when
+you want to inspect the KB:
+
+    python kb_export.py                                   # knowledge_base.jsonl
+    python kb_export.py --output knowledge_base.jsonl.gz  # gzip-compressed
+    python kb_export.py --format legacy                   # knowledge_base_documents.txt + knowledge_base_metadata.json
+"""
+import argparse
+import contextlib
+import gzip
+import json
+import os
+import tempfile
+
+# Files written by --format legacy (the layout the engine used to dump on every start)
+LEGACY_DOCUMENTS_FILE = "knowledge_base_documents.txt"
+LEGACY_METADATA_FILE = "knowledge_base_metadata.json"
+EXPORT_FORMATS = ("jsonl", "legacy")
+DEFAULT_EXPORT_FILE = "knowledge_base.jsonl"
+
+
+@contextlib.contextmanager
+def atomic_open(path):
+    """
+    Opens a temporary file next to `path` and renames it over `path` once the
+    block finishes, so readers (or other workers exporting at the same time)
+    never see a partial file. A path ending in .gz is gzip-compressed.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}-", dir=directory)
+    try:
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp_path, 0o644)
+        if path.endswith(".gz"):
+            with open(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                yield f
+        else:
+            with open(fd, "w", encoding="utf-8") as f:
+                yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def iter_rows(segments, row_mask=None):
+    """
+    (row, text, metadata) for every row of the given CompactKBs (main KB
+    first, then the delta KB); rows that are False in row_mask are skipped.
+    """
+    for kb in segments:
+        for row, text, meta in kb.iter_documents():
+            if row_mask is None or row_mask[row]:
+                yield row, text, meta
+
+
+def export_jsonl(segments, path, row_mask=None):
+    """One compact JSON object per row: {"row", "text", ...metadata}. Returns the number of rows."""
+    count = 0
+    with atomic_open(path) as f:
+        for row, text, meta in iter_rows(segments, row_mask):
+            f.write(json.dumps({"row": row, "text": text, **meta}, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def export_legacy(segments, row_mask=None, documents_path=LEGACY_DOCUMENTS_FILE,
+                  metadata_path=LEGACY_METADATA_FILE):
+    """
+    The documents text file and indented metadata JSON array, written row by
+    row rather than building the metadata list in memory. Returns the number of rows.
+    """
+    count = 0
+    with atomic_open(documents_path) as documents, atomic_open(metadata_path) as metadata:
+        metadata.write("[")
+        for row, text, meta in iter_rows(segments, row_mask):
+            documents.write(f"----- DOCUMENT {row} -----\n{text}\n\n")
+            entry = json.dumps(meta, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+            metadata.write(f"{',' if count else ''}\n    {entry}")
+            count += 1
+        metadata.write("\n]" if count else "]")
+    return count
+
+
+def export_kb(segments, output=None, format="jsonl", row_mask=None):
+    """
+    Exports the KB segments; output defaults to knowledge_base.jsonl. The
+    legacy format always writes its two fixed files, so it takes no output.
+    """
+    if format == "legacy" and output is not None:
+        raise ValueError(f"The legacy format writes {LEGACY_DOCUMENTS_FILE} and {LEGACY_METADATA_FILE}; "
+                         f"it does not take an output file")
+    if format == "jsonl":
+        return export_jsonl(segments, output or DEFAULT_EXPORT_FILE, row_mask)
+    if format == "legacy":
+        return export_legacy(segments, row_mask)
+    raise ValueError(f"Unknown export format {format!r}; choose from {', '.join(EXPORT_FORMATS)}")
+
+
+def main():
+    from chatbot_engine import ChatbotEngine, DEFAULT_SNAPSHOT_DIR
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="Final_Dataset_Generated.json")
+    parser.add_argument("--format", default="jsonl", choices=EXPORT_FORMATS)
+    parser.add_argument("--output", help="output file for --format jsonl (default knowledge_base.jsonl)")
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR,
+                        help="KB snapshot directory to load from (and save to, if the KB has to be built)")
+    args = parser.parse_args()
+    if args.format == "legacy" and args.output is not None:
+        # Checked before the (slow) engine start
+        parser.error("--output only applies to --format jsonl; "
+                     f"--format legacy writes {LEGACY_DOCUMENTS_FILE} and {LEGACY_METADATA_FILE}")
+
+    bot = ChatbotEngine(args.dataset, snapshot_dir=args.snapshot_dir)
+    count = bot.export_kb(args.output, format=args.format)
+    print(f"Bot Engine: Exported {count} KB rows.")
+
+
+if __name__ == "__main__":
+    main()
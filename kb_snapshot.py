@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from compact_kb import tfidf_transform
+
+# --- Compiled KB snapshots ---
+# A snapshot is a directory holding everything ChatbotEngine needs to answer
+# retrieval questions without refitting TF-IDF: the fitted vocabulary + IDF,
+# the KB's numeric arrays (saved as .npy so they can be memory-mapped) and a
+# JSON file with its strings (answer texts, poet names, templates...).
+# Snapshots live in <snapshot_root>/<fingerprint>/ so a changed dataset simply
+# misses the cache. Each manifest records the dataset path it was built from:
+# saving a snapshot removes only the older snapshots of that same dataset, so
+# engines on different datasets can share one snapshot root.
+
+SNAPSHOT_FORMAT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+
+def compute_fingerprint(dataset_path, build_config):
+    """
+    Content hash of the dataset file plus everything else the KB is built from
+    (templates, vectorizer settings, snapshot format), so a snapshot is only
+    reused when a rebuild would produce exactly the same KB.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"format={SNAPSHOT_FORMAT_VERSION}\n".encode("utf-8"))
+    digest.update(json.dumps(build_config, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    with open(dataset_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_snapshot(snapshot_root, fingerprint, arrays, info, vectorizer, replace=False, dataset_path=None):
+    """
+    Writes a snapshot into <snapshot_root>/<fingerprint>/. arrays maps names
+    to numpy arrays; info is any JSON-serialisable dict (see
+    CompactKB.to_arrays). The files are written to a temporary directory first
+    and renamed into place, so concurrent workers never see a half-written
+    snapshot. An existing snapshot directory is kept if it loads (another
+    worker published it first) and replaced if it doesn't or `replace` is set.
+    Older snapshots of dataset_path (and any that can no longer load) are
+    removed afterwards; those of other datasets are kept. Returns the
+    snapshot directory if this call published it, else None.
+    """
+    os.makedirs(snapshot_root, exist_ok=True)
+    target_dir = os.path.join(snapshot_root, fingerprint)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{fingerprint[:12]}-", dir=snapshot_root)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.asarray(array))
+        np.save(os.path.join(tmp_dir, "idf.npy"), np.asarray(vectorizer.idf_))
+
+        # Vocabulary is stored as a list ordered by column index
+        terms = [None] * len(vectorizer.vocabulary_)
+        for term, column in vectorizer.vocabulary_.items():
+            terms[column] = term
+        with open(os.path.join(tmp_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+        with open(os.path.join(tmp_dir, "info.json"), "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False)
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "dataset": _dataset_key(dataset_path),
+            "arrays": {name: list(np.shape(array)) for name, array in arrays.items()},
+            "ngram_range": list(vectorizer.ngram_range),
+        }
+        # The manifest is written last: a directory without one is never loaded
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        published = _publish(tmp_dir, target_dir)
+        if not published and (replace or load_snapshot(snapshot_root, fingerprint) is None):
+            # A damaged (or deliberately rebuilt) snapshot: move it aside, then retry
+            aside_dir = tempfile.mkdtemp(prefix=f".{fingerprint[:12]}-old-", dir=snapshot_root)
+            try:
+                os.rename(target_dir, os.path.join(aside_dir, fingerprint))
+            except OSError:
+                pass
+            shutil.rmtree(aside_dir, ignore_errors=True)
+            published = _publish(tmp_dir, target_dir)
+        if not published:
+            # Another worker already published this snapshot
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    _remove_stale_snapshots(snapshot_root, keep=fingerprint, dataset=_dataset_key(dataset_path))
+    return target_dir if published else None
+
+
+def _publish(tmp_dir, target_dir):
+    try:
+        os.rename(tmp_dir, target_dir)
+    except OSError:
+        return False
+    return True
+
+
+def load_snapshot(snapshot_root, fingerprint, mmap=True):
+    """
+    Loads the snapshot for `fingerprint`. Returns (arrays, info, vectorizer),
+    or None when no usable snapshot exists.
+    """
+    snapshot_dir = os.path.join(snapshot_root, fingerprint)
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if not os.path.isfile(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if (manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION
+                or manifest.get("fingerprint") != fingerprint):
+            return None
+
+        mmap_mode = "r" if mmap else None
+        arrays = {}
+        for name, shape in manifest["arrays"].items():
+            arrays[name] = np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+            if list(arrays[name].shape) != shape:
+                print(f"Bot Engine: Ignoring inconsistent KB snapshot '{snapshot_dir}'.", file=sys.stderr)
+                return None
+
+        with open(os.path.join(snapshot_dir, "vocabulary.json"), "r", encoding="utf-8") as f:
+            terms = json.load(f)
+        idf = np.load(os.path.join(snapshot_dir, "idf.npy"))
+        vectorizer = SnapshotVectorizer(manifest["ngram_range"], {term: column for column, term in enumerate(terms)},
+                                        idf)
+
+        with open(os.path.join(snapshot_dir, "info.json"), "r", encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Bot Engine: Ignoring unreadable KB snapshot '{snapshot_dir}': {e}", file=sys.stderr)
+        return None
+    return arrays, info, vectorizer
+
+
+class SnapshotVectorizer:
+    """
+    The fitted word TfidfVectorizer of a snapshot, restored from its
+    vocabulary and IDF. transform() is computed with NumPy/SciPy
+    (compact_kb.tfidf_transform); scikit-learn is only imported, and a real
+    vectorizer built, if anything else is used (e.g. upserting a poet), so
+    processes that load a snapshot never import it just to answer questions.
+    """
+
+    def __init__(self, ngram_range, vocabulary, idf):
+        self.ngram_range = tuple(ngram_range)
+        self.vocabulary_ = vocabulary
+        self.idf_ = idf
+        self._vectorizer = None
+
+    def transform(self, raw_documents):
+        return tfidf_transform(raw_documents, self.vocabulary_, self.idf_, self.ngram_range)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            vectorizer = TfidfVectorizer(ngram_range=self.ngram_range)
+            vectorizer.vocabulary_ = self.vocabulary_
+            vectorizer.idf_ = self.idf_
+            self._vectorizer = vectorizer
+        return getattr(self._vectorizer, name)
+
+
+def _dataset_key(dataset_path):
+    return None if dataset_path is None else os.path.realpath(dataset_path)
+
+
+def _remove_stale_snapshots(snapshot_root, keep, dataset):
+    """Removes the snapshots of `dataset` other than `keep`, and those that can never load."""
+    for name in os.listdir(snapshot_root):
+        path = os.path.join(snapshot_root, name)
+        if name == keep or name.startswith(".") or not os.path.isdir(path):
+            continue
+        try:
+            with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+        if (not isinstance(manifest, dict) or manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION
+                or manifest.get("dataset") == dataset):
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,278 @@
+import bisect
+import re
+
+# --- Secondary indexes over the poet dataset ---
+# Built once when the data is loaded so the rule handlers answer from lookups
+# instead of scanning every poet (and every poem / famous work) per question.
+
+# Biography phrases some rules look for; their poet lists are precomputed
+BIOGRAPHY_KEYWORDS = ("అష్టదిగ్గజాలు",)
+
+CENTURY_PATTERN = re.compile(r"(\d+)వ శతాబ్దం")
+
+
+class SubstringIndex:
+    """
+    Finds which of a fixed list of keys contain a query substring, using an
+    index of every 1-, 2- and 3-character gram of every key. Queries of up to
+    three characters are answered straight from the index; longer queries
+    intersect the postings of their trigrams and verify the few candidates.
+    """
+    MAX_GRAM = 3
+
+    def __init__(self, keys):
+        # Duplicate keys collapse onto the first occurrence
+        self.keys = list(dict.fromkeys(keys))
+        self.positions = {key: position for position, key in enumerate(self.keys)}
+        # Positions of keys dropped by changed(); never returned
+        self.dead = frozenset()
+        self.grams = {}
+        for position, key in enumerate(self.keys):
+            for gram in self._key_grams(key):
+                self.grams.setdefault(gram, []).append(position)
+
+    @classmethod
+    def _key_grams(cls, key):
+        return {key[start:start + n] for n in range(1, cls.MAX_GRAM + 1) for start in range(len(key) - n + 1)}
+
+    def changed(self, added=(), removed=()):
+        """
+        An index with the `added` keys appended (or revived, if they were
+        dropped) and the `removed` keys dropped. Postings are shared; only
+        those of the added keys' grams are copied. This index is left untouched.
+        """
+        added = [key for key in dict.fromkeys(added)
+                 if key not in self.positions or self.positions[key] in self.dead]
+        removed = [key for key in removed if key in self.positions and self.positions[key] not in self.dead]
+        if not added and not removed:
+            return self
+        dead = set(self.dead)
+        dead.update(self.positions[key] for key in removed)
+        new_keys = [key for key in added if key not in self.positions]
+        dead.difference_update(self.positions[key] for key in added if key in self.positions)
+        if len(dead) * 2 > len(self.keys) + len(new_keys):
+            # Mostly dead keys: a fresh build is smaller and faster to query
+            return SubstringIndex([key for position, key in enumerate(self.keys) if position not in dead] + new_keys)
+        index = SubstringIndex(())
+        index.keys = self.keys
+        index.positions = self.positions
+        index.grams = self.grams
+        if new_keys:
+            index.keys = self.keys + new_keys
+            index.positions = dict(self.positions)
+            index.grams = dict(self.grams)
+            for position, key in enumerate(new_keys, start=len(self.keys)):
+                index.positions[key] = position
+                # Copy-on-write postings, so readers of this index are unaffected
+                for gram in self._key_grams(key):
+                    index.grams[gram] = index.grams.get(gram, []) + [position]
+        index.dead = frozenset(dead)
+        return index
+
+    def find_all(self, query):
+        """Positions (ascending) of all keys containing `query`."""
+        positions = self._find_all(query)
+        if self.dead:
+            positions = [p for p in positions if p not in self.dead]
+        return positions
+
+    def _find_all(self, query):
+        if not query:
+            return list(range(len(self.keys)))
+        if len(query) <= self.MAX_GRAM:
+            return self.grams.get(query, [])
+
+        postings = []
+        for start in range(len(query) - self.MAX_GRAM + 1):
+            gram_postings = self.grams.get(query[start:start + self.MAX_GRAM])
+            if not gram_postings:
+                return []
+            postings.append(gram_postings)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for other in postings[1:]:
+            other = set(other)
+            candidates = [p for p in candidates if p in other]
+            if not candidates:
+                return []
+        return [p for p in candidates if query in self.keys[p]]
+
+    def find_first(self, query):
+        """Position of the first key containing `query`, or None."""
+        if self.dead:
+            return next(iter(self.find_all(query)), None)
+        if not query:
+            return 0 if self.keys else None
+        if len(query) <= self.MAX_GRAM:
+            postings = self.grams.get(query)
+            return postings[0] if postings else None
+        for position in self.find_all(query):
+            return position
+        return None
+
+
+class PoetIndex:
+    # Per-key tables: lowercased name, era, century, lowercased genre and
+    # famous work, biography keyword -> ranks (ascending) of the poets with it
+    TABLES = ("_name_ranks", "_era_ranks", "_century_ranks", "_genre_ranks", "_work_ranks", "_keyword_ranks")
+    # Tables whose keys are also searched by substring, and their SubstringIndex
+    SUBSTRING_INDEXES = {"_name_ranks": "_names", "_genre_ranks": "_genres", "_work_ranks": "_works"}
+
+    def __init__(self, data_all):
+        """
+        Poets are kept by rank: their position in data_all, new poets ranking
+        after all others. with_poet() and without_poet() derive the index for
+        one changed poet without rescanning the rest.
+        """
+        # rank -> poet, in rank (dataset) order
+        self._poets = dict(enumerate(data_all))
+        self._next_rank = len(data_all)
+        # poet id -> ranks holding it (several only for duplicate ids in the data)
+        self._id_ranks = {}
+        for table in self.TABLES:
+            setattr(self, table, {})
+        for rank, poet in self._poets.items():
+            self._id_ranks.setdefault(poet['id'], []).append(rank)
+            for table, key in self._keys_of(poet):
+                getattr(self, table).setdefault(key, []).append(rank)
+        for table, index in self.SUBSTRING_INDEXES.items():
+            setattr(self, index, SubstringIndex(getattr(self, table)))
+
+    @staticmethod
+    def _keys_of(poet):
+        """(table, key) of every table entry of one poet, each once, in a fixed order."""
+        keys = [("_name_ranks", poet['name_telugu'].strip().lower()), ("_era_ranks", poet['era'])]
+        # Index every digit-run suffix so "12వ శతాబ్దం" also finds "112వ శతాబ్దం",
+        # exactly like the substring test this replaces
+        for digits in CENTURY_PATTERN.findall(poet['era']):
+            keys.extend(("_century_ranks", digits[start:]) for start in range(len(digits)))
+        keys.extend(("_genre_ranks", poem['genre'].lower()) for poem in poet.get('poems', []))
+        keys.extend(("_work_ranks", work.lower()) for work in poet['famous_works'])
+        keys.extend(("_keyword_ranks", keyword) for keyword in BIOGRAPHY_KEYWORDS
+                    if keyword in poet['biography_summary'])
+        return list(dict.fromkeys(keys))
+
+    # --- Single-poet updates ---
+
+    def with_poet(self, poet):
+        """
+        The index with `poet` added (ranked last), or replacing the poet with
+        its id (keeping that poet's rank). This index is left untouched. Names
+        and genres new to the index rank after existing ones in substring
+        lookups until an index is built from scratch (compact()).
+        """
+        ranks = self._id_ranks.get(poet['id'], [])
+        index, touched = self._derived(ranks, keep=ranks[:1])
+        rank = ranks[0] if ranks else index._next_rank
+        if not ranks:
+            index._next_rank += 1
+        # A kept rank is re-assigned in place, keeping its dataset position
+        index._poets[rank] = poet
+        index._id_ranks[poet['id']] = [rank]
+        for table, key in self._keys_of(poet):
+            ranks_with_key = list(getattr(index, table).get(key, ()))
+            bisect.insort(ranks_with_key, rank)
+            getattr(index, table)[key] = ranks_with_key
+            touched.append((table, key))
+        index._update_substring_indexes(self, touched)
+        return index
+
+    def without_poet(self, poet_id):
+        """The index without the poet(s) with id `poet_id`. This index is left untouched."""
+        index, touched = self._derived(self._id_ranks.get(poet_id, []), keep=())
+        index._id_ranks.pop(poet_id, None)
+        index._update_substring_indexes(self, touched)
+        return index
+
+    def _derived(self, dropped_ranks, keep):
+        """
+        A copy sharing this index's per-key rank lists (replaced, never
+        modified) with the table entries of the poets at dropped_ranks
+        removed, and those poets too unless their rank is in `keep`.
+        Returns (index, touched (table, key) pairs).
+        """
+        index = object.__new__(PoetIndex)
+        index.__dict__.update(self.__dict__)
+        index._poets = dict(self._poets)
+        index._id_ranks = dict(self._id_ranks)
+        for table in self.TABLES:
+            setattr(index, table, dict(getattr(self, table)))
+        touched = []
+        for rank in dropped_ranks:
+            poet = index._poets[rank] if rank in keep else index._poets.pop(rank)
+            for table, key in self._keys_of(poet):
+                remaining = [other for other in getattr(index, table)[key] if other != rank]
+                if remaining:
+                    getattr(index, table)[key] = remaining
+                else:
+                    del getattr(index, table)[key]
+                touched.append((table, key))
+        return index, touched
+
+    def _update_substring_indexes(self, previous, touched):
+        for table, attribute in self.SUBSTRING_INDEXES.items():
+            before, after = getattr(previous, table), getattr(self, table)
+            keys = [key for touched_table, key in touched if touched_table == table]
+            setattr(self, attribute, getattr(previous, attribute).changed(
+                added=[key for key in keys if key in after and key not in before],
+                removed=[key for key in keys if key in before and key not in after]))
+
+    # --- Lookups ---
+
+    def poets(self):
+        """Every poet, in dataset order (new poets last)."""
+        return list(self._poets.values())
+
+    def poet_named(self, name):
+        """The last poet whose name is exactly `name` (stripped), or None."""
+        ranks = self._name_ranks.get(name.lower(), [])
+        return next((self._poets[rank] for rank in reversed(ranks)
+                     if self._poets[rank]['name_telugu'].strip() == name), None)
+
+    def find_by_name(self, name_query):
+        """
+        A poet whose name contains `name_query` (case-insensitive): of the
+        first name (in dataset order) containing it, the last poet with it.
+        """
+        clean_query = name_query.strip().lower()
+        if not clean_query:
+            return None
+        position = self._names.find_first(clean_query)
+        return None if position is None else self._poets[self._name_ranks[self._names.keys[position]][-1]]
+
+    def centuries(self):
+        """Every century (digit run) that some poet's era mentions."""
+        return list(self._century_ranks)
+
+    def poets_in_century(self, century):
+        """Poets whose era mentions "<century>వ శతాబ్దం", in dataset order."""
+        return self._poets_at(self._century_ranks.get(century, []))
+
+    def poets_in_era(self, era):
+        return self._poets_at(self._era_ranks.get(era, []))
+
+    def poets_by_genre(self, genre_query):
+        """Poets with at least one poem whose genre contains `genre_query` (lowercase)."""
+        return self._poets_with(self._genres, self._genre_ranks, genre_query)
+
+    def genres(self):
+        """Every poem genre (lowercased) in the data."""
+        return list(self._genre_ranks)
+
+    def poets_by_work(self, work_query):
+        """Poets with a famous work containing `work_query` (lowercase)."""
+        return self._poets_with(self._works, self._work_ranks, work_query)
+
+    def poets_with_biography_keyword(self, keyword):
+        if keyword in BIOGRAPHY_KEYWORDS:
+            return self._poets_at(self._keyword_ranks.get(keyword, []))
+        return [p for p in self._poets.values() if keyword in p['biography_summary']]
+
+    def _poets_with(self, index, ranks_per_key, query):
+        keys = [index.keys[position] for position in index.find_all(query)]
+        if len(keys) == 1:
+            return self._poets_at(ranks_per_key[keys[0]])
+        return self._poets_at(sorted({rank for key in keys for rank in ranks_per_key[key]}))
+
+    def _poets_at(self, ranks):
+        return [self._poets[rank] for rank in ranks]
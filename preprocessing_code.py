@@ -1,132 +1,245 @@
-import json
-import re
-
-# A more general set of common Telugu stopwords
-TELUGU_STOPWORDS = {
-    'మరియు', 'ఒక', 'లో', 'కి', 'కు', 'నుండి', 'తో', 'యొక్క', 'అనే', 'ఈ', 'ఆ', 'ఏ',
-    'అని', 'కోసం', 'ద్వారా', 'కానీ', 'అయితే', 'గురించి', 'మరి', 'కల', 'లేదా', 'కాదు',
-    'అవును', 'నేను', 'నువ్వు', 'మేము', 'మీరు', 'అతను', 'ఆమె', 'వారు', 'ఇది', 'అది',
-    'ఈయన', 'ఆయన', 'ఉన్నా', 'ఉన్నాయి', 'వద్ద', 'వారి', 'వీరి', 'ఇక్కడ', 'అక్కడ', 'ఎక్కడ',
-    'ఎప్పుడు', 'ఎందుకు', 'ఎలా', 'చాలా', 'కొన్ని', 'కంటే', 'కూడా', 'గా', 'చేశారు', 'చేసారు',
-    'అప్పుడు', 'ఇప్పుడు', 'ఎందుకంటే', 'మొదలైన', 'తరువాత', 'ఎక్కువ', 'తక్కువ', 'పాటు',
-    'లోని', 'పైన', 'క్రింద'
-}
-
-# --- NLP Preprocessing Function (Defined but NOT USED in main flow) ---
-def nlp_clean_text(text, stopwords):
-    """
-    Performs standard NLP cleaning: tokenization, stopword removal, and joining.
-    """
-    if not text:
-        return ""
-    # 1. TOKENIZE :
-    #  Find all sequences of Telugu characters (words).
-    tokens = re.findall(r'[\u0c00-\u0c7F]+', text)
-    # 2. STOPWORDS REMOVAL: 
-    # Create a new list excluding any word in the stopwords set.
-    cleaned_tokens = [token for token in tokens if token not in stopwords]
-    # 3. JOIN:
-    #  Combine the cleaned tokens back into a single string.
-    return ' '.join(cleaned_tokens)
-
-# --- Helper Function for Regex Extraction ---
-def extract_field(pattern, text):
-    """Helper function to extract a field using regex, returns empty string if not found."""
-    match = re.search(pattern, text)
-    if match:
-        # Use strip() to remove any leading/trailing whitespace
-        return match.group(1).strip()
-    return ""
-
-# --- Main Data Processing Function ---
-def preprocess_raw_data(raw_file_path, final_file_path):
-    """
-    Reads the raw dataset (with 'Label: Value.' format), parses the paragraphs
-    using regex to extract structured information, and saves it as the final dataset.
-    """
-    try:
-        with open(raw_file_path, 'r', encoding='utf-8') as f:
-            ## utf-8 encoding is to preserve the telugu text properly
-            raw_data = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: The file {raw_file_path} was not found.")
-        return
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {raw_file_path}.")
-        return
-
-    final_dataset = []
-
-    for index, item in enumerate(raw_data): # Added index for debugging if needed
-        paragraph = item.get("poet_data_paragraph", "")
-
-        # --- ID Extraction (with safety) ---
-        id_str = extract_field(r"ID: (\d+)\.", paragraph)
-        poet_id = 0 # Default value
-        if id_str:
-            try:
-                poet_id = int(id_str)
-            except ValueError:
-                print(f"Warning: Could not convert ID '{id_str}' to int for item {index}. Using 0.")
-        # else: poet_id remains 0
-
-        # --- Field Extractions using Regex ---
-
-        # Using the ORIGINAL non-greedy pattern for name as requested
-        #--------------NME OF THE POET--------------
-        name = extract_field(r"కవి: (.*?)\.", paragraph)
-        #---------------TAGS IF ANY THEY HAVE----
-        titles = extract_field(r"బిరుదులు: (.*?)\.", paragraph)
-
-        #  patterns for ERA ,BIRTH YEAR,DEATH YEAR-----------
-        era = extract_field(r"కాలం: (సా\.శ\..*?)\.", paragraph)
-        birth_year = extract_field(r"జననం: (సా\.శ\.\s*\d+)\.", paragraph)
-        death_year = extract_field(r"మరణం: (సా\.శ\.\s*\d+)\.", paragraph)
-        #----------POETS BIO-----------
-        biography = extract_field(r"జీవిత సారాంశం: (.*?)\.\.", paragraph) # Double dot capture
-        #---------------PLACE OF BIRTH-------------
-        birth_place = extract_field(r"జనన స్థలం: (.*?)\.", paragraph)
-        #------------FAMOUS WORKS--------------
-        famous_works_str = extract_field(r"ప్రసిద్ధ రచనలు: (.*?)\.", paragraph)
-
-        # Corrected Famous Works Splitting (Handles commas inside parentheses)
-        famous_works = [] # Initialize an empty list
-        if famous_works_str:
-            # Use regex to split by comma, but NOT commas inside parentheses
-            split_works = re.split(r',\s*(?![^()]*\))', famous_works_str)
-            # Loop through the split parts, strip whitespace, and add non-empty ones
-            for work in split_works:
-                cleaned_work = work.strip()
-                if cleaned_work: # Only add if it's not an empty string after stripping
-                    famous_works.append(cleaned_work)
-        # else: famous_works remains an empty list
-
-        # Assemble the final structured dictionary
-        poet_structured_data = {
-            "id": poet_id,
-            "name_telugu": name,
-            "titles": titles,
-            "era": era,
-            "biography_summary": biography, # NOTE: NLP cleaning is NOT applied here
-            "birth_place_telugu": birth_place,
-            "birth_year": birth_year,
-            "death_year": death_year,
-            "famous_works": famous_works,
-            # Poems are copied directly without any processing
-            "poems": item.get("poems_raw", [])
-        }
-
-        final_dataset.append(poet_structured_data)
-
-    # Save the processed data to the final JSON file
-    with open(final_file_path, 'w', encoding='utf-8') as f:
-        json.dump(final_dataset, f, ensure_ascii=False, indent=4)
-
-    print(f"Preprocessing complete. Final dataset saved to '{final_file_path}'")
-
-# --- Main execution ---
-if __name__ == "__main__":
-    # Ensure this matches the EXACT name of your raw data file
-    RAW_DATASET_FILE = "raw_dataset.json"
-    FINAL_DATASET_FILE = "Final_Dataset_Generated.json"
-    preprocess_raw_data(RAW_DATASET_FILE, FINAL_DATASET_FILE)
\ No newline at end of file
+import argparse
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# A more general set of common Telugu stopwords
+TELUGU_STOPWORDS = {
+    'మరియు', 'ఒక', 'లో', 'కి', 'కు', 'నుండి', 'తో', 'యొక్క', 'అనే', 'ఈ', 'ఆ', 'ఏ',
+    'అని', 'కోసం', 'ద్వారా', 'కానీ', 'అయితే', 'గురించి', 'మరి', 'కల', 'లేదా', 'కాదు',
+    'అవును', 'నేను', 'నువ్వు', 'మేము', 'మీరు', 'అతను', 'ఆమె', 'వారు', 'ఇది', 'అది',
+    'ఈయన', 'ఆయన', 'ఉన్నా', 'ఉన్నాయి', 'వద్ద', 'వారి', 'వీరి', 'ఇక్కడ', 'అక్కడ', 'ఎక్కడ',
+    'ఎప్పుడు', 'ఎందుకు', 'ఎలా', 'చాలా', 'కొన్ని', 'కంటే', 'కూడా', 'గా', 'చేశారు', 'చేసారు',
+    'అప్పుడు', 'ఇప్పుడు', 'ఎందుకంటే', 'మొదలైన', 'తరువాత', 'ఎక్కువ', 'తక్కువ', 'పాటు',
+    'లోని', 'పైన', 'క్రింద'
+}
+
+# --- NLP Preprocessing Function (Defined but NOT USED in main flow) ---
+def nlp_clean_text(text, stopwords):
+    """
+    Performs standard NLP cleaning: tokenization, stopword removal, and joining.
+    """
+    if not text:
+        return ""
+    # 1. TOKENIZE :
+    #  Find all sequences of Telugu characters (words).
+    tokens = re.findall(r'[\u0c00-\u0c7F]+', text)
+    # 2. STOPWORDS REMOVAL: 
+    # Create a new list excluding any word in the stopwords set.
+    cleaned_tokens = [token for token in tokens if token not in stopwords]
+    # 3. JOIN:
+    #  Combine the cleaned tokens back into a single string.
+    return ' '.join(cleaned_tokens)
+
+# --- Helper Function for Regex Extraction ---
+def extract_field(pattern, text):
+    """Helper function to extract a field using regex, returns empty string if not found."""
+    match = pattern.search(text) if isinstance(pattern, re.Pattern) else re.search(pattern, text)
+    if match:
+        # Use strip() to remove any leading/trailing whitespace
+        return match.group(1).strip()
+    return ""
+
+# --- Precompiled Field Patterns ---
+# Each field is searched independently, so labels may appear in any order.
+# (A single combined label scan per paragraph was measured slower: the
+# separate searches stop at their label, the combined scan walks the whole
+# paragraph in Python.)
+ID_PATTERN = re.compile(r"ID: (\d+)\.")
+FIELD_PATTERNS = {
+    # Using the ORIGINAL non-greedy pattern for name as requested
+    "name_telugu": re.compile(r"కవి: (.*?)\."),
+    "titles": re.compile(r"బిరుదులు: (.*?)\."),
+    "era": re.compile(r"కాలం: (సా\.శ\..*?)\."),
+    "biography_summary": re.compile(r"జీవిత సారాంశం: (.*?)\.\."), # Double dot capture
+    "birth_place_telugu": re.compile(r"జనన స్థలం: (.*?)\."),
+    "birth_year": re.compile(r"జననం: (సా\.శ\.\s*\d+)\."),
+    "death_year": re.compile(r"మరణం: (సా\.శ\.\s*\d+)\."),
+}
+FAMOUS_WORKS_PATTERN = re.compile(r"ప్రసిద్ధ రచనలు: (.*?)\.")
+# Split by comma, but NOT commas inside parentheses
+WORKS_SPLIT_PATTERN = re.compile(r',\s*(?![^()]*\))')
+
+# --- Record Parsing ---
+def parse_raw_record(item, index):
+    """
+    Parses one raw record ('Label: Value.' paragraph plus raw poems) into the
+    structured poet dictionary. `index` is only used in warnings.
+    """
+    paragraph = item.get("poet_data_paragraph", "")
+
+    # --- ID Extraction (with safety) ---
+    id_str = extract_field(ID_PATTERN, paragraph)
+    poet_id = 0 # Default value
+    if id_str:
+        try:
+            poet_id = int(id_str)
+        except ValueError:
+            print(f"Warning: Could not convert ID '{id_str}' to int for item {index}. Using 0.")
+
+    poet_structured_data = {"id": poet_id}
+    for field, pattern in FIELD_PATTERNS.items():
+        poet_structured_data[field] = extract_field(pattern, paragraph)
+
+    # Corrected Famous Works Splitting (Handles commas inside parentheses)
+    famous_works_str = extract_field(FAMOUS_WORKS_PATTERN, paragraph)
+    famous_works = []
+    if famous_works_str:
+        for work in WORKS_SPLIT_PATTERN.split(famous_works_str):
+            cleaned_work = work.strip()
+            if cleaned_work: # Only add if it's not an empty string after stripping
+                famous_works.append(cleaned_work)
+    poet_structured_data["famous_works"] = famous_works
+    # NOTE: NLP cleaning is NOT applied to the biography.
+    # Poems are copied directly without any processing
+    poet_structured_data["poems"] = item.get("poems_raw", [])
+    return poet_structured_data
+
+def parse_raw_records(indexed_items):
+    """Parses a chunk of (index, raw record) pairs; the unit of work for the process pool."""
+    return [parse_raw_record(item, index) for index, item in indexed_items]
+
+# --- Main Data Processing Function ---
+def preprocess_raw_data(raw_file_path, final_file_path):
+    """
+    Reads the raw dataset (with 'Label: Value.' format), parses the paragraphs
+    using regex to extract structured information, and saves it as the final dataset.
+    """
+    try:
+        with open(raw_file_path, 'r', encoding='utf-8') as f:
+            ## utf-8 encoding is to preserve the telugu text properly
+            raw_data = json.load(f)
+    except FileNotFoundError:
+        print(f"Error: The file {raw_file_path} was not found.")
+        return
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode JSON from {raw_file_path}.")
+        return
+
+    final_dataset = [parse_raw_record(item, index) for index, item in enumerate(raw_data)]
+
+    # Save the processed data to the final JSON file
+    with open(final_file_path, 'w', encoding='utf-8') as f:
+        json.dump(final_dataset, f, ensure_ascii=False, indent=4)
+
+    print(f"Preprocessing complete. Final dataset saved to '{final_file_path}'")
+
+# --- Streaming Pipeline (large raw datasets) ---
+# Reads the raw records one at a time (from a JSON array or JSON Lines),
+# parses them in chunks on a process pool and appends the structured records
+# to a JSON Lines file as chunks finish, so memory stays bounded by the
+# number of chunks in flight rather than the dataset size.
+
+READ_BLOCK_SIZE = 1 << 20
+DEFAULT_CHUNK_SIZE = 2000
+_JSON_DECODER = json.JSONDecoder()
+_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
+
+def iter_raw_records(raw_file_path):
+    """Yields raw records from a JSON array file or a JSON Lines file, without loading it whole."""
+    with open(raw_file_path, 'r', encoding='utf-8') as f:
+        buffer = f.read(READ_BLOCK_SIZE)
+        start = _ARRAY_SEPARATORS.match(buffer).end()
+        if buffer[start:start + 1] == "[":
+            yield from _iter_json_array(f, buffer, start + 1)
+            return
+        f.seek(0)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _iter_json_array(f, buffer, position):
+    end_of_file = False
+    while True:
+        position = _ARRAY_SEPARATORS.match(buffer, position).end()
+        if position == len(buffer):
+            if end_of_file:
+                raise json.JSONDecodeError("Unterminated array", buffer, position)
+            buffer, position = f.read(READ_BLOCK_SIZE), 0
+            end_of_file = not buffer
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            item, position = _JSON_DECODER.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Most likely the record continues past the end of the buffer
+            if end_of_file:
+                raise
+            block = f.read(READ_BLOCK_SIZE)
+            end_of_file = not block
+            buffer, position = buffer[position:] + block, 0
+            continue
+        yield item
+
+def _chunked(iterable, size):
+    chunk = []
+    for element in iterable:
+        chunk.append(element)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _write_records(f, records):
+    f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    return len(records)
+
+def preprocess_streaming(raw_file_path, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streaming version of preprocess_raw_data: writes one structured record
+    per line (JSON Lines) to output_path, in input order. workers=1 parses
+    in this process; otherwise chunks of chunk_size records are fanned out
+    over a process pool (default: one worker per CPU). Returns the number of
+    records written, or None if the input could not be read.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunked(enumerate(iter_raw_records(raw_file_path)), chunk_size)
+    written = 0
+    try:
+        with open(output_path, 'w', encoding='utf-8') as out:
+            if workers == 1:
+                for chunk in chunks:
+                    written += _write_records(out, parse_raw_records(chunk))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    # At most two chunks per worker in flight; results are written in input order
+                    in_flight = deque()
+                    for chunk in chunks:
+                        in_flight.append(pool.submit(parse_raw_records, chunk))
+                        if len(in_flight) >= 2 * workers:
+                            written += _write_records(out, in_flight.popleft().result())
+                    while in_flight:
+                        written += _write_records(out, in_flight.popleft().result())
+    except FileNotFoundError:
+        print(f"Error: The file {raw_file_path} was not found.")
+        return None
+    except json.JSONDecodeError as e:
+        print(f"Error: Could not decode JSON from {raw_file_path}: {e}")
+        return None
+
+    print(f"Preprocessing complete. {written} records streamed to '{output_path}'")
+    return written
+
+# --- Main execution ---
+if __name__ == "__main__":
+    # Ensure this matches the EXACT name of your raw data file
+    RAW_DATASET_FILE = "raw_dataset.json"
+    FINAL_DATASET_FILE = "Final_Dataset_Generated.json"
+
+    parser = argparse.ArgumentParser(description="Parse the raw poet dataset into the structured dataset.")
+    parser.add_argument("raw_file", nargs="?", default=RAW_DATASET_FILE)
+    parser.add_argument("final_file", nargs="?", default=FINAL_DATASET_FILE)
+    parser.add_argument("--stream", action="store_true",
+                        help="stream the input (JSON array or JSON Lines) and write JSON Lines")
+    parser.add_argument("--workers", type=int, default=None, help="--stream worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="records per --stream work unit")
+    args = parser.parse_args()
+
+    if args.stream:
+        preprocess_streaming(args.raw_file, args.final_file, workers=args.workers, chunk_size=args.chunk_size)
+    else:
+        preprocess_raw_data(args.raw_file, args.final_file)
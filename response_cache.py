@@ -0,0 +1,88 @@
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# --- Response cache ---
+# Real traffic repeats the same few questions, so ChatbotEngine keeps an LRU
+# cache of responses keyed on the question in Unicode NFC. The engine answers
+# every question in NFC too, so a cached response is always the one the
+# question would get. Other folds (case, punctuation, whitespace) are left
+# out: rule patterns and echoed names can depend on them.
+
+
+def normalize_question(text):
+    """Unicode NFC (composed characters): the form the engine answers and caches questions in."""
+    return unicodedata.normalize("NFC", text)
+
+
+class ResponseCache:
+    def __init__(self, maxsize=1024, ttl=None):
+        """
+        maxsize: entries kept before least-recently-used ones are evicted.
+        ttl: seconds an entry stays valid (None = until evicted or invalidated).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Bumped by invalidate(); lets put() drop responses computed before it
+        self.generation = 0
+
+    def get(self, key):
+        """Cached response for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            response, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key, response, generation=None):
+        """
+        generation: value of self.generation read before the response was
+        computed; if the cache was invalidated since, the response is dropped.
+        """
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drops every entry (called whenever the KB changes)."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,102 @@
+import heapq
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# --- Sparse inverted index for TF-IDF retrieval ---
+# Query vectors have only a handful of non-zero terms, so instead of scoring
+# the query against every KB row we keep, for every term, the list of rows
+# containing it (its postings) together with the row's weight for that term.
+# Scoring a query then touches only the postings of the query's terms.
+
+
+class InvertedIndex:
+    def __init__(self, row_vectors, row_offset=0):
+        """
+        row_vectors: (n_rows x n_terms) sparse matrix of L2-normalised rows,
+        e.g. the fitted kb_vectors.
+        row_offset: KB row number of the first row (for indexes over a slice
+        of the KB, such as rows appended after the main build).
+        """
+        # Row t of the transposed matrix is the postings list of term t
+        postings = csr_matrix(row_vectors).T.tocsr()
+        postings.sort_indices()
+        self.num_rows, self.num_terms = row_vectors.shape
+        self.row_offset = row_offset
+        self.postings_ptr = postings.indptr
+        self.postings_rows = postings.indices
+        self.postings_weights = postings.data
+
+    def search(self, query_vectors, k=1, row_mask=None):
+        """
+        Scores every query row against the index. Returns, per query, up to k
+        (row, score) pairs, best first; ties go to the lower row, like argmax.
+        Rows sharing no term with the query (score 0) are never returned.
+        row_mask: optional boolean array over KB rows; False rows are skipped.
+        """
+        query_vectors = csr_matrix(query_vectors)
+        return [self._search_one(query_vectors.indices[start:end], query_vectors.data[start:end], k, row_mask)
+                for start, end in zip(query_vectors.indptr[:-1], query_vectors.indptr[1:])]
+
+    def _search_one(self, terms, weights, k, row_mask):
+        rows, scores = self.score(terms, weights)
+        if self.row_offset:
+            rows = rows + self.row_offset
+        if row_mask is not None and len(rows):
+            keep = row_mask[rows]
+            rows, scores = rows[keep], scores[keep]
+        return top_k(rows, scores, k)
+
+    def score(self, terms, weights):
+        """
+        Accumulates term-weight x posting-weight over the postings of the given
+        query terms. Returns (rows, scores) for every row that shares a term
+        with the query, rows sorted ascending.
+        """
+        if len(terms) and terms.max() >= self.num_terms:
+            # Terms added to the vocabulary after this index was built
+            known = terms < self.num_terms
+            terms, weights = terms[known], weights[known]
+        if len(terms) == 0:
+            return np.empty(0, dtype=self.postings_rows.dtype), np.empty(0)
+        starts = self.postings_ptr[terms]
+        ends = self.postings_ptr[terms + 1]
+        if len(terms) == 1:
+            return (self.postings_rows[starts[0]:ends[0]],
+                    weights[0] * self.postings_weights[starts[0]:ends[0]])
+
+        touched_rows = np.concatenate([self.postings_rows[s:e] for s, e in zip(starts, ends)])
+        contributions = np.concatenate([w * self.postings_weights[s:e]
+                                        for w, s, e in zip(weights, starts, ends)])
+        # bincount adds contributions in query-term order, same as a sparse product
+        if self.num_rows <= 8 * len(touched_rows):
+            # Small index: a dense accumulator is cheaper than sorting the touched rows
+            # (TF-IDF weights are positive, so touched rows are exactly the non-zero ones)
+            scores = np.bincount(touched_rows, weights=contributions, minlength=self.num_rows)
+            rows = np.flatnonzero(scores)
+            return rows, scores[rows]
+        rows, slots = np.unique(touched_rows, return_inverse=True)
+        return rows, np.bincount(slots, weights=contributions, minlength=len(rows))
+
+
+def top_k(rows, scores, k):
+    """Top-k (row, score) pairs, best first, ties broken by lower row."""
+    if len(scores) == 0 or k <= 0:
+        return []
+    if k == 1:
+        # np.argmax returns the first maximum; rows are sorted, so that is the lowest row
+        best = int(np.argmax(scores))
+        return [(int(rows[best]), float(scores[best]))]
+    if len(scores) > k:
+        # Keep everything tied with the k-th best so the tie-break stays exact
+        kth_best = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores >= kth_best
+        rows, scores = rows[keep], scores[keep]
+    order = np.lexsort((rows, -scores))[:k]
+    return [(int(rows[i]), float(scores[i])) for i in order]
+
+
+def merge_top_k(result_lists, k):
+    """Merges per-index top-k lists of (row, score) into one top-k, ties to the lower row."""
+    return heapq.nsmallest(k, (pair for results in result_lists for pair in results),
+                           key=lambda pair: (-pair[1], pair[0]))
@@ -0,0 +1,183 @@
+import numpy as np
+
+from compact_kb import PLACEHOLDER
+from retrieval_index import merge_top_k, top_k
+from sharded_kb import ShardedKB
+from transliteration import to_latin
+
+# --- Retrieval backends ---
+# A retriever scores questions against the question/answer rows of one or
+# more CompactKB segments (the main KB, plus the delta KB of upserted poets)
+# and returns KB rows, so get_response formats any backend's matches the same
+# way. Each segment gets an index with CompactKB's search contract; the
+# retriever encodes the questions once and merges the per-segment top-k.
+
+CHAR_NGRAM_RANGE = (2, 4)
+# Out-of-domain questions ("who is modi", "what is the weather") match the
+# question templates well but no poet name, so the char retriever only scores
+# a poet's rows when the question's cosine similarity to the poet's name is at
+# least this (calibrated with benchmarks.eval_retrievers)
+CHAR_MIN_NAME_SIMILARITY = 0.1
+
+
+class Retriever:
+    name = None
+    # Matches scoring below this are treated as "not understood"
+    default_threshold = 0.0
+
+    # Whether the main segment can be split across worker processes (shards > 0)
+    supports_shards = False
+
+    def __init__(self, segments, vectorizer, previous=None, shards=0):
+        """
+        segments: CompactKBs to search, main KB first.
+        vectorizer: the word TF-IDF vectorizer the segments were built with.
+        previous: a retriever of the same kind whose per-segment indexes (and
+        encoder) can be reused for segments it already covered.
+        shards: score the main segment in this many worker processes (see
+        sharded_kb); 0 scores everything in this process.
+        """
+        self.segments = list(segments)
+        self.vectorizer = vectorizer
+        self.shards = shards
+        self._prepare(previous)
+        reusable = {} if previous is None else dict(zip(map(id, previous.segments), previous.indexes))
+        self.indexes = [reusable[id(kb)] if id(kb) in reusable else self._index_segment(kb)
+                        for kb in self.segments]
+
+    def _prepare(self, previous):
+        """Sets up the question encoder, before any segment is indexed."""
+
+    def _index_segment(self, kb):
+        raise NotImplementedError
+
+    def encode(self, questions):
+        raise NotImplementedError
+
+    def search(self, questions, k=1, row_mask=None, query_vectors=None):
+        """
+        Per question, up to k (row, score) pairs, best first; ties go to the
+        lower row. row_mask: optional boolean array over KB rows; False rows
+        are skipped. query_vectors: encode(questions), if already computed.
+        """
+        if query_vectors is None:
+            query_vectors = self.encode(questions)
+        results = [index.search(query_vectors, k=k, row_mask=row_mask) for index in self.indexes]
+        if len(results) == 1:
+            return results[0]
+        return [merge_top_k(per_segment, k) for per_segment in zip(*results)]
+
+    def close(self):
+        """Stops the worker processes of a sharded main segment, if any."""
+        for index in self.indexes:
+            if isinstance(index, ShardedKB):
+                index.close()
+
+    def retrieve(self, questions, k=1, threshold=None, row_mask=None, query_vectors=None):
+        """search(), keeping only matches scoring at least threshold (default: default_threshold)."""
+        threshold = self.default_threshold if threshold is None else threshold
+        return [[(row, score) for row, score in matches if score >= threshold]
+                for matches in self.search(questions, k=k, row_mask=row_mask, query_vectors=query_vectors)]
+
+
+class WordTfidfRetriever(Retriever):
+    """Word uni/bigram TF-IDF cosine similarity over answers and question rows."""
+    name = "word"
+    default_threshold = 0.25
+    supports_shards = True
+
+    def _index_segment(self, kb):
+        if self.shards and kb is self.segments[0]:
+            return ShardedKB(kb, self.shards)
+        return kb
+
+    def encode(self, questions):
+        return self.vectorizer.transform(questions)
+
+
+class CharNgramRetriever(Retriever):
+    """
+    char_wb n-gram TF-IDF over the transliterated (to_latin) question rows,
+    so Latin-script and misspelt poet names still match name_telugu. Answer
+    texts are not indexed: only "template + poet name" rows are scored.
+    """
+    name = "char"
+    default_threshold = 0.6
+
+    def _prepare(self, previous):
+        if previous is not None and previous.segments[:1] == self.segments[:1]:
+            self.char_vectorizer = previous.char_vectorizer
+            return
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        # IDF over the main segment's template texts and poet names
+        main = self.segments[0]
+        self.char_vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=CHAR_NGRAM_RANGE,
+                                               preprocessor=to_latin, lowercase=False, norm=None)
+        self.char_vectorizer.fit(_template_texts(main) + list(main.poet_names))
+
+    def _index_segment(self, kb):
+        return CharNgramIndex(kb, self.char_vectorizer)
+
+    def encode(self, questions):
+        from sklearn.preprocessing import normalize
+        return normalize(self.char_vectorizer.transform(questions))
+
+
+class CharNgramIndex:
+    """
+    The question rows of one CompactKB as char n-gram vectors. to_latin turns
+    the placeholder boundary into whitespace and char_wb n-grams never cross
+    whitespace, so a row's vector is exactly template vector + name vector;
+    only the two factors and each row's norm are stored.
+    """
+
+    def __init__(self, kb, char_vectorizer):
+        self.base = kb.row_offset + kb.num_answers
+        template_vectors = char_vectorizer.transform(_template_texts(kb)).tocsr()
+        name_vectors = char_vectorizer.transform(kb.poet_names).tocsr()
+        # Stored as (n-gram x row) so query products need no per-query transpose
+        self.template_columns = template_vectors.T.tocsr()
+        self.name_columns = name_vectors.T.tocsr()
+        template_norms = np.asarray(template_vectors.multiply(template_vectors).sum(axis=1)).ravel()
+        name_norms = np.asarray(name_vectors.multiply(name_vectors).sum(axis=1)).ravel()
+        self.inverse_name_norms = np.zeros(len(name_norms))
+        self.inverse_name_norms[name_norms > 0] = 1.0 / np.sqrt(name_norms[name_norms > 0])
+        cross = (name_vectors @ self.template_columns).toarray()
+        norms = np.sqrt(name_norms[:, None] + template_norms[None, :] + 2 * cross).ravel()
+        # Cells without a question row (e.g. poem templates of a poet without poems) score 0
+        valid = (kb.question_answer >= 0) & (norms > 0)
+        self.inverse_norms = np.zeros(len(norms))
+        self.inverse_norms[valid] = 1.0 / norms[valid]
+
+    def search(self, query_vectors, k=1, row_mask=None):
+        template_scores = (query_vectors @ self.template_columns).toarray()
+        name_scores = (query_vectors @ self.name_columns).toarray()
+        rows = self.base + np.arange(len(self.inverse_norms))
+        results = []
+        for template_score, name_score in zip(template_scores, name_scores):
+            named = name_score * self.inverse_name_norms >= CHAR_MIN_NAME_SIMILARITY
+            scores = ((name_score[:, None] + template_score[None, :]) * named[:, None]).ravel() * self.inverse_norms
+            keep = scores > 0
+            if row_mask is not None:
+                keep &= row_mask[rows]
+            results.append(top_k(rows[keep], scores[keep], k))
+        return results
+
+
+def _template_texts(kb):
+    return [template.replace(PLACEHOLDER, " ") for template in kb.templates]
+
+
+RETRIEVERS = {retriever.name: retriever for retriever in (WordTfidfRetriever, CharNgramRetriever)}
+
+
+def make_retriever(name, segments, vectorizer, previous=None, shards=0):
+    """Builds the retriever registered under `name`; `previous` is only reused if it is the same kind."""
+    if name not in RETRIEVERS:
+        raise ValueError(f"Unknown retriever {name!r}; choose from {', '.join(RETRIEVERS)}")
+    retriever_class = RETRIEVERS[name]
+    if shards and not retriever_class.supports_shards:
+        raise ValueError(f"The {name!r} retriever does not support sharding")
+    return retriever_class(segments, vectorizer, previous if isinstance(previous, retriever_class) else None,
+                           shards=shards)
@@ -0,0 +1,109 @@
+import re
+import time
+
+# --- Rule dispatch with a literal prefilter ---
+# Every rule lists the literal strings its regex cannot match without (as
+# groups of alternatives). A single combined "gate" scan over the first group
+# of every rule tells us whether any rule can match at all, so questions that
+# fall through to retrieval cost one or two C-level scans instead of every
+# regex. Candidate rules then check their remaining literals and run their
+# regex in the original order, so first-match precedence is unchanged.
+
+# Default max_input_length for rules whose patterns backtrack quadratically
+# on long text ("(.*) X"): longer inputs skip those rules only, so a long
+# question can still match a rule with a fixed pattern.
+MAX_RULE_INPUT_LENGTH = 500
+
+
+def _literal_pattern(literals, flags):
+    return re.compile("|".join(re.escape(literal) for literal in literals), flags)
+
+
+class Rule:
+    def __init__(self, name, pattern, handler, required_literals=(), max_input_length=None):
+        """
+        required_literals: list of alternative groups; the rule can only match
+        when, for every group, at least one of its literals occurs in the text.
+        Literals are matched with the pattern's IGNORECASE flag, if it has one.
+        max_input_length: longer texts skip this rule (None = no limit).
+        """
+        self.name = name
+        self.pattern = pattern
+        self.handler = handler
+        self.max_input_length = max_input_length
+        self.required_literals = [tuple(group) for group in required_literals]
+        self.literal_flags = pattern.flags & re.IGNORECASE
+        self._literal_checks = [_literal_pattern(group, self.literal_flags) for group in self.required_literals]
+
+        # Counters
+        self.hits = 0
+        self.regex_calls = 0
+        self.prefilter_skips = 0
+        self.oversized_skips = 0
+        self.regex_time_ns = 0
+
+    def may_match(self, text):
+        for check in self._literal_checks:
+            if check.search(text) is None:
+                return False
+        return True
+
+
+class RuleDispatcher:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        # Inputs that skipped at least one rule for their length
+        self.oversized_inputs = 0
+        self.gated_inputs = 0
+
+        # One gate per flag setting; a rule without literals disables gating
+        self._gates = None
+        if all(rule.required_literals for rule in self.rules):
+            anchors = {}
+            for rule in self.rules:
+                anchors.setdefault(rule.literal_flags, []).extend(rule.required_literals[0])
+            self._gates = [_literal_pattern(literals, flags) for flags, literals in anchors.items()]
+
+    def match(self, text):
+        """Returns (rule, match) for the first matching rule, or (None, None)."""
+        if self._gates is not None and not any(gate.search(text) for gate in self._gates):
+            self.gated_inputs += 1
+            return None, None
+
+        oversized = False
+        for rule in self.rules:
+            if rule.max_input_length is not None and len(text) > rule.max_input_length:
+                rule.oversized_skips += 1
+                oversized = True
+                continue
+            if not rule.may_match(text):
+                rule.prefilter_skips += 1
+                continue
+
+            start = time.perf_counter_ns()
+            match = rule.pattern.search(text)
+            rule.regex_time_ns += time.perf_counter_ns() - start
+            rule.regex_calls += 1
+            if match:
+                rule.hits += 1
+                self.oversized_inputs += oversized
+                return rule, match
+        self.oversized_inputs += oversized
+        return None, None
+
+    def stats(self):
+        """Per-rule counters, in rule order."""
+        return [{
+            'rule': rule.name,
+            'hits': rule.hits,
+            'regex_calls': rule.regex_calls,
+            'prefilter_skips': rule.prefilter_skips,
+            'oversized_skips': rule.oversized_skips,
+            'regex_time_ms': rule.regex_time_ns / 1e6,
+        } for rule in self.rules]
+
+    def reset_stats(self):
+        self.oversized_inputs = 0
+        self.gated_inputs = 0
+        for rule in self.rules:
+            rule.hits = rule.regex_calls = rule.prefilter_skips = rule.oversized_skips = rule.regex_time_ns = 0
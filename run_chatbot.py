@@ -1,41 +1,81 @@
-from chatbot_engine import ChatbotEngine
-import datetime # To timestamp our log
-
-# --- CONFIGURATION ---
-JSON_FILE_PATH = "Final_Dataset_Generated.json"
-LOG_FILE_PATH = "chat_history.log"
-# -------------------
-
-def main():
-    # 1. Initialize the chatbot engine
-    bot = ChatbotEngine(JSON_FILE_PATH)
-    
-    print("\n--- తెలుగు కవిత్వ బాట్‌ కు స్వాగతం (v5 - New Rules) ---")
-    print("నన్ను కవుల గురించి లేదా 'కవిత్రయం ఎవరు?' వంటి ప్రశ్నలు అడగండి.")
-    print(f"(చాట్ నుండి నిష్క్రమించడానికి 'quit' అని టైప్ చేయండి | సంభాషణ '{LOG_FILE_PATH}' లో సేవ్ చేయబడుతుంది)\n")
-
-    # 2. Open log file
-    with open(LOG_FILE_PATH, "w", encoding="utf-8") as log_file:
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_file.write(f"Chat session started at: {timestamp}\n\n")
-        
-        while True:
-            # 3. Get user's question
-            user_question = input("మీరు: ")
-            
-            if user_question.lower() == 'quit':
-                print("బాట్: ధన్యవాదాలు! మళ్ళీ కలుద్దాం.")
-                log_file.write(f"ME: {user_question}\nBOT: ధన్యవాదాలు! మళ్ళీ కలుద్దాం.\n")
-                break
-            
-            # 4. Get response from the new hybrid engine
-            response = bot.get_response(user_question)
-            
-            # 5. Print and log the response
-            print(f"బాట్: {response}\n")
-            log_file.write(f"ME: {user_question}\n")
-            log_file.write(f"BOT: {response}\n\n")
-            log_file.flush() # Ensure it writes immediately
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+from chatbot_engine import ChatbotEngine, DEFAULT_RETRIEVER
+from conversation_log import ConversationLogger
+from retrievers import RETRIEVERS
+import argparse
+import contextlib
+import time
+import uuid
+
+# --- CONFIGURATION ---
+JSON_FILE_PATH = "Final_Dataset_Generated.json"
+LOG_FILE_PATH = "chat_history.jsonl"
+# -------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Telugu poets chatbot (CLI)")
+    parser.add_argument("--rebuild-kb", action="store_true",
+                        help="Ignore the saved KB snapshot and rebuild the knowledge base from the dataset")
+    parser.add_argument("--retriever", default=DEFAULT_RETRIEVER, choices=list(RETRIEVERS),
+                        help="Retrieval backend: 'word' TF-IDF or 'char' n-grams (matches Latin-script names)")
+    parser.add_argument("--debug", action="store_true",
+                        help="Print the matched rule for each question and startup stage timings")
+    parser.add_argument("--log-file",
+                        help=f"JSON Lines conversation log, appended to and rotated when large "
+                             f"(default for chats: {LOG_FILE_PATH}; --ask only logs when this is given)")
+    parser.add_argument("--ask", action="append", metavar="QUESTION",
+                        help="Answer this question (may be repeated) and exit instead of starting a chat")
+    return parser.parse_args()
+
+def ask(bot, questions, log_file=None):
+    """One-shot mode: prints one answer per question, nothing else. Logged only to an explicit log_file."""
+    session = uuid.uuid4().hex[:12]
+    with contextlib.ExitStack() as stack:
+        log = stack.enter_context(ConversationLogger(log_file)) if log_file else None
+        for question in questions:
+            start = time.perf_counter()
+            info = bot.get_response_details([question])[0]
+            latency = time.perf_counter() - start
+            print(info.response)
+            if log is not None:
+                log.log_response(question, info, latency=latency, session=session)
+
+def main():
+    args = parse_args()
+
+    # 1. Initialize the chatbot engine (quietly for one-shot questions, unless debugging)
+    bot = ChatbotEngine(JSON_FILE_PATH, rebuild_kb=args.rebuild_kb, retriever=args.retriever, debug=args.debug,
+                        verbose=not args.ask or args.debug)
+    if args.ask:
+        ask(bot, args.ask, args.log_file)
+        return
+    
+    log_file = args.log_file or LOG_FILE_PATH
+    print("\n--- తెలుగు కవిత్వ బాట్‌ కు స్వాగతం (v5 - New Rules) ---")
+    print("నన్ను కవుల గురించి లేదా 'కవిత్రయం ఎవరు?' వంటి ప్రశ్నలు అడగండి.")
+    print(f"(చాట్ నుండి నిష్క్రమించడానికి 'quit' అని టైప్ చేయండి | సంభాషణ '{log_file}' లో సేవ్ చేయబడుతుంది)\n")
+
+    # 2. Start the conversation log (written in the background, flushed on exit)
+    session = uuid.uuid4().hex[:12]
+    with ConversationLogger(log_file) as log:
+        while True:
+            # 3. Get user's question
+            try:
+                user_question = input("మీరు: ")
+            except EOFError:
+                break
+            
+            if user_question.lower() == 'quit':
+                print("బాట్: ధన్యవాదాలు! మళ్ళీ కలుద్దాం.")
+                break
+            
+            # 4. Get response from the new hybrid engine
+            start = time.perf_counter()
+            info = bot.get_response_details([user_question])[0]
+            latency = time.perf_counter() - start
+            
+            # 5. Print and log the response
+            print(f"బాట్: {info.response}\n")
+            log.log_response(user_question, info, latency=latency, session=session)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Async HTTP server for the chatbot.
+
+    python server.py --port 8000 --workers 2 --threads 4
+
+Endpoints (JSON in, JSON out):
+    POST /chat        {"question": "..."}          -> {"answer": "..."}
+    POST /chat/batch  {"questions": ["...", ...]}  -> {"answers": ["...", ...]}
+    POST /retrieve    {"question": "...", "k": 5, "intent": ..., "poet": ...}
+                                                   -> {"answers": [{"response", "score", "intent", ...}, ...]}
+    GET  /health                                   -> {"status": "ok", ...}
+    GET  /metrics                                  -> Prometheus text (this worker's engine)
+
+Each worker process loads one ChatbotEngine (from the shared KB snapshot) and
+answers on a bounded thread pool so the event loop never blocks on scoring.
+When more than --max-pending requests are waiting for the pool, new ones get
+503 with Retry-After instead of queueing without bound.
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from chatbot_engine import ChatbotEngine, DEFAULT_RETRIEVER, DEFAULT_SNAPSHOT_DIR
+from conversation_log import ConversationLogger, DEFAULT_MAX_BYTES
+from retrievers import RETRIEVERS
+
+# --- CONFIGURATION ---
+JSON_FILE_PATH = "Final_Dataset_Generated.json"
+DEFAULT_PORT = 8000
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH_SIZE = 1024
+MAX_RETRIEVE_K = 50
+# -------------------
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ChatServer:
+    def __init__(self, engine, threads=4, max_pending=256, chat_log=None):
+        """chat_log: optional ConversationLogger receiving every answered question."""
+        self.engine = engine
+        self.chat_log = chat_log
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="chat-worker")
+        self.max_pending = max_pending
+        self.pending = 0
+        self.served = 0
+        self.rejected = 0
+
+    # --- Request handling ---
+
+    async def handle_connection(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        session = f"{peer[0]}:{peer[1]}" if isinstance(peer, tuple) else None
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as e:
+                    writer.write(_http_response(e.status, {"error": e.message}, keep_alive=False))
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                extra_headers = ()
+                try:
+                    status, payload = await self.route(method, path, body, session)
+                except HttpError as e:
+                    status, payload = e.status, {"error": e.message}
+                    if e.status == 503:
+                        extra_headers = (("Retry-After", "1"),)
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                writer.write(_http_response(status, payload, keep_alive, extra_headers))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def route(self, method, path, body, session=None):
+        if path == "/health":
+            if method != "GET":
+                raise HttpError(405, "use GET")
+            return 200, {"status": "ok", "pid": os.getpid(), "pending": self.pending,
+                         "served": self.served, "rejected": self.rejected}
+
+        if path == "/metrics":
+            if method != "GET":
+                raise HttpError(405, "use GET")
+            return 200, self.engine.export_metrics("prometheus")
+
+        if path not in ("/chat", "/chat/batch", "/retrieve"):
+            raise HttpError(404, f"unknown path {path}")
+        if method != "POST":
+            raise HttpError(405, "use POST")
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            raise HttpError(400, "body must be UTF-8 JSON")
+
+        if path == "/chat":
+            question = payload.get("question") if isinstance(payload, dict) else None
+            if not isinstance(question, str):
+                raise HttpError(400, "expected {\"question\": \"...\"}")
+            infos = await self._answer([question], session)
+            return 200, {"answer": infos[0].response}
+
+        if path == "/retrieve":
+            return 200, {"answers": await self._retrieve(payload)}
+
+        questions = payload.get("questions") if isinstance(payload, dict) else None
+        if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+            raise HttpError(400, "expected {\"questions\": [\"...\", ...]}")
+        if len(questions) > MAX_BATCH_SIZE:
+            raise HttpError(413, f"at most {MAX_BATCH_SIZE} questions per batch")
+        infos = await self._answer(questions, session)
+        return 200, {"answers": [info.response for info in infos]}
+
+    async def _retrieve(self, payload):
+        question = payload.get("question") if isinstance(payload, dict) else None
+        if not isinstance(question, str):
+            raise HttpError(400, "expected {\"question\": \"...\", \"k\": 5}")
+        k = payload.get("k", 5)
+        if isinstance(k, bool) or not isinstance(k, int) or not 1 <= k <= MAX_RETRIEVE_K:
+            raise HttpError(400, f"k must be an integer from 1 to {MAX_RETRIEVE_K}")
+        retrieve = functools.partial(self.engine.retrieve, k=k, intent=payload.get("intent"),
+                                     poet=payload.get("poet"))
+        try:
+            answers = await self._run(retrieve, question)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        return [answer._asdict() for answer in answers]
+
+    async def _answer(self, questions, session):
+        start = time.perf_counter()
+        infos = await self._run(self.engine.get_response_details, questions)
+        if self.chat_log is not None:
+            # Batch requests log each question with the latency of the whole batch
+            latency = time.perf_counter() - start
+            extra = {"batch_size": len(questions)} if len(questions) > 1 else {}
+            for question, info in zip(questions, infos):
+                self.chat_log.log_response(question, info, latency=latency, session=session, **extra)
+        return infos
+
+    async def _run(self, func, arg):
+        """Runs CPU-bound engine work on the thread pool, with backpressure."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HttpError(503, "server busy, retry later")
+        self.pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, func, arg)
+        finally:
+            self.pending -= 1
+        self.served += 1
+        return result
+
+    async def serve(self, sock):
+        server = await asyncio.start_server(self.handle_connection, sock=sock, limit=MAX_BODY_BYTES)
+        async with server:
+            await server.serve_forever()
+
+
+# --- Minimal HTTP/1.1 framing ---
+
+async def _read_request(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "bad Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def _http_response(status, payload, keep_alive, extra_headers=()):
+    if isinstance(payload, str):
+        # Plain-text payloads (the Prometheus exposition format)
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head.extend(f"{name}: {value}" for name, value in extra_headers)
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+# --- Process management ---
+
+def _load_engine(args, in_memory=False, shards=None):
+    # The engine's startup messages are noise in server logs
+    return ChatbotEngine(args.dataset, snapshot_dir=args.snapshot_dir, retriever=args.retriever,
+                         instrument=args.instrument, in_memory=in_memory or args.in_memory,
+                         shards=args.shards if shards is None else shards, verbose=False)
+
+
+def _chat_log(args, worker=None):
+    if not args.chat_log:
+        return None
+    path = args.chat_log
+    if worker is not None:
+        # One file per worker process, so rotation never races between processes
+        base, extension = os.path.splitext(path)
+        path = f"{base}.worker{worker}{extension}"
+    return ConversationLogger(path, max_bytes=args.chat_log_max_bytes)
+
+
+def _stop_with_parent(parent_pid):
+    # A parent killed outright never terminate()s its workers; unwind (as on SIGTERM) once it is gone
+    while os.getppid() == parent_pid:
+        time.sleep(1.0)
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def _worker_main(sock, args, worker, parent_pid):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Lets the parent's terminate() unwind normally, so the chat log is flushed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    threading.Thread(target=_stop_with_parent, args=(parent_pid,), name="parent-watch", daemon=True).start()
+    # The parent already saved the snapshot; workers only read it
+    engine = _load_engine(args, in_memory=True)
+    chat_log = _chat_log(args, worker)
+    server = ChatServer(engine, threads=args.threads, max_pending=args.max_pending, chat_log=chat_log)
+    try:
+        asyncio.run(server.serve(sock))
+    finally:
+        engine.close()
+        if chat_log is not None:
+            chat_log.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP server for the Telugu poets chatbot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--dataset", default=JSON_FILE_PATH)
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    parser.add_argument("--retriever", default=DEFAULT_RETRIEVER, choices=list(RETRIEVERS),
+                        help="retrieval backend for questions no rule matches")
+    parser.add_argument("--instrument", action="store_true",
+                        help="collect per-query spans and answer counters for /metrics")
+    parser.add_argument("--in-memory", action="store_true",
+                        help="never write to disk: a missing KB snapshot is built in memory by every process")
+    parser.add_argument("--chat-log", help="append answered questions to this JSON Lines file "
+                                           "(one file per process with --workers > 1)")
+    parser.add_argument("--chat-log-max-bytes", type=int, default=DEFAULT_MAX_BYTES,
+                        help="rotate the chat log when it would grow past this size")
+    parser.add_argument("--workers", type=int, default=1, help="number of server processes")
+    parser.add_argument("--threads", type=int, default=4, help="scoring threads per process")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="score the KB in this many shard processes per server process (word retriever)")
+    parser.add_argument("--max-pending", type=int, default=256,
+                        help="requests allowed to wait for a scoring thread before returning 503")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(1024)
+    sock.setblocking(False)
+
+    # Unwind on SIGTERM like on Ctrl-C: the chat log is flushed, and worker and shard processes are stopped
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    if args.workers <= 1:
+        engine = _load_engine(args)
+        chat_log = _chat_log(args)
+        print(f"Serving on http://{args.host}:{args.port} (1 process, {args.threads} threads)")
+        try:
+            asyncio.run(ChatServer(engine, threads=args.threads, max_pending=args.max_pending,
+                                   chat_log=chat_log).serve(sock))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            engine.close()
+            if chat_log is not None:
+                chat_log.close()
+        return
+
+    if not args.in_memory:
+        # Build (or validate) the KB snapshot once so every worker just memory-maps it
+        _load_engine(args, shards=0)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_worker_main, args=(sock, args, worker, os.getpid()), daemon=True)
+               for worker in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    print(f"Serving on http://{args.host}:{args.port} ({args.workers} processes, {args.threads} threads each)")
+    try:
+        for worker in workers:
+            worker.join()
+        # Every worker exited on its own; fail if they failed (e.g. the dataset could not be loaded)
+        if any(worker.exitcode for worker in workers):
+            sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from compact_kb import CompactKB
+from retrieval_index import merge_top_k
+
+# --- Sharded retrieval ---
+# For KBs with millions of rows, one process scoring every query against the
+# whole KB is bound to one core. ShardedKB splits a CompactKB into contiguous
+# poet ranges of about equal row counts, saves each range as a CompactKB of
+# its own (.npy files, memory-mapped by the worker) and gives every shard a
+# dedicated worker process. A batch of query vectors is sent to all workers at
+# once; each returns its top-k, already translated to KB rows. Shard rows map
+# to KB rows in order and every row is scored with the same arithmetic, so
+# merging the per-shard top-k (ties to the lower row) gives exactly the
+# unsharded results.
+
+# The worker's shard: (CompactKB, number of answer rows, answer_start, question_start)
+_shard = None
+
+
+def _load_shard(shard_dir, parent_pid):
+    global _shard
+    threading.Thread(target=_exit_with_parent, args=(parent_pid,), name="shard-parent-watch", daemon=True).start()
+    with open(os.path.join(shard_dir, "shard.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    arrays = {name: np.load(os.path.join(shard_dir, f"{name}.npy"), mmap_mode="r") for name in manifest["arrays"]}
+    kb = CompactKB.from_arrays(arrays, manifest["info"])
+    _shard = (kb, kb.num_answers, manifest["answer_start"], manifest["question_start"])
+
+
+def _exit_with_parent(parent_pid):
+    # A parent killed outright never shuts its pools down; don't outlive it
+    while os.getppid() == parent_pid:
+        time.sleep(1.0)
+    os._exit(0)
+
+
+def _shard_rows():
+    return _shard[0].num_rows
+
+
+def _search_shard(data, indices, indptr, shape, k, row_mask):
+    kb, num_answers, answer_start, question_start = _shard
+    query_vectors = csr_matrix((data, indices, indptr), shape=shape)
+    return [[(row + answer_start if row < num_answers else row - num_answers + question_start, score)
+             for row, score in matches]
+            for matches in kb.search(query_vectors, k=k, row_mask=row_mask)]
+
+
+class ShardedKB:
+    def __init__(self, kb, num_shards, work_dir=None):
+        """
+        Splits `kb` into num_shards shards (fewer if it has fewer poets), each
+        scored by its own worker process. The shard files go to a temporary
+        directory under work_dir (default: the system temp dir), removed by
+        close(). Blocks until every worker has loaded its shard.
+        """
+        # Split so each shard has about the same number of answer + question rows
+        answers_per_poet = np.bincount(kb.answer_poet, minlength=kb.num_poets)
+        rows_before = np.concatenate([[0], np.cumsum(answers_per_poet + kb.num_templates)])
+        targets = np.linspace(0, rows_before[-1], num_shards + 1)[1:-1]
+        bounds = np.unique(np.concatenate([[0], np.searchsorted(rows_before, targets), [kb.num_poets]]))
+
+        self._dir = tempfile.mkdtemp(prefix="kb_shards-", dir=work_dir)
+        self._executors = []
+        # Per shard, the KB rows it holds: (answer row slice, question row slice)
+        self.shard_rows = []
+        context = multiprocessing.get_context("spawn")
+        try:
+            for shard, (first, last) in enumerate(zip(bounds[:-1], bounds[1:])):
+                shard_kb, answer_start, question_start = kb.poet_slice(int(first), int(last))
+                shard_dir = os.path.join(self._dir, str(shard))
+                _save_shard(shard_dir, shard_kb, answer_start, question_start)
+                num_questions = shard_kb.num_rows - shard_kb.num_answers
+                self.shard_rows.append((slice(answer_start, answer_start + shard_kb.num_answers),
+                                        slice(question_start, question_start + num_questions)))
+                self._executors.append(ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                                           initializer=_load_shard,
+                                                           initargs=(shard_dir, os.getpid())))
+            # Start the workers (and load the shards) now rather than on the first query
+            loaded = sum(future.result() for future in [executor.submit(_shard_rows) for executor in self._executors])
+            assert loaded == kb.num_rows, "shards do not cover the KB"
+        except BaseException:
+            _close(self._executors, self._dir, os.getpid())
+            raise
+        self._finalizer = weakref.finalize(self, _close, self._executors, self._dir, os.getpid())
+
+    @property
+    def num_shards(self):
+        return len(self._executors)
+
+    def search(self, query_vectors, k=1, row_mask=None):
+        """Same contract as CompactKB.search (row_mask: boolean array over KB rows)."""
+        query_vectors = csr_matrix(query_vectors)
+        futures = []
+        for executor, (answer_rows, question_rows) in zip(self._executors, self.shard_rows):
+            shard_mask = None
+            if row_mask is not None:
+                shard_mask = np.concatenate([row_mask[answer_rows], row_mask[question_rows]])
+            futures.append(executor.submit(_search_shard, query_vectors.data, query_vectors.indices,
+                                           query_vectors.indptr, query_vectors.shape, k, shard_mask))
+        per_shard = [future.result() for future in futures]
+        return [merge_top_k(results, k) for results in zip(*per_shard)]
+
+    def close(self):
+        """Stops the workers and removes the shard files."""
+        self._finalizer()
+
+
+def _save_shard(shard_dir, kb, answer_start, question_start):
+    os.makedirs(shard_dir)
+    arrays, info = kb.to_arrays()
+    for name, array in arrays.items():
+        np.save(os.path.join(shard_dir, f"{name}.npy"), np.asarray(array))
+    manifest = {"arrays": list(arrays), "info": info, "answer_start": answer_start, "question_start": question_start}
+    with open(os.path.join(shard_dir, "shard.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+
+def _close(executors, shard_dir, owner_pid):
+    # Forked children inherit the object but neither the workers nor the files
+    if os.getpid() != owner_pid:
+        return
+    for executor in executors:
+        executor.shutdown(wait=True, cancel_futures=True)
+    shutil.rmtree(shard_dir, ignore_errors=True)
@@ -0,0 +1,68 @@
+import os
+import threading
+
+import pytest
+
+from benchmarks.synthetic import generate_poets, write_dataset
+from chatbot_engine import ChatbotEngine
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(REPO_DIR, "Final_Dataset_Generated.json")
+
+
+def lock_is_free(lock):
+    """Whether another thread could take `lock` right now."""
+    free = []
+
+    def probe():
+        if lock.acquire(blocking=False):
+            lock.release()
+            free.append(True)
+    thread = threading.Thread(target=probe)
+    thread.start()
+    thread.join()
+    return bool(free)
+
+
+@pytest.fixture
+def repo_dir():
+    return REPO_DIR
+
+
+@pytest.fixture
+def dataset():
+    """Path of the real dataset."""
+    return DATASET
+
+
+@pytest.fixture
+def synthetic_dataset(tmp_path):
+    """Writes a synthetic dataset of num_poets poets; returns (path, poets)."""
+    def write(num_poets, **options):
+        poets = generate_poets(num_poets, **options)
+        path = str(tmp_path / f"synthetic_{num_poets}.json")
+        write_dataset(path, poets)
+        return path, poets
+    return write
+
+
+@pytest.fixture
+def make_bot():
+    """
+    Builds quiet engines (no snapshot, no response cache unless given) on the
+    real dataset or `dataset_path`; they are closed after the test.
+    """
+    bots = []
+
+    def make(dataset_path=DATASET, **options):
+        options = {"snapshot_dir": None, "cache_size": 0, "verbose": False, **options}
+        bots.append(ChatbotEngine(dataset_path, **options))
+        return bots[-1]
+    yield make
+    for bot in bots:
+        bot.close()
+
+
+@pytest.fixture
+def bot(make_bot):
+    return make_bot()
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from chatbot_engine import RETRIEVAL_QUESTIONS
+
+RULE_QUESTIONS = ["కవిత్రయం ఎవరు?", "అష్టదిగ్గజాలు గురించి", "తిక్కన సమకాలికులు ఎవరు?", "'నీతి' శైలి కవులు ఎవరు?",
+                  "15 va satabda list", "'ఆంధ్ర మహాభారతం' రచన ఎవరు రాశారు"]
+MISSES = ["", "xyz", "what is the weather"]
+
+
+def workload(bot, size=300):
+    rng = random.Random(0)
+    names = [p['name_telugu'] for p in bot.data_all]
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    questions = [rng.choice(templates).replace("POET_NAME", rng.choice(names)) for _ in range(size)]
+    # Repeats, so batches hold duplicate questions
+    return questions + RULE_QUESTIONS + MISSES + questions[:20]
+
+
+@pytest.mark.parametrize("cache_size", [0, 64])
+def test_batch_answers_match_single_questions(make_bot, cache_size):
+    bot = make_bot(cache_size=cache_size)
+    questions = workload(bot)
+    single = [bot.get_response(question) for question in questions]
+    assert bot.get_responses(questions) == single
+    assert make_bot(cache_size=cache_size).get_responses(questions) == single
+
+
+def test_batch_scoring_matches_single_question_scoring(bot):
+    questions = workload(bot)
+    for k in (1, 5):
+        batched = bot._score_questions(questions, k=k)
+        assert batched == [bot._score_questions([question], k=k)[0] for question in questions]
@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_kb_memory import build_legacy_kb
+from benchmarks.synthetic import generate_poets
+from chatbot_engine import ChatbotEngine, RETRIEVAL_QUESTIONS, TFIDF_NGRAM_RANGE
+from compact_kb import build_compact_kb
+
+
+def real_poets():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Final_Dataset_Generated.json")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(params=["real", "synthetic"], scope="module")
+def layouts(request):
+    """(legacy KB, compact KB, compact vectorizer) built from the same poets."""
+    poets = real_poets() if request.param == "real" else generate_poets(150, seed=3)
+    legacy = build_legacy_kb(poets, ChatbotEngine._poet_answers, RETRIEVAL_QUESTIONS, TFIDF_NGRAM_RANGE)
+    kb, vectorizer = build_compact_kb(poets, ChatbotEngine._poet_answers, RETRIEVAL_QUESTIONS,
+                                      ngram_range=TFIDF_NGRAM_RANGE)
+    return legacy, kb, vectorizer
+
+
+def test_vocabulary_and_idf_match_legacy(layouts):
+    (_, _, legacy_vectorizer, _), _, vectorizer = layouts
+    assert vectorizer.vocabulary_ == legacy_vectorizer.vocabulary_
+    np.testing.assert_allclose(vectorizer.idf_, legacy_vectorizer.idf_, rtol=1e-12)
+
+
+def test_rows_match_legacy_rows_with_the_same_text(layouts):
+    (documents, _, _, kb_vectors), kb, _ = layouts
+    legacy_rows = {}
+    for row, text in enumerate(documents):
+        legacy_rows.setdefault(text, row)
+    materialized = kb.materialize()
+    texts = set()
+    for row, text, _ in kb.iter_documents():
+        texts.add(text)
+        np.testing.assert_allclose(materialized[row].toarray(), kb_vectors[legacy_rows[text]].toarray(),
+                                   rtol=1e-9, atol=1e-12)
+    # The compact KB only drops the repeated question rows of multi-answer intents
+    assert texts == set(documents)
+
+
+def test_best_scores_match_legacy(layouts):
+    (documents, _, legacy_vectorizer, kb_vectors), kb, vectorizer = layouts
+    rng = np.random.default_rng(0)
+    queries = [documents[row] for row in rng.choice(len(documents), 60, replace=False)]
+    queries += ["కవిత్రయం", "శతకం రచయిత ఎవరు", "పుట్టిన ఊరు ఏది", "no telugu here"]
+    legacy_scores = (legacy_vectorizer.transform(queries) @ kb_vectors.T).toarray()
+    for query, scores, results in zip(queries, legacy_scores, kb.search(vectorizer.transform(queries), k=1)):
+        if scores.max() <= 0:
+            assert results == [], query
+            continue
+        assert results[0][1] == pytest.approx(scores.max(), rel=1e-9), query
+        # The best row holds the text of one of the legacy layout's best rows
+        best_texts = {documents[row] for row in np.flatnonzero(np.isclose(scores, scores.max(), rtol=1e-9))}
+        assert dict((row, text) for row, text, _ in kb.iter_documents())[results[0][0]] in best_texts, query
+
+
+def test_search_matches_brute_force_on_materialized_rows(layouts):
+    (documents, _, _, _), kb, vectorizer = layouts
+    rng = np.random.default_rng(1)
+    queries = vectorizer.transform([documents[row] for row in rng.choice(len(documents), 40, replace=False)])
+    all_scores = (queries @ kb.materialize().T).toarray()
+    for k in (1, 5):
+        for scores, results in zip(all_scores, kb.search(queries, k=k)):
+            rows = np.flatnonzero(scores > 0)
+            expected = sorted(rows.tolist(), key=lambda row: (-scores[row], row))[:k]
+            # Rows whose scores differ only by rounding may come back in either order
+            returned = [row for row, _ in results]
+            assert len(set(returned)) == len(returned) == len(expected)
+            np.testing.assert_allclose([score for _, score in results], scores[expected], rtol=1e-9)
+            np.testing.assert_allclose(scores[returned], scores[expected], rtol=1e-9)
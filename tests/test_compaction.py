@@ -0,0 +1,40 @@
+import copy
+
+import chatbot_engine
+from conftest import lock_is_free
+
+QUESTIONS = ["నన్నయ భట్టారకుడు ఎవరు?", "వేమన యోగి ఎవరు?", "తిక్కన సోమయాజి రాసిన రచనలు ఏమిటి?"]
+
+
+def test_sharded_compaction_builds_outside_the_lock(make_bot, monkeypatch):
+    bot = make_bot(shards=1)
+    unsharded = make_bot()
+    poet = copy.deepcopy(bot.data_all[0])
+    poet['biography_summary'] = "ఆదికవి నన్నయ మహాభారతాన్ని తెలుగులోకి అనువదించడం ప్రారంభించారు."
+    for engine in (bot, unsharded):
+        engine.upsert_poet(copy.deepcopy(poet))
+        engine.compact()
+
+    # The delta KB reuses the main segment's shards; only compact() starts new ones
+    bot.upsert_poet(poet)
+    make_retriever = chatbot_engine.make_retriever
+    built, closed = [], []
+
+    def checked_make_retriever(*args, **kwargs):
+        assert lock_is_free(bot._kb_lock), "retriever built while _kb_lock is held"
+        retriever = make_retriever(*args, **kwargs)
+        built.append(retriever)
+        return retriever
+    monkeypatch.setattr(chatbot_engine, "make_retriever", checked_make_retriever)
+    previous = bot.retriever
+    previous_close = previous.close
+
+    def checked_close():
+        assert lock_is_free(bot._kb_lock), "retriever closed while _kb_lock is held"
+        closed.append(previous)
+        previous_close()
+    monkeypatch.setattr(previous, "close", checked_close)
+
+    assert bot.compact()
+    assert built == [bot.retriever] and closed == [previous]
+    assert bot.get_responses(QUESTIONS) == unsharded.get_responses(QUESTIONS)
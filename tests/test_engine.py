@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+def test_quiet_engine_prints_nothing(make_bot, capsys):
+    make_bot(verbose=False)
+    assert capsys.readouterr().out == ""
+    make_bot(verbose=True)
+    assert "Bot Engine: Ready." in capsys.readouterr().out
+
+
+def test_legacy_export_rejects_an_output_file(bot, repo_dir, tmp_path):
+    with pytest.raises(ValueError, match="legacy"):
+        bot.export_kb(str(tmp_path / "kb.txt"), format="legacy")
+    result = subprocess.run([sys.executable, os.path.join(repo_dir, "kb_export.py"), "--format", "legacy",
+                             "--output", "kb.txt"], cwd=tmp_path, capture_output=True, text=True, encoding="utf-8")
+    assert result.returncode == 2 and "--output only applies to --format jsonl" in result.stderr
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+import kb_snapshot
+
+
+@pytest.fixture
+def start_engine(make_bot, capsys):
+    """Builds an engine; returns (its startup output, KB fingerprint)."""
+    def start(snapshot_dir, **options):
+        bot = make_bot(snapshot_dir=snapshot_dir, verbose=True, **options)
+        return capsys.readouterr().out, bot.kb_fingerprint
+    return start
+
+
+def test_damaged_snapshot_is_replaced(start_engine, tmp_path):
+    snapshot_dir = str(tmp_path)
+    output, fingerprint = start_engine(snapshot_dir)
+    assert "KB snapshot saved" in output
+
+    # Truncate one of the arrays: the snapshot no longer loads
+    with open(os.path.join(snapshot_dir, fingerprint, "answer_poet.npy"), "wb") as f:
+        f.write(b"damaged")
+    assert kb_snapshot.load_snapshot(snapshot_dir, fingerprint) is None
+
+    output, _ = start_engine(snapshot_dir)
+    assert "KB snapshot saved" in output
+    assert kb_snapshot.load_snapshot(snapshot_dir, fingerprint) is not None
+    output, _ = start_engine(snapshot_dir)
+    assert "Loaded retrieval knowledge base from snapshot" in output
+    assert sorted(os.listdir(snapshot_dir)) == [fingerprint]
+
+
+def test_rebuild_replaces_snapshot(start_engine, tmp_path):
+    snapshot_dir = str(tmp_path)
+    _, fingerprint = start_engine(snapshot_dir)
+    manifest = os.path.join(snapshot_dir, fingerprint, kb_snapshot.MANIFEST_FILE)
+    before = os.stat(manifest).st_ino
+
+    output, _ = start_engine(snapshot_dir, rebuild_kb=True)
+    assert "KB snapshot saved" in output
+    assert os.stat(manifest).st_ino != before
+    assert sorted(os.listdir(snapshot_dir)) == [fingerprint]
+
+
+def test_loadable_snapshot_is_kept(start_engine, tmp_path):
+    snapshot_dir = str(tmp_path)
+    _, fingerprint = start_engine(snapshot_dir)
+    snapshot = kb_snapshot.load_snapshot(snapshot_dir, fingerprint, mmap=False)
+    manifest = os.path.join(snapshot_dir, fingerprint, kb_snapshot.MANIFEST_FILE)
+    before = os.stat(manifest).st_ino
+
+    # As if another worker had published the same snapshot first
+    assert kb_snapshot.save_snapshot(snapshot_dir, fingerprint, *snapshot) is None
+    assert os.stat(manifest).st_ino == before
+    assert sorted(os.listdir(snapshot_dir)) == [fingerprint]
+
+
+def test_snapshots_of_other_datasets_are_kept(start_engine, synthetic_dataset, tmp_path):
+    snapshot_dir = str(tmp_path / "snapshots")
+    _, real_fingerprint = start_engine(snapshot_dir)
+    path, poets = synthetic_dataset(30)
+    _, synthetic_fingerprint = start_engine(snapshot_dir, dataset_path=path)
+    assert sorted(os.listdir(snapshot_dir)) == sorted([real_fingerprint, synthetic_fingerprint])
+    output, _ = start_engine(snapshot_dir)
+    assert "Loaded retrieval knowledge base from snapshot" in output
+
+    # A new version of the synthetic dataset supersedes only its own snapshot
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    _, changed_fingerprint = start_engine(snapshot_dir, dataset_path=path)
+    assert sorted(os.listdir(snapshot_dir)) == sorted([real_fingerprint, changed_fingerprint])
+
+
+def test_snapshot_that_does_not_make_a_kb_is_replaced(start_engine, tmp_path):
+    snapshot_dir = str(tmp_path)
+    _, fingerprint = start_engine(snapshot_dir)
+    # Readable files, but the strings no longer match the arrays
+    with open(os.path.join(snapshot_dir, fingerprint, "info.json"), "w", encoding="utf-8") as f:
+        f.write('{"shapes": {}}')
+    assert kb_snapshot.load_snapshot(snapshot_dir, fingerprint) is not None
+
+    output, _ = start_engine(snapshot_dir)
+    assert "KB snapshot saved" in output
+    assert "poet_ids" in kb_snapshot.load_snapshot(snapshot_dir, fingerprint)[1]
+    output, _ = start_engine(snapshot_dir)
+    assert "Loaded retrieval knowledge base from snapshot" in output
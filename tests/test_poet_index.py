@@ -0,0 +1,102 @@
+import copy
+import random
+
+from benchmarks.synthetic import generate_poets
+from poet_index import PoetIndex
+
+
+def lookups(index, poets):
+    """Every answer the rule handlers can get from `index`, as poet ids."""
+    def ids(found):
+        return [p['id'] for p in found]
+    genres = {poem['genre'].lower() for p in poets for poem in p['poems']}
+    works = {work.lower() for p in poets for work in p['famous_works']}
+    return {
+        "poets": ids(index.poets()),
+        "names": {p['name_telugu']: index.find_by_name(p['name_telugu'])['id'] for p in poets},
+        "eras": {p['era']: ids(index.poets_in_era(p['era'])) for p in poets},
+        "centuries": {century: ids(index.poets_in_century(century)) for century in index.centuries()},
+        "century_keys": sorted(index.centuries()),
+        "genre_keys": sorted(index.genres()),
+        "genres": {genre[:n]: ids(index.poets_by_genre(genre[:n])) for genre in genres for n in (2, len(genre))},
+        "works": {work[:n]: ids(index.poets_by_work(work[:n])) for work in works for n in (4, len(work))},
+        "keyword": ids(index.poets_with_biography_keyword("అష్టదిగ్గజాలు")),
+    }
+
+
+def test_single_poet_updates_match_a_full_build():
+    rng = random.Random(0)
+    poets = generate_poets(120, num_genres=6)
+    extra = generate_poets(140, num_genres=9, seed=1)[120:]
+    index = PoetIndex(poets)
+    current = list(poets)
+    for step in range(60):
+        action = rng.random()
+        if action < 0.3 and current:
+            poet_id = rng.choice(current)['id']
+            index = index.without_poet(poet_id)
+            current = [p for p in current if p['id'] != poet_id]
+        elif action < 0.6 and current:
+            # Replace in place: new name, era, genres and works
+            replaced = copy.deepcopy(rng.choice(extra))
+            position = rng.randrange(len(current))
+            replaced['id'] = current[position]['id']
+            if step % 3 == 0:
+                replaced['biography_summary'] += " అష్టదిగ్గజాలు"
+            index = index.with_poet(replaced)
+            current[position] = replaced
+        else:
+            added = copy.deepcopy(rng.choice(extra))
+            added['id'] = 1000 + step
+            index = index.with_poet(added)
+            current.append(added)
+        assert lookups(index, current) == lookups(PoetIndex(current), current), step
+
+
+def test_updates_leave_the_previous_index_untouched():
+    poets = generate_poets(50)
+    index = PoetIndex(poets)
+    before = lookups(index, poets)
+    updated = index.without_poet(poets[3]['id']).with_poet(dict(poets[5], name_telugu="కొత్త కవి"))
+    assert lookups(index, poets) == before
+    assert updated.find_by_name("కొత్త")['id'] == poets[5]['id']
+
+
+def test_engine_tables_match_a_full_rebuild(make_bot, synthetic_dataset):
+    path, poets = synthetic_dataset(200)
+    bot = make_bot(path)
+    renamed = dict(copy.deepcopy(poets[10]), name_telugu=poets[11]['name_telugu'])
+    bot.upsert_poet(renamed)
+    bot.upsert_poet(dict(copy.deepcopy(poets[20]), id=5000, name_telugu="కొత్త కవి"))
+    bot.remove_poet(poets[11]['id'])
+    bot.remove_poet(poets[30]['id'])
+    bot.upsert_poet(dict(copy.deepcopy(poets[40]), era="సా.శ. 19వ శతాబ్దం"))
+
+    poets_by_name, poets_by_id, poet_index, materialized_answers = bot._poet_tables(bot.data_all)
+    assert [p['id'] for p in bot.data_all] == [p['id'] for p in poet_index.poets()]
+    assert bot.poets_by_name == poets_by_name
+    assert bot.poets_by_id == poets_by_id
+    assert lookups(bot.poet_index, bot.data_all) == lookups(poet_index, bot.data_all)
+    assert bot.materialized_answers == materialized_answers
+
+
+def test_materialized_answers_after_updates_match_a_full_build(make_bot, synthetic_dataset):
+    path, poets = synthetic_dataset(150)
+    bot = make_bot(path)
+    rng = random.Random(2)
+    extra = generate_poets(170, num_genres=9, seed=3)[150:]
+    for step in range(25):
+        current = bot.data_all
+        if step % 5 == 0:
+            bot.remove_poet(rng.choice(current)['id'])
+            continue
+        poet = copy.deepcopy(rng.choice(extra))
+        # Replace a kavitrayam poet, any other poet, or add one
+        poet['id'] = rng.choice([1, 2, 3, rng.choice(current)['id'], 2000 + step])
+        if step % 3 == 0:
+            poet['biography_summary'] += " అష్టదిగ్గజాలు"
+        if step % 4 == 0:
+            poet['poems'][0]['genre'] = poet['poems'][0]['genre'][:2]
+        bot.upsert_poet(poet)
+        expected = bot._materialize_answers(bot.poet_index, bot.poets_by_id)
+        assert bot.materialized_answers == expected, step
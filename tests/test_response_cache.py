@@ -0,0 +1,55 @@
+import unicodedata
+
+import pytest
+
+from benchmarks.bench_rule_dispatch import RULE_QUESTIONS
+from response_cache import ResponseCache
+
+QUESTIONS = RULE_QUESTIONS + [
+    "15 va satabda LIST", "‘భక్తి’ శైలి కవులు ఎవరు?", "'భక్తి' శైలి కవులు ఎవరు?", "కవిత్రయం  ఎవరు",
+    " సమకాలికులు ఎవరు", "సమకాలికులు ఎవరు", "'నీతి' genre poem from ", "'నీతి' genre poem from",
+    "  తిక్కన సమకాలికులు ఎవరు??", "TIKKANA evaru?", "tikkana evaru", "Who is తిక్కన?", "who is తిక్కన ?",
+    "నన్నయ ఎవరు？", "వేమన పద్యం", "వేమన  పద్యం ", "hello", "HELLO",
+]
+# The same questions with every character decomposed
+QUESTIONS += [unicodedata.normalize("NFD", question) for question in QUESTIONS]
+
+
+@pytest.mark.parametrize("retriever", ["word", "char"])
+def test_cached_answers_equal_uncached_answers(make_bot, retriever):
+    uncached = make_bot(retriever=retriever)
+    cached = make_bot(retriever=retriever, cache_size=64)
+    expected = [uncached.get_response(question) for question in QUESTIONS]
+    # Twice: first filling the cache, then answering from it
+    for _ in range(2):
+        assert [cached.get_response(question) for question in QUESTIONS] == expected
+        assert cached.get_responses(QUESTIONS) == expected
+    assert cached.cache_stats()['hits'] > 0
+
+
+def test_decomposed_questions_get_the_composed_answer(make_bot):
+    bot = make_bot()
+    question = "'శృంగార నైషధం' రచన ఎవరు రాశారు?"
+    decomposed = unicodedata.normalize("NFD", question)
+    assert decomposed != question
+    assert bot.get_response(decomposed) == bot.get_response(question)
+    assert "శ్రీనాథుడు" in bot.get_response(decomposed)
+    assert bot.retrieve(decomposed + " నైషధం", k=3) == bot.retrieve(question + " నైషధం", k=3)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_cache_drops_responses_computed_before_an_invalidation():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate()
+    cache.put("a", 1, generation)
+    assert cache.get("a") is None
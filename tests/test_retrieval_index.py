@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from scipy.sparse import random as sparse_random
+
+from retrieval_index import InvertedIndex, merge_top_k, top_k
+
+
+def brute_force(query_vectors, row_vectors, k, row_mask=None, row_offset=0):
+    """Top-k by a full sparse product: best first, ties to the lower row, zero scores dropped."""
+    results = []
+    for scores in (query_vectors @ row_vectors.T).toarray():
+        rows = np.flatnonzero(scores > 0)
+        if row_mask is not None:
+            rows = rows[row_mask[rows + row_offset]]
+        order = sorted(rows.tolist(), key=lambda row: (-scores[row], row))[:k]
+        results.append([(row + row_offset, float(scores[row])) for row in order])
+    return results
+
+
+def quantized(matrix):
+    # Weights on a 1/4 grid make products exact, so ties between rows are real ties
+    matrix.data = np.ceil(matrix.data * 4) / 4
+    return matrix
+
+
+# A small index (dense accumulator) and a large, sparse one (sorted touched rows)
+@pytest.mark.parametrize("num_rows, density", [(50, 0.1), (20000, 0.01)])
+@pytest.mark.parametrize("k", [1, 3, 10])
+def test_search_matches_brute_force_with_ties(num_rows, density, k):
+    rng = np.random.default_rng(0)
+    rows = quantized(sparse_random(num_rows, 40, density=density, format="csr", random_state=rng))
+    queries = quantized(sparse_random(30, 40, density=0.1, format="csr", random_state=rng))
+    index = InvertedIndex(rows)
+    assert index.search(queries, k=k) == brute_force(queries, rows, k)
+
+    row_mask = rng.random(num_rows + 5) < 0.5
+    offset_index = InvertedIndex(rows, row_offset=5)
+    assert offset_index.search(queries, k=k, row_mask=row_mask) == brute_force(queries, rows, k, row_mask, 5)
+
+
+def test_terms_unknown_to_the_index_are_ignored():
+    index = InvertedIndex(quantized(sparse_random(10, 5, density=0.5, format="csr", random_state=0)))
+    assert index.score(np.array([7, 9]), np.array([1.0, 1.0]))[0].size == 0
+
+
+def test_top_k_breaks_ties_by_lower_row():
+    rows, scores = np.array([2, 5, 7, 9]), np.array([0.5, 0.9, 0.5, 0.5])
+    assert top_k(rows, scores, 1) == [(5, 0.9)]
+    assert top_k(rows, scores, 3) == [(5, 0.9), (2, 0.5), (7, 0.5)]
+    assert merge_top_k([[(7, 0.5)], [(2, 0.5), (1, 0.1)]], 2) == [(2, 0.5), (7, 0.5)]
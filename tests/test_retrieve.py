@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.bench_topk import full_sort_distinct
+from chatbot_engine import RETRIEVAL_QUESTIONS
+from server import ChatServer, HttpError
+
+QUESTIONS = ["తిక్కన ఎవరు?", "పోతన రచనలు ఏవి", "శ్రీనాథుడు ఎక్కడ జన్మించారు", "భక్తి పద్యం", "కవి",
+             "వేమన", "నన్నయ జీవిత కాలం", "ఏ శతాబ్దం"]
+
+
+@pytest.mark.parametrize("k", [1, 3, 10])
+def test_retrieve_matches_full_sort(bot, k):
+    for question in QUESTIONS:
+        expected = full_sort_distinct(bot, question, k)
+        got = [(answer.row, answer.score) for answer in bot.retrieve(question, k=k)]
+        assert got == expected, question
+
+
+def test_filters_select_only_their_rows(bot):
+    poet = bot.data_all[0]
+    for intent in RETRIEVAL_QUESTIONS:
+        for answer in bot.retrieve(poet['name_telugu'], k=5, intent=intent, poet=[poet['id']], threshold=0.0):
+            assert (answer.intent, answer.poet_name) == (intent, poet['name_telugu'])
+    by_name = bot.retrieve("రచనలు", k=5, poet=poet['name_telugu'], threshold=0.0)
+    assert by_name == bot.retrieve("రచనలు", k=5, poet=poet['id'], threshold=0.0)
+
+
+@pytest.mark.parametrize("filters", [{"intent": []}, {"poet": []}, {"intent": 3}, {"intent": ["ask_era", None]},
+                                     {"intent": "ask_nothing"}, {"poet": [[1]]}, {"poet": 1.0}, {"poet": True},
+                                     {"poet": {"id": 1}}])
+def test_bad_filters_raise_value_error(bot, filters):
+    with pytest.raises(ValueError):
+        bot.retrieve("తిక్కన ఎవరు?", **filters)
+
+
+@pytest.mark.parametrize("filters", [{"intent": []}, {"poet": [[1]]}, {"poet": 1.0}, {"poet": True}, {"k": True}])
+def test_server_rejects_bad_filters(bot, filters):
+    server = ChatServer(bot, threads=1)
+    body = json.dumps({"question": "తిక్కన ఎవరు?", **filters}).encode("utf-8")
+    try:
+        with pytest.raises(HttpError) as error:
+            asyncio.run(server.route("POST", "/retrieve", body))
+        assert error.value.status == 400
+        status, payload = asyncio.run(server.route("POST", "/retrieve", json.dumps({"question": "తిక్కన"}).encode()))
+        assert status == 200 and payload["answers"]
+    finally:
+        server.executor.shutdown()
@@ -0,0 +1,21 @@
+import pytest
+
+from chatbot_engine import NOT_UNDERSTOOD_RESPONSE
+
+
+
+@pytest.fixture
+def char_bot(make_bot):
+    return make_bot(retriever="char")
+
+
+@pytest.mark.parametrize("question", ["what is the weather", "tell me a joke", "who is modi", "మోదీ ఎవరు?"])
+def test_char_retriever_does_not_answer_out_of_domain_questions(char_bot, question):
+    assert char_bot.get_response(question) == NOT_UNDERSTOOD_RESPONSE
+
+
+@pytest.mark.parametrize("question, poet", [("who is nannaya", "నన్నయ భట్టారకుడు"),
+                                            ("pothana poem", "బమ్మెర పోతన"),
+                                            ("వేమన ఎవరు?", "వేమన యోగి")])
+def test_char_retriever_answers_poet_questions(char_bot, question, poet):
+    assert char_bot.get_response(question).startswith(poet)
@@ -0,0 +1,63 @@
+import json
+import random
+
+import pytest
+
+from benchmarks.bench_rule_dispatch import RULE_QUESTIONS
+from benchmarks.synthetic import generate_queries
+from conftest import DATASET
+from rule_engine import MAX_RULE_INPUT_LENGTH
+
+
+def sequential(rules, text):
+    """The rule pass before RuleDispatcher: every regex in order, first match wins."""
+    for rule in rules:
+        match = rule.pattern.search(text)
+        if match:
+            return rule, match
+    return None, None
+
+
+def questions():
+    with open(DATASET, encoding="utf-8") as f:
+        poets = json.load(f)
+    rng = random.Random(0)
+    texts = RULE_QUESTIONS + [question for question, _ in generate_queries(poets, 600, rule_fraction=0.5)]
+    # Questions that several rules match, case variants and near misses of the literals
+    texts += ["'నీతి' శైలి పద్యం from తిక్కన కవులు ఎవరు", "'భక్తి' GENRE poem BY పోతన", "'x' Style poets",
+              "కవిత్రయం ఎవరు? 'మనుచరిత్రము' రచన ఎవరు రాశారు", "12 శతాబ్ద కవులు జాబితా సమకాలికులు ఎవరు",
+              "15va satabda kavulu list", "15 va satabda LIST", "కవిత్రయం  ఎవరు", "అష్టదిగ్గజాలుఎవరు",
+              "'' శైలి ఎవరు", "తిక్కన సమకాలీన కవులు ఎవరు?", "'భక్తి'శైలి కవులు ఎవరు", ""]
+    for text in list(texts):
+        cut = rng.randrange(len(text) + 1)
+        texts.append(text[:cut] + text[cut + 1:])
+    return texts
+
+
+def test_dispatcher_keeps_first_match_precedence(bot):
+    matched = set()
+    for text in questions():
+        rule, match = bot.rule_dispatcher.match(text)
+        expected_rule, expected_match = sequential(bot.rule_based_intents, text)
+        assert rule is expected_rule, text
+        if rule is not None:
+            assert match.groups() == expected_match.groups(), text
+            matched.add(rule.name)
+    assert matched == {rule.name for rule in bot.rule_based_intents}
+
+
+def test_long_input_still_matches_fixed_rules(bot):
+    question = "x" * 600 + " కవిత్రయం ఎవరు"
+    [details] = bot.get_response_details([question])
+    assert details.rule == "kavitrayam"
+    assert details.response == bot.get_response("కవిత్రయం ఎవరు")
+    assert bot.rule_dispatcher.oversized_inputs == 1
+
+
+@pytest.mark.parametrize("question", ["'{}' శైలి కవులు ఎవరు?", "{}వ శతాబ్ద కవులు జాబితా",
+                                      "'{}' genre poem from తిక్కన", "{} సమకాలికులు ఎవరు"])
+def test_long_input_skips_backtracking_rules(bot, question):
+    long_question = question.format("ఆ" * MAX_RULE_INPUT_LENGTH)
+    assert bot.rule_dispatcher.match(long_question) == (None, None)
+    skipped = [row['rule'] for row in bot.rule_stats() if row['oversized_skips']]
+    assert "kavitrayam" not in skipped and "list_by_genre" in skipped
@@ -0,0 +1,29 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from benchmarks.bench_cache import read_log_questions
+
+
+def test_ask_reports_missing_dataset(repo_dir, tmp_path):
+    result = subprocess.run([sys.executable, os.path.join(repo_dir, "run_chatbot.py"), "--ask", "కవిత్రయం ఎవరు?"],
+                            cwd=tmp_path, capture_output=True, text=True, encoding="utf-8")
+    assert result.returncode == 1
+    assert "Final_Dataset_Generated.json" in result.stderr
+
+
+def test_ask_logs_only_to_an_explicit_log_file(repo_dir, dataset, tmp_path):
+    shutil.copy(dataset, tmp_path / "Final_Dataset_Generated.json")
+    command = [sys.executable, os.path.join(repo_dir, "run_chatbot.py"), "--ask", "కవిత్రయం ఎవరు?"]
+    result = subprocess.run(command, cwd=tmp_path, capture_output=True, text=True, encoding="utf-8")
+    assert result.returncode == 0 and "కవిత్రయం" in result.stdout
+    assert not list(tmp_path.glob("chat_history.jsonl*"))
+
+    result = subprocess.run(command + ["--log-file", "asked.jsonl"], cwd=tmp_path, capture_output=True,
+                            text=True, encoding="utf-8")
+    assert result.returncode == 0
+    with open(tmp_path / "asked.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line)["question"] for line in f] == ["కవిత్రయం ఎవరు?"]
+    assert read_log_questions([str(tmp_path / "asked.jsonl")]) == ["కవిత్రయం ఎవరు?"]
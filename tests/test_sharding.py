@@ -0,0 +1,98 @@
+import copy
+import random
+import threading
+
+import pytest
+
+from chatbot_engine import RETRIEVAL_QUESTIONS
+from conftest import lock_is_free
+
+
+@pytest.fixture
+def engines(make_bot, synthetic_dataset):
+    """(unsharded, sharded) engines on the same synthetic dataset, and its poets."""
+    path, poets = synthetic_dataset(600)
+    return make_bot(path), make_bot(path, shards=3), poets
+
+
+def questions(poets):
+    rng = random.Random(0)
+    templates = [q for questions in RETRIEVAL_QUESTIONS.values() for q in questions]
+    names = [poet['name_telugu'] for poet in poets]
+    texts = [rng.choice(templates).replace("POET_NAME", rng.choice(names)) for _ in range(150)]
+    return texts + ["ఎవరు", "పద్యం", "కవి", "", "xyz", "కొత్త కవి ఎవరు?",
+                    " ".join(rng.choice(names).split()[0] for _ in range(4))]
+
+
+def assert_same_results(unsharded, sharded, texts, poets):
+    for k in (1, 5, 40):
+        assert sharded._score_questions(texts, k=k) == unsharded._score_questions(texts, k=k)
+    rng = random.Random(1)
+    for text in texts[:20]:
+        filters = [{"intent": "ask_poem"}, {"poet": rng.choice(poets)['name_telugu']},
+                   {"intent": ["ask_era", "ask_titles"], "poet": [rng.choice(poets)['id'], 10 ** 6]}]
+        for options in filters:
+            assert (sharded.retrieve(text, k=5, threshold=0, **options)
+                    == unsharded.retrieve(text, k=5, threshold=0, **options)), (text, options)
+    assert sharded.get_response_details(texts) == unsharded.get_response_details(texts)
+
+
+def test_sharded_results_match_unsharded(engines):
+    unsharded, sharded, poets = engines
+    assert sharded.retriever.indexes[0].num_shards == 3
+    texts = questions(poets)
+    assert_same_results(unsharded, sharded, texts, poets)
+
+    new_poet = copy.deepcopy(poets[7])
+    new_poet.update(id=10 ** 6, name_telugu="కొత్త కవి")
+    for bot in (unsharded, sharded):
+        bot.remove_poet(poets[5]['id'])
+        bot.upsert_poet(copy.deepcopy(new_poet))
+    assert sharded._tombstoned_rows and sharded._delta_kb is not None
+    assert_same_results(unsharded, sharded, texts, poets)
+
+    for bot in (unsharded, sharded):
+        assert bot.compact()
+    assert_same_results(unsharded, sharded, texts, poets)
+
+
+def test_queries_score_without_the_lock(bot, monkeypatch):
+    retriever = bot.retriever
+    search = retriever.search
+    lock_states = []
+
+    def checked_search(*args, **kwargs):
+        lock_states.append(lock_is_free(bot._kb_lock))
+        return search(*args, **kwargs)
+    monkeypatch.setattr(retriever, "search", checked_search)
+    bot.get_responses(["తిక్కన ఎవరు?", "పోతన రచనలు ఏవి?"])
+    bot.retrieve("వేమన పద్యం", k=3, intent="ask_poem")
+    assert lock_states == [True, True]
+
+
+def test_replaced_retriever_is_closed_after_its_last_query(bot, monkeypatch):
+    previous = bot.retriever
+    search = previous.search
+    scoring, finish = threading.Event(), threading.Event()
+    closed = []
+
+    def slow_search(*args, **kwargs):
+        scoring.set()
+        finish.wait(10)
+        return search(*args, **kwargs)
+    monkeypatch.setattr(previous, "search", slow_search)
+    monkeypatch.setattr(previous, "close", lambda: closed.append(previous))
+
+    answers = []
+    query = threading.Thread(target=lambda: answers.append(bot.get_response("తిక్కన ఎవరు?")))
+    query.start()
+    assert scoring.wait(10)
+    # Upserts and compaction go ahead while the query is scoring
+    bot.remove_poet(bot.data_all[-1]['id'])
+    assert bot.compact()
+    assert bot.retriever is not previous and closed == []
+
+    finish.set()
+    query.join()
+    assert closed == [previous]
+    assert answers and bot._kb_users == {} and bot._retired_retrievers == {}
@@ -0,0 +1,29 @@
+import copy
+
+import pytest
+
+QUESTION = "నన్నయ భట్టారకుడు ఎవరు?"
+
+
+def test_malformed_upsert_leaves_engine_unchanged(bot):
+    nannaya = next(p for p in bot.data_all if p['name_telugu'].strip() == "నన్నయ భట్టారకుడు")
+    answer = bot.get_response(QUESTION)
+    data_all, delta_poets, row_alive = list(bot.data_all), dict(bot._delta_poets), bot.row_alive.copy()
+
+    malformed = copy.deepcopy(nannaya)
+    del malformed['biography_summary']
+    with pytest.raises(KeyError):
+        bot.upsert_poet(malformed)
+
+    assert bot.data_all == data_all
+    assert bot._delta_poets == delta_poets
+    assert (bot.row_alive == row_alive).all()
+    assert bot.poets_by_id[nannaya['id']] is nannaya
+    assert bot.get_response(QUESTION) == answer
+
+    # A valid upsert of the same poet still goes through afterwards
+    updated = copy.deepcopy(nannaya)
+    updated['biography_summary'] = "ఆదికవి నన్నయ మహాభారతాన్ని తెలుగులోకి అనువదించడం ప్రారంభించారు."
+    bot.upsert_poet(updated)
+    assert bot.poets_by_id[nannaya['id']] is updated
+    assert list(bot._delta_poets) == [nannaya['id']]
@@ -0,0 +1,88 @@
+import re
+import unicodedata
+
+# --- Telugu <-> Latin matching form ---
+# Users type poet names in Telugu script or in one of many informal Latin
+# spellings ("nannaya", "pothana", "sreenatha"). to_latin maps both to one
+# loose Latin form so the two can be compared character by character:
+# Telugu is romanised syllable by syllable, then both scripts go through the
+# same folding (aspirates and long vowels merged, doubled letters collapsed),
+# which absorbs most spelling variants. The result is for matching only; it
+# is not a readable transliteration.
+
+VOWELS = {
+    "అ": "a", "ఆ": "aa", "ఇ": "i", "ఈ": "ii", "ఉ": "u", "ఊ": "uu", "ఋ": "ri", "ౠ": "ri",
+    "ఎ": "e", "ఏ": "e", "ఐ": "ai", "ఒ": "o", "ఓ": "o", "ఔ": "au",
+}
+VOWEL_SIGNS = {
+    "ా": "aa", "ి": "i", "ీ": "ii", "ు": "u", "ూ": "uu", "ృ": "ri", "ౄ": "ri",
+    "ె": "e", "ే": "e", "ై": "ai", "ొ": "o", "ో": "o", "ౌ": "au",
+}
+CONSONANTS = {
+    "క": "k", "ఖ": "kh", "గ": "g", "ఘ": "gh", "ఙ": "n",
+    "చ": "ch", "ఛ": "ch", "జ": "j", "ఝ": "jh", "ఞ": "n",
+    "ట": "t", "ఠ": "th", "డ": "d", "ఢ": "dh", "ణ": "n",
+    "త": "t", "థ": "th", "ద": "d", "ధ": "dh", "న": "n",
+    "ప": "p", "ఫ": "ph", "బ": "b", "భ": "bh", "మ": "m",
+    "య": "y", "ర": "r", "ఱ": "r", "ల": "l", "ళ": "l", "వ": "v",
+    "శ": "sh", "ష": "sh", "స": "s", "హ": "h",
+}
+VIRAMA = "్"
+ANUSVARA = "ం"
+# Latin spellings write the anusvara as "m" only before labials and at the end of a word
+LABIALS = {"ప", "ఫ", "బ", "భ", "మ"}
+OTHER_SIGNS = {"ఁ": "n", "ః": "h"}
+
+# Applied in order to the romanised text of either script
+LATIN_FOLDS = [
+    (re.compile(r"ee"), "i"),               # sreenatha -> srinatha (Telugu long e is plain "e")
+    (re.compile(r"oo"), "u"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"([kgcjtdpb])h"), r"\1"),  # aspirates: pothana -> potana, bhakti -> bakti
+    (re.compile(r"s+h"), "s"),              # sh / ssh -> s
+    (re.compile(r"(\w)\1+"), r"\1"),        # doubled letters: nannaya -> nanaya, aa -> a
+    (re.compile(r"y\b"), "i"),              # reddy -> redi
+]
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def romanize_telugu(text):
+    """Romanises Telugu characters syllable by syllable; other characters pass through."""
+    out = []
+    pending_a = False  # a consonant was written whose inherent "a" is still owed
+    for position, char in enumerate(text):
+        if char == ANUSVARA:
+            following = text[position + 1:position + 2]
+            char_out = "n" if following in CONSONANTS and following not in LABIALS else "m"
+            if pending_a:
+                out.append("a")
+            out.append(char_out)
+            pending_a = False
+            continue
+        if char in CONSONANTS:
+            if pending_a:
+                out.append("a")
+            out.append(CONSONANTS[char])
+            pending_a = True
+            continue
+        if char in VOWEL_SIGNS:
+            out.append(VOWEL_SIGNS[char])
+        elif char == VIRAMA:
+            pass
+        else:
+            if pending_a:
+                out.append("a")
+            out.append(VOWELS.get(char) or OTHER_SIGNS.get(char, char))
+        pending_a = False
+    if pending_a:
+        out.append("a")
+    return "".join(out)
+
+
+def to_latin(text):
+    """The loose Latin matching form of Telugu or Latin text (see module comment)."""
+    text = romanize_telugu(unicodedata.normalize("NFC", text)).lower()
+    text = NON_WORD.sub(" ", text)
+    for pattern, replacement in LATIN_FOLDS:
+        text = pattern.sub(replacement, text)
+    return text.strip()